@@ -0,0 +1,38 @@
+"""Métriques de génération Ollama sur les messages
+
+Revision ID: 002_chat_message_metrics
+Revises: 001_initial
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002_chat_message_metrics'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+METRIC_COLUMNS = [
+    ('prompt_eval_count', sa.Integer()),
+    ('eval_count', sa.Integer()),
+    ('prompt_eval_duration', sa.BigInteger()),
+    ('eval_duration', sa.BigInteger()),
+    ('load_duration', sa.BigInteger()),
+    ('time_to_first_token', sa.Integer()),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_columns = {c['name'] for c in inspector.get_columns('t7_chat_messages')}
+
+    for name, column_type in METRIC_COLUMNS:
+        if name not in existing_columns:
+            op.add_column('t7_chat_messages', sa.Column(name, column_type, nullable=True))
+
+
+def downgrade():
+    for name, _ in reversed(METRIC_COLUMNS):
+        op.drop_column('t7_chat_messages', name)
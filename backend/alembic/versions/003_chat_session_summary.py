@@ -0,0 +1,30 @@
+"""Résumé glissant des sessions de chat
+
+Revision ID: 003_chat_session_summary
+Revises: 002_chat_message_metrics
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003_chat_session_summary'
+down_revision = '002_chat_message_metrics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_columns = {c['name'] for c in inspector.get_columns('t7_chat_sessions')}
+
+    if 'summary' not in existing_columns:
+        op.add_column('t7_chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    if 'summary_until' not in existing_columns:
+        op.add_column('t7_chat_sessions', sa.Column('summary_until', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('t7_chat_sessions', 'summary_until')
+    op.drop_column('t7_chat_sessions', 'summary')
@@ -0,0 +1,53 @@
+"""Pagination par curseur de l'historique : updated_at des sessions et index composites
+
+Revision ID: 004_chat_history_keyset
+Revises: 003_chat_session_summary
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004_chat_history_keyset'
+down_revision = '003_chat_session_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    session_columns = {c['name'] for c in inspector.get_columns('t7_chat_sessions')}
+    session_indexes = {i['name'] for i in inspector.get_indexes('t7_chat_sessions')}
+    message_indexes = {i['name'] for i in inspector.get_indexes('t7_chat_messages')}
+
+    if 'updated_at' not in session_columns:
+        op.add_column('t7_chat_sessions', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True))
+        op.execute("""
+            UPDATE t7_chat_sessions s
+            SET updated_at = COALESCE(
+                (SELECT max(m.created_at) FROM t7_chat_messages m WHERE m.session_id = s.id),
+                s.created_at,
+                now()
+            )
+        """)
+        op.alter_column('t7_chat_sessions', 'updated_at', nullable=False)
+
+    # Les index composites couvrent aussi les recherches sur leur première colonne
+    if 'idx_t7_chat_sessions_user_updated' not in session_indexes:
+        op.create_index('idx_t7_chat_sessions_user_updated', 't7_chat_sessions', ['user_id', 'updated_at', 'id'], unique=False)
+    if 'idx_t7_chat_sessions_user_id' in session_indexes:
+        op.drop_index('idx_t7_chat_sessions_user_id', table_name='t7_chat_sessions')
+
+    if 'idx_t7_chat_messages_session_created' not in message_indexes:
+        op.create_index('idx_t7_chat_messages_session_created', 't7_chat_messages', ['session_id', 'created_at', 'id'], unique=False)
+    if 'idx_t7_chat_messages_session_id' in message_indexes:
+        op.drop_index('idx_t7_chat_messages_session_id', table_name='t7_chat_messages')
+
+
+def downgrade():
+    op.create_index('idx_t7_chat_messages_session_id', 't7_chat_messages', ['session_id'], unique=False)
+    op.drop_index('idx_t7_chat_messages_session_created', table_name='t7_chat_messages')
+    op.create_index('idx_t7_chat_sessions_user_id', 't7_chat_sessions', ['user_id'], unique=False)
+    op.drop_index('idx_t7_chat_sessions_user_updated', table_name='t7_chat_sessions')
+    op.drop_column('t7_chat_sessions', 'updated_at')
@@ -0,0 +1,115 @@
+"""Partitionnement mensuel de t7_chat_messages par created_at
+
+Revision ID: 005_chat_messages_partitioned
+Revises: 004_chat_history_keyset
+Create Date: 2026-10-19 15:00:00.000000
+
+La table devient partitionnée par RANGE (created_at), une partition par mois
+(t7_chat_messages_pYYYYMM) plus une partition DEFAULT de secours. La clé
+primaire inclut created_at (contrainte PostgreSQL sur les tables
+partitionnées). La fonction t7_create_chat_message_partitions est appelée par
+ChatPartitionService pour créer les mois à venir.
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005_chat_messages_partitioned'
+down_revision = '004_chat_history_keyset'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION t7_create_chat_message_partitions(from_month date, months integer)
+RETURNS integer AS $$
+DECLARE
+    month_start date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months - 1 LOOP
+        month_start := (date_trunc('month', from_month) + make_interval(months => i))::date;
+        partition_name := format('t7_chat_messages_p%s', to_char(month_start, 'YYYYMM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF t7_chat_messages FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _months_between(start: date, end: date) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Les noms d'index et de contraintes de l'ancienne table sont repris par la nouvelle
+    for index in inspector.get_indexes('t7_chat_messages'):
+        op.drop_index(index['name'], table_name='t7_chat_messages')
+    op.execute("UPDATE t7_chat_messages SET created_at = now() WHERE created_at IS NULL")
+    op.execute("ALTER TABLE t7_chat_messages RENAME TO t7_chat_messages_legacy")
+    pk_name = inspector.get_pk_constraint('t7_chat_messages_legacy').get('name')
+    if pk_name:
+        op.execute(f'ALTER TABLE t7_chat_messages_legacy DROP CONSTRAINT "{pk_name}"')
+    for fk in inspector.get_foreign_keys('t7_chat_messages_legacy'):
+        op.execute(f'ALTER TABLE t7_chat_messages_legacy DROP CONSTRAINT "{fk["name"]}"')
+
+    op.execute("""
+        CREATE TABLE t7_chat_messages (LIKE t7_chat_messages_legacy INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER TABLE t7_chat_messages ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER TABLE t7_chat_messages ADD CONSTRAINT t7_chat_messages_pkey PRIMARY KEY (id, created_at)")
+    op.execute("""
+        ALTER TABLE t7_chat_messages ADD CONSTRAINT t7_chat_messages_session_id_fkey
+        FOREIGN KEY (session_id) REFERENCES t7_chat_sessions (id)
+    """)
+    op.create_index('idx_t7_chat_messages_session_created', 't7_chat_messages', ['session_id', 'created_at', 'id'], unique=False)
+
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    first_month, current_month = bind.execute(sa.text("""
+        SELECT COALESCE(date_trunc('month', min(created_at)), date_trunc('month', now()))::date,
+               date_trunc('month', now())::date
+        FROM t7_chat_messages_legacy
+    """)).one()
+    months = _months_between(first_month, current_month) + 1 + MONTHS_AHEAD
+    bind.execute(
+        sa.text("SELECT t7_create_chat_message_partitions(:from_month, :months)"),
+        {"from_month": first_month, "months": months}
+    )
+    op.execute("CREATE TABLE t7_chat_messages_default PARTITION OF t7_chat_messages DEFAULT")
+
+    op.execute("INSERT INTO t7_chat_messages SELECT * FROM t7_chat_messages_legacy")
+    op.execute("DROP TABLE t7_chat_messages_legacy")
+
+
+def downgrade():
+    op.execute("ALTER TABLE t7_chat_messages RENAME TO t7_chat_messages_partitioned")
+    op.execute("ALTER TABLE t7_chat_messages_partitioned DROP CONSTRAINT t7_chat_messages_pkey")
+    op.execute("ALTER TABLE t7_chat_messages_partitioned DROP CONSTRAINT t7_chat_messages_session_id_fkey")
+    op.execute("ALTER INDEX idx_t7_chat_messages_session_created RENAME TO idx_t7_chat_messages_session_created_partitioned")
+
+    op.execute("CREATE TABLE t7_chat_messages (LIKE t7_chat_messages_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO t7_chat_messages SELECT * FROM t7_chat_messages_partitioned")
+    op.execute("ALTER TABLE t7_chat_messages ADD CONSTRAINT t7_chat_messages_pkey PRIMARY KEY (id)")
+    op.execute("""
+        ALTER TABLE t7_chat_messages ADD CONSTRAINT t7_chat_messages_session_id_fkey
+        FOREIGN KEY (session_id) REFERENCES t7_chat_sessions (id)
+    """)
+    op.create_index('idx_t7_chat_messages_session_created', 't7_chat_messages', ['session_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_t7_chat_messages_created_at', 't7_chat_messages', ['created_at'], unique=False)
+
+    op.execute("DROP TABLE t7_chat_messages_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS t7_create_chat_message_partitions(date, integer)")
@@ -0,0 +1,64 @@
+"""Dénormalisation de user_id et du statut traité sur t7_document_chunks
+
+Revision ID: 006_document_chunks_user_scope
+Revises: 005_chat_messages_partitioned
+Create Date: 2026-10-19 16:00:00.000000
+
+La recherche vectorielle filtre les chunks d'un utilisateur sans jointure sur
+t7_documents : user_id et is_processed sont recopiés sur chaque chunk et un
+index partiel (user_id) WHERE is_processed AND embedding IS NOT NULL trouve
+les chunks candidats. La recherche lit content et embedding, donc le heap
+reste lu : l'index n'est pas couvrant.
+
+Le partitionnement par HASH (user_id) est une révision distincte (008).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '006_document_chunks_user_scope'
+down_revision = '005_chat_messages_partitioned'
+branch_labels = None
+depends_on = None
+
+USER_INDEX = 'idx_t7_document_chunks_user_processed'
+
+
+def _create_indexes():
+    op.create_index('idx_t7_document_chunks_document_id', 't7_document_chunks', ['document_id'], unique=False)
+    op.create_index(
+        USER_INDEX, 't7_document_chunks', ['user_id'], unique=False,
+        postgresql_where=sa.text('is_processed AND embedding IS NOT NULL')
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    chunk_columns = {c['name'] for c in inspector.get_columns('t7_document_chunks')}
+
+    if 'user_id' not in chunk_columns:
+        op.add_column('t7_document_chunks', sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True))
+    if 'is_processed' not in chunk_columns:
+        op.add_column('t7_document_chunks', sa.Column('is_processed', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.execute("""
+        UPDATE t7_document_chunks dc
+        SET user_id = d.user_id,
+            is_processed = (d.status = 'processed')
+        FROM t7_documents d
+        WHERE dc.document_id = d.id
+    """)
+    op.alter_column('t7_document_chunks', 'user_id', nullable=False)
+
+    # Index existants (document_id) recréés avec l'index utilisateur
+    for index in inspector.get_indexes('t7_document_chunks'):
+        op.drop_index(index['name'], table_name='t7_document_chunks')
+
+    _create_indexes()
+
+
+def downgrade():
+    op.drop_index(USER_INDEX, table_name='t7_document_chunks')
+    op.drop_column('t7_document_chunks', 'is_processed')
+    op.drop_column('t7_document_chunks', 'user_id')
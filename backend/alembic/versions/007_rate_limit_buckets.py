@@ -0,0 +1,59 @@
+"""Seaux à jetons partagés entre workers pour la limitation de débit
+
+Revision ID: 007_rate_limit_buckets
+Revises: 006_document_chunks_user_scope
+Create Date: 2026-10-19 17:00:00.000000
+
+Utilisés quand RATE_LIMIT_BACKEND=postgres. La table est UNLOGGED : son
+contenu est éphémère (un seau absent équivaut à un seau plein). La fonction
+t7_rate_limit_acquire recharge et débite un seau en une seule instruction,
+sous le verrou de ligne de l'upsert.
+
+"""
+from alembic import op
+
+revision = '007_rate_limit_buckets'
+down_revision = '006_document_chunks_user_scope'
+branch_labels = None
+depends_on = None
+
+ACQUIRE_FUNCTION = """
+CREATE OR REPLACE FUNCTION t7_rate_limit_acquire(
+    bucket_key text, capacity double precision, refill_per_second double precision, cost double precision
+)
+RETURNS double precision AS $$
+DECLARE
+    at timestamp := clock_timestamp();
+    available double precision;
+BEGIN
+    INSERT INTO t7_rate_limit_buckets AS b (key, tokens, updated_at)
+    VALUES (bucket_key, capacity, at)
+    ON CONFLICT (key) DO UPDATE
+    SET tokens = least(capacity, b.tokens + extract(epoch FROM at - b.updated_at) * refill_per_second),
+        updated_at = at
+    RETURNING tokens INTO available;
+
+    IF available >= cost THEN
+        UPDATE t7_rate_limit_buckets SET tokens = available - cost WHERE key = bucket_key;
+        RETURN 0;
+    END IF;
+    RETURN (cost - available) / refill_per_second;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade():
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS t7_rate_limit_buckets (
+            key text PRIMARY KEY,
+            tokens double precision NOT NULL,
+            updated_at timestamp NOT NULL
+        )
+    """)
+    op.execute(ACQUIRE_FUNCTION)
+
+
+def downgrade():
+    op.execute("DROP FUNCTION IF EXISTS t7_rate_limit_acquire(text, double precision, double precision, double precision)")
+    op.execute("DROP TABLE IF EXISTS t7_rate_limit_buckets")
@@ -0,0 +1,98 @@
+"""Partitionnement de t7_document_chunks par HASH (user_id)
+
+Revision ID: 008_document_chunks_hash_partitioned
+Revises: 007_rate_limit_buckets
+Create Date: 2026-10-19 18:00:00.000000
+
+La table est recréée partitionnée par HASH (user_id) en HASH_PARTITIONS
+partitions (t7_document_chunks_hN) : le balayage des chunks d'un utilisateur
+ne lit qu'une partition. La clé primaire inclut user_id (contrainte
+PostgreSQL sur les tables partitionnées). Le nombre de partitions est fixé
+ici : le changer demande une nouvelle révision.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008_document_chunks_hash_partitioned'
+down_revision = '007_rate_limit_buckets'
+branch_labels = None
+depends_on = None
+
+HASH_PARTITIONS = 16
+USER_INDEX = 'idx_t7_document_chunks_user_processed'
+DOCUMENT_INDEX = 'idx_t7_document_chunks_document_id'
+
+
+def _create_indexes():
+    op.create_index(DOCUMENT_INDEX, 't7_document_chunks', ['document_id'], unique=False)
+    op.create_index(
+        USER_INDEX, 't7_document_chunks', ['user_id'], unique=False,
+        postgresql_where=sa.text('is_processed AND embedding IS NOT NULL')
+    )
+
+
+def _drop_indexes(table: str):
+    op.drop_index(USER_INDEX, table_name=table)
+    op.drop_index(DOCUMENT_INDEX, table_name=table)
+
+
+def _add_document_fk():
+    op.execute("""
+        ALTER TABLE t7_document_chunks ADD CONSTRAINT t7_document_chunks_document_id_fkey
+        FOREIGN KEY (document_id) REFERENCES t7_documents (id)
+    """)
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 't7_document_chunks'::regclass)"
+    )).scalar()
+
+
+def upgrade():
+    bind = op.get_bind()
+    if _is_partitioned(bind):
+        return
+
+    inspector = sa.inspect(bind)
+    op.execute("ALTER TABLE t7_document_chunks RENAME TO t7_document_chunks_legacy")
+    _drop_indexes('t7_document_chunks_legacy')
+    pk_name = inspector.get_pk_constraint('t7_document_chunks_legacy').get('name')
+    if pk_name:
+        op.execute(f'ALTER TABLE t7_document_chunks_legacy DROP CONSTRAINT "{pk_name}"')
+    for fk in inspector.get_foreign_keys('t7_document_chunks_legacy'):
+        op.execute(f'ALTER TABLE t7_document_chunks_legacy DROP CONSTRAINT "{fk["name"]}"')
+
+    op.execute("""
+        CREATE TABLE t7_document_chunks (LIKE t7_document_chunks_legacy INCLUDING DEFAULTS)
+        PARTITION BY HASH (user_id)
+    """)
+    op.execute("ALTER TABLE t7_document_chunks ADD CONSTRAINT t7_document_chunks_pkey PRIMARY KEY (id, user_id)")
+    _add_document_fk()
+    for remainder in range(HASH_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE t7_document_chunks_h{remainder} PARTITION OF t7_document_chunks "
+            f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder})"
+        )
+    op.execute("INSERT INTO t7_document_chunks SELECT * FROM t7_document_chunks_legacy")
+    op.execute("DROP TABLE t7_document_chunks_legacy")
+    _create_indexes()
+
+
+def downgrade():
+    bind = op.get_bind()
+    if not _is_partitioned(bind):
+        return
+
+    op.execute("ALTER TABLE t7_document_chunks RENAME TO t7_document_chunks_partitioned")
+    _drop_indexes('t7_document_chunks_partitioned')
+    op.execute("ALTER TABLE t7_document_chunks_partitioned DROP CONSTRAINT t7_document_chunks_pkey")
+    op.execute("ALTER TABLE t7_document_chunks_partitioned DROP CONSTRAINT t7_document_chunks_document_id_fkey")
+
+    op.execute("CREATE TABLE t7_document_chunks (LIKE t7_document_chunks_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO t7_document_chunks SELECT * FROM t7_document_chunks_partitioned")
+    op.execute("ALTER TABLE t7_document_chunks ADD CONSTRAINT t7_document_chunks_pkey PRIMARY KEY (id)")
+    _add_document_fk()
+    op.execute("DROP TABLE t7_document_chunks_partitioned CASCADE")
+    _create_indexes()
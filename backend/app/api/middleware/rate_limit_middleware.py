@@ -0,0 +1,58 @@
+"""
+Middleware d'admission : limitation de débit par utilisateur avant le traitement de la requête
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.exceptions import RateLimitError, create_error_response
+from app.infrastructure.services.auth.auth_cache_service import auth_cache
+from app.infrastructure.services.rate_limit.rate_limiter_service import rate_limiter
+
+# (méthode, chemin) -> classe de route ; le chat WebSocket est limité par message dans le service
+ROUTE_CLASSES = {
+    ("POST", "/api/v1/rag/search"): "search",
+    ("POST", "/api/v1/rag/upload"): "upload",
+}
+
+
+class RateLimitMiddleware:
+    """
+    Refuse en 429 (avec Retry-After) les requêtes d'un utilisateur dont le
+    seau de la classe de route est vide, avant lecture du corps : un upload
+    refusé ne coûte ni réception du fichier ni embeddings. L'utilisateur est
+    résolu par le cache d'authentification ; une requête sans token valide
+    passe et sera refusée en 401 par l'endpoint.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        route_class = ROUTE_CLASSES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if route_class is not None:
+            user = await self._authenticate(scope)
+            if user is not None:
+                retry_after = await rate_limiter.acquire(user.id, route_class)
+                if retry_after > 0:
+                    error = RateLimitError(retry_after)
+                    response = create_error_response(
+                        status_code=error.status_code,
+                        error=error.error,
+                        details=error.details,
+                        headers=error.headers
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+    # ==================== Private methods ====================
+
+    @staticmethod
+    async def _authenticate(scope: Scope):
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        return await auth_cache.authenticate(token)
+                    except Exception:
+                        return None
+        return None
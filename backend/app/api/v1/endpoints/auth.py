@@ -3,12 +3,14 @@ Endpoints d'authentification avec base de données
 """
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.application.commands.user.create_user_command.create_user_validator import CreateUserValidator
 from app.application.queries.user.login_user_query.login_user_validator import LoginUserValidator
 from app.application.queries.user.me_user_query.me_user_query import MeUserQuery, MeUserQueryHandler
 from app.core.security import create_access_token, get_current_user
 from app.domain.entities.user import User
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_async_db, get_db
+from app.infrastructure.repositories.user.async_user_repository import AsyncUserRepository
 from app.infrastructure.repositories.user.user_repository import UserRepository
 from datetime import timedelta
 from app.core.settings import settings
@@ -32,16 +34,16 @@ from app.core.exceptions import (
 router = APIRouter()
 
 @router.post("/login", response_model=JWTDto)
-async def login(user_login: LoginUserValidator, db: Session = Depends(get_db)):
-    """Connexion utilisateur avec base de données"""
+async def login(user_login: LoginUserValidator, db: AsyncSession = Depends(get_async_db)):
+    """Connexion utilisateur avec base de données (Argon2 exécuté hors de la boucle)"""
     try:
-        user_repo = UserRepository(db)
+        user_repo = AsyncUserRepository(db)
         handler = LoginUserQueryHandler(user_repo)
         query = LoginUserQuery(
             username=user_login.username,
             password=user_login.password
         )
-        user = handler.handle(query)
+        user = await handler.handle(query)
         
         if not user:
             logger.warning(f"Tentative de connexion échouée pour: {user_login.username}")
@@ -70,10 +72,10 @@ async def login(user_login: LoginUserValidator, db: Session = Depends(get_db)):
 
 
 @router.post("/register")
-async def register(user_register: CreateUserValidator, db: Session = Depends(get_db)):
-    """Inscription utilisateur avec base de données"""
+async def register(user_register: CreateUserValidator, db: AsyncSession = Depends(get_async_db)):
+    """Inscription utilisateur avec base de données (Argon2 exécuté hors de la boucle)"""
     try:
-        user_repo = UserRepository(db)
+        user_repo = AsyncUserRepository(db)
         
         handler = CreateUserCommandHandler(user_repo)
         command = CreateUserCommand(
@@ -81,7 +83,7 @@ async def register(user_register: CreateUserValidator, db: Session = Depends(get
             email=f"{user_register.username.lower()}@local.dev",
             password=user_register.password
         )
-        user = handler.handle(command)
+        user = await handler.handle(command)
         
         logger.info(f"Nouvel utilisateur créé: {user.username}")
         return create_success_response(
@@ -1,14 +1,18 @@
 """
 Endpoints pour le chat avec Ollama
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
+from uuid import UUID
 
 from app.domain.entities.user import User
-from app.infrastructure.database import get_db
-from app.infrastructure.repositories import ChatRepository
+from app.infrastructure.database import get_async_db, get_db
+from app.infrastructure.repositories import AsyncChatRepository, ChatRepository
+from app.infrastructure.services.chat.chat_message_writer_service import chat_message_writer
+from app.core.pagination import decode_cursor, encode_cursor
 from app.core.security import get_current_user
 from app.core.logging import logger
 
@@ -54,4 +58,74 @@ async def create_session(
         )
 
 
+@router.get("/sessions")
+async def list_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Sessions de l'utilisateur, les plus récemment actives d'abord (pagination par curseur)
+    """
+    before = _parse_cursor(cursor)
+    sessions = await AsyncChatRepository(db).get_sessions_page(current_user.id, limit + 1, before)
+    page = sessions[:limit]
+    
+    return {
+        "sessions": [
+            {
+                "session_id": session.id,
+                "title": session.title,
+                "created_at": session.created_at.isoformat(),
+                "updated_at": session.updated_at.isoformat()
+            }
+            for session in page
+        ],
+        "next_cursor": encode_cursor(page[-1].updated_at, page[-1].id) if len(sessions) > limit else None
+    }
+
+
+@router.get("/session/{session_id}/messages")
+async def list_session_messages(
+    session_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Messages d'une session, page la plus récente d'abord ; chaque page est en ordre chronologique.
+    `next_cursor` donne la page précédente (messages plus anciens).
+    """
+    before = _parse_cursor(cursor)
+    chat_repo = AsyncChatRepository(db)
+    if await chat_repo.get_session_by_id(session_id, current_user.id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session non trouvée")
+    
+    await chat_message_writer.flush(session_id)
+    messages = await chat_repo.get_messages_page(session_id, limit + 1, before)
+    page = messages[:limit]
+    
+    return {
+        "messages": [
+            {
+                "message_id": message.id,
+                "message_type": message.message_type,
+                "content": message.content,
+                "llm_used": message.llm_used,
+                "tokens_used": message.tokens_used,
+                "response_time": message.response_time,
+                "timestamp": message.created_at.isoformat()
+            }
+            for message in reversed(page)
+        ],
+        "next_cursor": encode_cursor(page[-1].created_at, page[-1].id) if len(messages) > limit else None
+    }
+
 
+def _parse_cursor(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur de pagination invalide")
@@ -1,8 +1,18 @@
 """
 Endpoint de santé pour vérifier l'état de l'API
 """
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.core.exceptions import AuthorizationError
+from app.core.logging import get_hot_loggers, get_levels, reset_level, set_level
+from app.core.security import get_current_user
 from app.core.settings import settings
+from app.infrastructure.database import get_pool_stats
+from app.infrastructure.services.auth.auth_cache_service import auth_cache
+from app.infrastructure.services.auth.password_hasher_service import password_hasher
+from app.infrastructure.services.chat.chat_partition_service import chat_partition_service
+from app.infrastructure.services.ollama.ollama_metrics import ollama_metrics
+from app.infrastructure.services.rate_limit.rate_limiter_service import rate_limiter
 
 router = APIRouter()
 
@@ -22,3 +32,88 @@ async def health_check():
 async def ping():
     """Simple ping pour vérifier la connectivité"""
     return {"message": "pong"}
+
+
+@router.get("/ollama")
+async def ollama_generation_stats():
+    """Métriques de génération Ollama par modèle (TTFT, tokens/s, prefill)"""
+    return {
+        "models": ollama_metrics.get_stats()
+    }
+
+
+
+@router.get("/database")
+async def database_pool_stats():
+    """Pool de connexions : connexions prêtées, débordement, temps d'obtention et d'ouverture"""
+    return {
+        **get_pool_stats(),
+        "message_partitions": chat_partition_service.get_stats()
+    }
+
+
+@router.get("/auth")
+async def auth_stats():
+    """Cache d'authentification (hits, misses, taux de hits) et pool Argon2"""
+    return {
+        "cache": auth_cache.get_stats(),
+        "password_hashing": password_hasher.get_stats()
+    }
+
+
+@router.get("/rate-limits")
+async def rate_limit_stats():
+    """Requêtes admises et limitées par classe de route (chat, search, upload)"""
+    return rate_limiter.get_stats()
+
+
+def _require_log_admin(current_user=Depends(get_current_user)):
+    if current_user.username not in settings.LOG_ADMIN_USERS:
+        raise AuthorizationError("Modification des niveaux de log réservée (LOG_ADMIN_USERS)")
+    return current_user
+
+
+@router.get("/logging")
+async def logging_config():
+    """Niveaux de log courants et compteurs des loggers de boucles chaudes"""
+    return {
+        "levels": get_levels(),
+        "hot_loggers": {name: hot.get_stats() for name, hot in get_hot_loggers().items()}
+    }
+
+
+@router.put("/logging")
+async def update_log_level(
+    level: str = Query(..., description="TRACE, DEBUG, INFO, WARNING, ERROR..."),
+    logger_name: str = Query("", alias="logger", description="module (préfixe), vide = racine"),
+    _admin=Depends(_require_log_admin)
+):
+    """Changer à chaud le niveau global ou celui d'un module"""
+    try:
+        return {"levels": set_level(level, logger_name)}
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Niveau inconnu: {level}")
+
+
+@router.delete("/logging")
+async def reset_log_level(
+    logger_name: str = Query(..., alias="logger"),
+    _admin=Depends(_require_log_admin)
+):
+    """Retirer le niveau propre à un module"""
+    return {"levels": reset_level(logger_name)}
+
+
+@router.put("/logging/hot/{name}")
+async def update_hot_logger(
+    name: str,
+    sample_rate: Optional[float] = Query(None, ge=0, le=1),
+    max_per_second: Optional[float] = Query(None, ge=0),
+    _admin=Depends(_require_log_admin)
+):
+    """Régler l'échantillonnage et le plafond d'un logger de boucle chaude"""
+    hot = get_hot_loggers().get(name)
+    if hot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Logger inconnu: {name}")
+    hot.configure(sample_rate, max_per_second)
+    return hot.get_stats()
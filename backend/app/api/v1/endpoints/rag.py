@@ -3,7 +3,7 @@ Endpoints pour la gestion des documents RAG
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 from app.application.commands.document.delete_document_command.delete_document_command import DeleteDocumentCommand, DeleteDocumentCommandHandler
@@ -13,16 +13,16 @@ from app.application.commands.document.document_upload_command.document_upload_c
 )
 from app.application.dto.document.document_info_response import DocumentInfoResponseDto
 from app.application.queries.document.get_document_query import GetDocumentQuery, GetDocumentQueryHandler
-from app.infrastructure.repositories.document.document_repository import (
-    DocumentRepository,
+from app.infrastructure.repositories.document.async_document_repository import (
+    AsyncDocumentRepository,
 )
-from app.infrastructure.repositories.document.document_chunk_repository import (
-    DocumentChunkRepository,
+from app.infrastructure.repositories.document.async_document_chunk_repository import (
+    AsyncDocumentChunkRepository,
 )
 from app.application.dto.document.document_upload_response_dto import (
     DocumentUploadResponseDto,
 )
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_async_db
 from app.core.security import get_current_user
 from app.domain.entities.user import User
 from app.core.logging import logger
@@ -36,7 +36,7 @@ async def upload_document(
     file: UploadFile = File(...),
     title: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Upload un document pour indexation RAG
@@ -44,8 +44,8 @@ async def upload_document(
     try:
         logger.info(f"Début upload: {file.filename} par {current_user.username}")
 
-        document_repository = DocumentRepository(db)
-        chunk_repository = DocumentChunkRepository(db)
+        document_repository = AsyncDocumentRepository(db)
+        chunk_repository = AsyncDocumentChunkRepository(db)
 
         handler = DocumentUploadCommandHandler(
             document_repository=document_repository, document_chunk_repository=chunk_repository
@@ -61,10 +61,10 @@ async def upload_document(
 
         return document
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erreur upload document: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -74,13 +74,13 @@ async def upload_document(
 
 @router.get("/documents", response_model=List[DocumentInfoResponseDto])
 async def get_user_documents(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupérer tous les documents de l'utilisateur
     """
     try:
-        document_repository = DocumentRepository(db)
+        document_repository = AsyncDocumentRepository(db)
         handler = GetDocumentQueryHandler(document_repository=document_repository)
         query = GetDocumentQuery(user_id=current_user.id)
         
@@ -112,7 +112,7 @@ async def search_documents(
     top_k: int = Form(5),
     similarity_threshold: float = Form(0.7),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Rechercher dans les documents de l'utilisateur
@@ -141,14 +141,14 @@ async def search_documents(
 @router.delete("/documents/{document_id}")
 async def delete_document(
     document_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Supprimer un document et ses chunks
     """
     try:
-        document_repository = DocumentRepository(db)
-        document_chunk_repository = DocumentChunkRepository(db)
+        document_repository = AsyncDocumentRepository(db)
+        document_chunk_repository = AsyncDocumentChunkRepository(db)
         handler = DeleteDocumentCommandHandler(document_repository=document_repository, document_chunk_repository=document_chunk_repository)
         command = DeleteDocumentCommand(
             document_id=document_id
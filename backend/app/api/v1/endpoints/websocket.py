@@ -1,13 +1,21 @@
 """
 Endpoints WebSocket pour chat temps réel
 """
-from fastapi import APIRouter, WebSocket, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, Query, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
+from app.core.exceptions import AuthorizationError
 from app.core.logging import logger
+from app.core.security import get_current_user
+from app.core.settings import settings
 from app.infrastructure.database import SessionLocal
+from app.infrastructure.services.chat.chat_message_writer_service import chat_message_writer
 from app.infrastructure.services.websocket.websocket_chat_service import websocket_chat_service
+from app.infrastructure.services.websocket.websocket_metrics import websocket_metrics
 
 router = APIRouter()
+optional_bearer = HTTPBearer(auto_error=False)
 
 
 @router.websocket("/chat/{session_id}")
@@ -28,18 +36,15 @@ async def websocket_chat_endpoint(
     - typing: Indiquer que l'utilisateur tape
     - stop_typing: Arrêter l'indicateur de frappe
     - ping: Maintenir la connexion vivante
+    - resume: Reprendre un stream IA (message_id, offset)
+    
+    Protocole (sous-protocole `t7.json` / `t7.msgpack`, suffixe `+ref`, ou
+    query params `protocol=msgpack` et `stream_ref=true`) : MessagePack en
+    frames binaires, et ai_message final par référence au contenu streamé.
     """
-    logger.info(f"[DEBUG] Appel route WebSocket: session_id={session_id}, token={token[:20]}")
     logger.info(f"🔌 Nouvelle connexion WebSocket pour session {session_id}")
-    logger.info(f"🔑 Token reçu: {token[:20]}...")
     
-    db = SessionLocal()
-    try:
-        await websocket_chat_service.handle_websocket_connection(
-            websocket, session_id, token, db
-        )
-    finally:
-        db.close()
+    await websocket_chat_service.handle_websocket_connection(websocket, session_id, token)
 
 
 @router.get("/ws/rooms/{session_id}/users")
@@ -54,21 +59,52 @@ async def get_room_users(session_id: str):
 
 
 @router.get("/ws/stats")
-async def get_websocket_stats():
-    """Statistiques des connexions WebSocket"""
+async def get_websocket_stats(
+    detail: bool = Query(False, description="détail par room et par connexion (WS_STATS_ADMIN_USERS)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)
+):
+    """
+    Statistiques des connexions WebSocket
+    
+    Par défaut, uniquement des agrégats (taille indépendante du nombre de
+    connexions). Le détail par room et par connexion, avec les user_id, est
+    réservé aux utilisateurs de WS_STATS_ADMIN_USERS.
+    """
     manager = websocket_chat_service.connection_manager
     
-    return {
-        "total_rooms": len(manager.rooms),
-        "total_connections": sum(len(users) for users in manager.rooms.values()),
-        "rooms": {
+    rooms = manager.get_rooms()
+    
+    stats = {
+        "total_rooms": len(rooms),
+        "total_connections": manager.registry.connection_count,
+        "memory": manager.get_memory_stats(),
+        "queues": manager.get_queue_stats(),
+        "message_latency": websocket_metrics.get_stats(),
+        "typing": websocket_chat_service.typing_presence.get_stats(),
+        "streams": websocket_chat_service.stream_buffers.get_stats(),
+        "persistence": chat_message_writer.get_stats()
+    }
+    
+    if detail:
+        if credentials is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentification requise",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        current_user = await get_current_user(credentials)
+        if current_user.username not in settings.WS_STATS_ADMIN_USERS:
+            raise AuthorizationError("Détail des connexions réservé (WS_STATS_ADMIN_USERS)")
+        stats["rooms"] = {
             room_id: {
                 "user_count": len(users),
-                "users": list(users.keys())
+                "users": users
             }
-            for room_id, users in manager.rooms.items()
+            for room_id, users in rooms.items()
         }
-    }
+        stats["connections"] = manager.get_connection_stats()
+    
+    return stats
 
 
 @router.websocket("/test-simple")
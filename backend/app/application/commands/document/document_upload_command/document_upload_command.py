@@ -1,8 +1,8 @@
 from typing import Optional
 from fastapi import UploadFile, File, Form
 from app.application.dto.document.document_upload_response_dto import DocumentUploadResponseDto
-from app.domain.interfaces.repositories.document.i_document_repository import IDocumentRepository
-from app.domain.interfaces.repositories.document.i_document_chunk_repository import IDocumentChunkRepository
+from app.domain.interfaces.repositories.document.i_async_document_repository import IAsyncDocumentRepository
+from app.domain.interfaces.repositories.document.i_async_document_chunk_repository import IAsyncDocumentChunkRepository
 from app.application.dto.document.document_upload_dto import DocumentUploadDto
 from app.domain.entities.user import User
 from app.domain.interfaces.services.document.i_document_service import IDocumentService
@@ -17,8 +17,8 @@ class DocumentUploadCommand:
 class DocumentUploadCommandHandler: 
     def __init__(
         self,
-        document_repository: IDocumentRepository,
-        document_chunk_repository: IDocumentChunkRepository,
+        document_repository: IAsyncDocumentRepository,
+        document_chunk_repository: IAsyncDocumentChunkRepository,
     ):
         self.document_repository = document_repository
         self.document_chunk_repository = document_chunk_repository
@@ -1,5 +1,5 @@
 from typing import Optional
-from app.domain.interfaces.repositories.user.i_user_repository import IUserRepository
+from app.domain.interfaces.repositories.user.i_async_user_repository import IAsyncUserRepository
 from app.application.dto.user.create_user_dto import CreateUserDTO
 
 class CreateUserCommand:
@@ -9,19 +9,19 @@ class CreateUserCommand:
         self.password = password
 
 class CreateUserCommandHandler:
-    def __init__(self, user_repository: IUserRepository):
+    def __init__(self, user_repository: IAsyncUserRepository):
         self.user_repository = user_repository
 
-    def handle(self, command: CreateUserCommand) -> Optional[object]:
-        existing_user = self.user_repository.get_user_by_username(command.username)
+    async def handle(self, command: CreateUserCommand) -> Optional[object]:
+        existing_user = await self.user_repository.get_user_by_username(command.username)
         if existing_user:
             raise Exception("Ce nom d'utilisateur existe déjà")
 
-        existing_email = self.user_repository.get_user_by_email(command.email)
+        existing_email = await self.user_repository.get_user_by_email(command.email)
         if existing_email:
             raise Exception("Cette adresse email est déjà utilisée")
 
-        user: CreateUserDTO = self.user_repository.create_user(
+        user: CreateUserDTO = await self.user_repository.create_user(
             username=command.username,
             email=command.email,
             password=command.password
@@ -1,7 +1,7 @@
 from typing import List
 from uuid import UUID
 
-from app.domain.interfaces.repositories.document.i_document_repository import IDocumentRepository
+from app.domain.interfaces.repositories.document.i_async_document_repository import IAsyncDocumentRepository
 from app.domain.entities.document import Document
 
 
@@ -10,12 +10,12 @@ class GetDocumentQuery:
         self.user_id = user_id
 
 class GetDocumentQueryHandler:
-    def __init__(self, document_repository: IDocumentRepository):
+    def __init__(self, document_repository: IAsyncDocumentRepository):
         self.document_repository = document_repository
 
     async def handle(self, query: GetDocumentQuery) -> List[Document]:
         """Récupérer tous les documents d'un utilisateur"""
-        documents: List[Document] = self.document_repository.get_all_documents(query.user_id)
+        documents: List[Document] = await self.document_repository.get_all_documents(query.user_id)
         
         if not documents:
             return []
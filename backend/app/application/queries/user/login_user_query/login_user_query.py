@@ -1,5 +1,5 @@
 from typing import Optional
-from app.domain.interfaces.repositories.user.i_user_repository import IUserRepository
+from app.domain.interfaces.repositories.user.i_async_user_repository import IAsyncUserRepository
 
 class LoginUserQuery:
     def __init__(self, username: str, password: str):
@@ -7,9 +7,9 @@ class LoginUserQuery:
         self.password = password
 
 class LoginUserQueryHandler:
-    def __init__(self, user_repository: IUserRepository):
+    def __init__(self, user_repository: IAsyncUserRepository):
         self.user_repository = user_repository
 
-    def handle(self, query: LoginUserQuery) -> Optional[object]:
-        user = self.user_repository.authenticate_user(query.username, query.password)
+    async def handle(self, query: LoginUserQuery) -> Optional[object]:
+        user = await self.user_repository.authenticate_user(query.username, query.password)
         return user
\ No newline at end of file
@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, ValidationError
 from typing import Dict, Any, List, Optional
+import math
 import traceback
 from app.core.logging import logger
 
@@ -91,10 +92,23 @@ class BusinessLogicError(AppException):
         )
 
 
+class RateLimitError(AppException):
+    """Trop de requêtes pour cette classe de route"""
+    def __init__(self, retry_after: float, message: str = "Trop de requêtes, réessayez plus tard"):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=429,
+            error=message,
+            details=[ErrorDetail(message=message, code="RATE_LIMITED")],
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+
 def create_error_response(
     status_code: int,
     error: str,
-    details: List[ErrorDetail] = None
+    details: List[ErrorDetail] = None,
+    headers: Dict[str, str] = None
 ) -> JSONResponse:
     """Créer une réponse d'erreur standardisée"""
     from datetime import datetime
@@ -109,7 +123,8 @@ def create_error_response(
     
     return JSONResponse(
         status_code=status_code,
-        content=response.dict()
+        content=response.dict(),
+        headers=headers
     )
 
 
@@ -121,13 +136,15 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
         return create_error_response(
             status_code=exc.status_code,
             error=exc.error,
-            details=exc.details
+            details=exc.details,
+            headers=exc.headers
         )
     
     return create_error_response(
         status_code=exc.status_code,
         error=str(exc.detail) if exc.detail else "Erreur HTTP",
-        details=[ErrorDetail(message=str(exc.detail), code="HTTP_ERROR")]
+        details=[ErrorDetail(message=str(exc.detail), code="HTTP_ERROR")],
+        headers=exc.headers
     )
 
 
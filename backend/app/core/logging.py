@@ -1,38 +1,231 @@
 """
 Configuration de logging avec Loguru
+
+Les sinks écrivent depuis un thread dédié (enqueue=True) : un appel de log
+ne fait que formater et mettre en file. Les fichiers sont en JSON (une ligne
+par enregistrement). Les niveaux, globaux ou par module, se changent à chaud
+(`set_level`) : les sinks, ajoutés une seule fois, filtrent selon `_levels`
+et un changement ne fait que modifier ce dictionnaire. Les messages de
+boucles chaudes passent par `hot_logger`, échantillonné et limité en débit.
 """
+import json
+import random
 import sys
+import time
+import traceback
+from threading import Lock
+from typing import Any, Dict, List, Optional
 from loguru import logger
 from app.core.settings import settings
 
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
 
-def setup_logging():
-    """Configuration du système de logging"""
-    
-    logger.remove()
+_lock = Lock()
+_handler_ids: List[int] = []
+_levels: Dict[str, str] = {}
+_thresholds: Dict[str, int] = {}  # seuil numérique par module, remis à zéro à chaque changement de niveau
+_hot_loggers: Dict[str, "HotPathLogger"] = {}
+
+
+def _json_format(record: Dict[str, Any]) -> str:
+    """Enregistrement sérialisé en une ligne JSON (format calculé par loguru pour chaque message)"""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    extra = {key: value for key, value in record["extra"].items() if not key.startswith("_")}
+    if extra:
+        payload["extra"] = extra
+    if record["exception"] is not None:
+        payload["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    record["extra"]["_json"] = json.dumps(payload, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+def _threshold(name: str) -> int:
+    """Seuil du module : niveau du préfixe de module le plus long présent dans `_levels`"""
+    cache = _thresholds  # remplacé (pas vidé) à chaque changement : un calcul concurrent ne le pollue pas
+    threshold = cache.get(name)
+    if threshold is None:
+        parts = name.split(".")
+        for i in range(len(parts), -1, -1):
+            level = _levels.get(".".join(parts[:i]))
+            if level is not None:
+                threshold = logger.level(level).no
+                break
+        else:
+            threshold = 0
+        cache[name] = threshold
+    return threshold
+
+
+def _reset_thresholds():
+    global _thresholds
+    _thresholds = {}
+
+
+def _level_filter(record: Dict[str, Any]) -> bool:
+    return record["level"].no >= _threshold(record["name"] or "")
 
-    logger.add(
+
+def _configure_sinks():
+    """Ajouter les sinks, une fois : leur filtre lit `_levels` à chaque enregistrement"""
+    file_format = _json_format if settings.LOG_JSON else TEXT_FORMAT
+
+    _handler_ids.append(logger.add(
         sys.stderr,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="DEBUG" if settings.DEBUG else "INFO",
-        colorize=True
-    )
-    
-    logger.add(
+        format=TEXT_FORMAT,
+        level=0,
+        filter=_level_filter,
+        colorize=True,
+        enqueue=True
+    ))
+    _handler_ids.append(logger.add(
         "/app/logs/app_{time:YYYY-MM-DD}.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="DEBUG"
-    )
-    
-    logger.add(
+        format=file_format,
+        level=0,
+        filter=_level_filter,
+        enqueue=True
+    ))
+    _handler_ids.append(logger.add(
         "logs/errors_{time:YYYY-MM-DD}.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        format=file_format,
         level="ERROR",
         rotation="1 day",
         retention="30 days",
-        compression="zip"
-    )
-    
+        compression="zip",
+        enqueue=True
+    ))
+
+
+def setup_logging():
+    """Configuration du système de logging"""
+    with _lock:
+        logger.remove()
+        _handler_ids.clear()
+        _levels.clear()
+        _levels[""] = settings.LOG_LEVEL or ("DEBUG" if settings.DEBUG else "INFO")
+        _reset_thresholds()
+        _configure_sinks()
     return logger
 
+
+def set_level(level: str, name: str = "") -> Dict[str, str]:
+    """Changer à chaud le niveau global (name vide) ou celui d'un module et de ses sous-modules"""
+    level = level.upper()
+    logger.level(level)  # ValueError si le niveau n'existe pas
+    with _lock:
+        _levels[name] = level
+        _reset_thresholds()
+    logger.info(f"Niveau de log de '{name or 'racine'}' passé à {level}")
+    return get_levels()
+
+
+def reset_level(name: str) -> Dict[str, str]:
+    """Retirer le niveau propre à un module (il reprend celui de son parent)"""
+    with _lock:
+        if name and _levels.pop(name, None) is not None:
+            _reset_thresholds()
+    return get_levels()
+
+
+def get_levels() -> Dict[str, str]:
+    return dict(_levels)
+
+
+def is_enabled(level: str, name: str) -> bool:
+    """Le niveau est-il émis pour ce module ? (même règle que le filtre des sinks)"""
+    return logger.level(level).no >= _threshold(name)
+
+
+class HotPathLogger:
+    """
+    Logger de boucle chaude : un message par élément, mais peu d'écritures
+
+    Un message n'est produit que si son niveau est actif pour le module, puis
+    seulement pour une fraction `sample_rate` des appels et au plus
+    `max_per_second` fois par seconde. Les messages écartés sont comptés et
+    le suivant émis porte `suppressed` dans ses extras. Utiliser le
+    formatage différé de loguru (`"{}"` et arguments) pour ne rien formater
+    quand le message est écarté.
+    """
+
+    def __init__(self, name: str, module: str):
+        self.name = name
+        self.module = module
+        self.sample_rate = settings.LOG_HOT_SAMPLE_RATE
+        self.max_per_second = settings.LOG_HOT_MAX_PER_SECOND
+        self.emitted = 0
+        self.suppressed = 0
+        self._pending_suppressed = 0
+        self._window = 0
+        self._window_count = 0
+
+    def debug(self, message: str, *args, **kwargs):
+        self._log("DEBUG", message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs):
+        self._log("INFO", message, args, kwargs)
+
+    def warning(self, message: str, *args, **kwargs):
+        self._log("WARNING", message, args, kwargs)
+
+    def configure(self, sample_rate: Optional[float] = None, max_per_second: Optional[float] = None):
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if max_per_second is not None:
+            self.max_per_second = max_per_second
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "module": self.module,
+            "sample_rate": self.sample_rate,
+            "max_per_second": self.max_per_second,
+            "emitted": self.emitted,
+            "suppressed": self.suppressed,
+        }
+
+    # ==================== Private methods ====================
+
+    def _log(self, level: str, message: str, args: tuple, kwargs: dict):
+        if not is_enabled(level, self.module):
+            return
+        if not self._allow():
+            self.suppressed += 1
+            self._pending_suppressed += 1
+            return
+        self.emitted += 1
+        suppressed, self._pending_suppressed = self._pending_suppressed, 0
+        logger.opt(depth=2).bind(hot=self.name, suppressed=suppressed).log(level, message, *args, **kwargs)
+
+    def _allow(self) -> bool:
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        if self.max_per_second > 0:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._window_count = window, 0
+            if self._window_count >= self.max_per_second:
+                return False
+            self._window_count += 1
+        return True
+
+
+def hot_logger(name: str, module: str) -> HotPathLogger:
+    """Logger échantillonné `name` (partagé), rattaché au module appelant pour les niveaux"""
+    with _lock:
+        hot = _hot_loggers.get(name)
+        if hot is None:
+            hot = _hot_loggers[name] = HotPathLogger(name, module)
+        return hot
+
+
+def get_hot_loggers() -> Dict[str, HotPathLogger]:
+    return dict(_hot_loggers)
+
+
 logger = setup_logging()
@@ -0,0 +1,27 @@
+"""
+Curseurs de pagination par clé (keyset) : (horodatage, id) encodés en base64
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+Cursor = Tuple[datetime, UUID]
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    """Curseur opaque désignant la dernière ligne d'une page"""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Décoder un curseur ; ValueError s'il est invalide"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
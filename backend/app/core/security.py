@@ -7,13 +7,17 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from app.core.settings import settings
-from app.infrastructure.database import get_db
 from app.core.logging import logger
 
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 security = HTTPBearer()
 
 
@@ -31,20 +35,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Vérifier un mot de passe"""
+    """Vérifier un mot de passe (bloquant : depuis la boucle, passer par password_hasher)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hasher un mot de passe"""
+    """Hasher un mot de passe (bloquant : depuis la boucle, passer par password_hasher)"""
     return pwd_context.hash(password)
 
 
 def verify_token(token: str) -> Optional[dict]:
     """Vérifier et décoder un token JWT"""
     try:
-        logger.info(f"Vérification du token JWT ")
-        
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError as e:
@@ -56,14 +58,16 @@ def verify_token(token: str) -> Optional[dict]:
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     Récupérer l'utilisateur actuel à partir du token JWT
+
+    Passe par le cache d'authentification : un token déjà vérifié ne coûte
+    ni décodage ni requête en base jusqu'à l'expiration de son entrée.
     """
     
-    from app.infrastructure.repositories.user.user_repository import UserRepository
+    from app.infrastructure.services.auth.auth_cache_service import auth_cache
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token invalide",
@@ -71,23 +75,11 @@ async def get_current_user(
     )
     
     try:
-        payload = verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-            
-        user_repo = UserRepository(db)
-        user = user_repo.get_user_by_username(username)
-        
-        if user is None:
-            raise credentials_exception
-        
-        user.payload = credentials.credentials 
-            
-        return user
-        
-    except Exception:
+        user = await auth_cache.authenticate(credentials.credentials)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'authentification: {e}")
+        raise credentials_exception
+
+    if user is None:
         raise credentials_exception
+    return user
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, UUID
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, ForeignKey, UUID, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database import Base
@@ -6,7 +6,10 @@ import uuid
 
 class ChatMessage(Base):
     """Modèle message de chat"""
-    __tablename__ = "t7_chat_messages"
+    __tablename__ = "t7_chat_messages"  # partitionnée par mois sur created_at (migration 005)
+    __table_args__ = (
+        Index("idx_t7_chat_messages_session_created", "session_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("t7_chat_sessions.id"), nullable=False)
@@ -15,6 +18,12 @@ class ChatMessage(Base):
     llm_used = Column(String(50), nullable=True)  
     tokens_used = Column(Integer, nullable=True)
     response_time = Column(Integer, nullable=True)  
+    prompt_eval_count = Column(Integer, nullable=True)
+    eval_count = Column(Integer, nullable=True)
+    prompt_eval_duration = Column(BigInteger, nullable=True)  # nanosecondes (Ollama)
+    eval_duration = Column(BigInteger, nullable=True)
+    load_duration = Column(BigInteger, nullable=True)
+    time_to_first_token = Column(Integer, nullable=True)  # millisecondes
     rag_sources = Column(Text, nullable=True) 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime,  Boolean, UUID, ForeignKey
+from sqlalchemy import Column, String, DateTime,  Boolean, UUID, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 import uuid
 from sqlalchemy.orm import relationship
@@ -8,12 +8,18 @@ from app.infrastructure.database import Base
 class ChatSession(Base):
     """Modèle session de chat"""
     __tablename__ = "t7_chat_sessions"
+    __table_args__ = (
+        Index("idx_t7_chat_sessions_user_updated", "user_id", "updated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("t7_users.id"), nullable=False)
     title = Column(String(200), nullable=False, default="Nouvelle conversation")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # date du dernier message
+    summary = Column(Text, nullable=True)  # résumé glissant des anciens tours
+    summary_until = Column(DateTime(timezone=True), nullable=True)  # created_at du dernier message résumé
 
     user = relationship("User", back_populates="chat_sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
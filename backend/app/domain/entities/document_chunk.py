@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Text,  ForeignKey, UUID
+from sqlalchemy import Column, Integer, DateTime, Text, Boolean, ForeignKey, UUID, Index, false, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.infrastructure.database import Base
@@ -6,10 +6,20 @@ import uuid
 
 class DocumentChunk(Base):
     """Modèle chunk de document avec embedding vectoriel"""
-    __tablename__ = "t7_document_chunks"
+    __tablename__ = "t7_document_chunks"  # partitionnée par HASH (user_id) (migration 008)
+    __table_args__ = (
+        Index("idx_t7_document_chunks_document_id", "document_id"),
+        Index(
+            "idx_t7_document_chunks_user_processed", "user_id",
+            postgresql_where=text("is_processed AND embedding IS NOT NULL"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     document_id = Column(UUID(as_uuid=True), ForeignKey("t7_documents.id"), nullable=False)
+    # Recopiés depuis le document pour filtrer les chunks d'un utilisateur sans jointure
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    is_processed = Column(Boolean, nullable=False, default=False, server_default=false())
     chunk_index = Column(Integer, nullable=False)  
     content = Column(Text, nullable=False)
     embedding = Column(Text, nullable=False)  
@@ -19,4 +29,4 @@ class DocumentChunk(Base):
     document = relationship("Document", back_populates="chunks")
 
     def __repr__(self):
-        return f"<DocumentChunk(doc_id='{self.document_id}', index={self.chunk_index})>"
\ No newline at end of file
+        return f"<DocumentChunk(doc_id='{self.document_id}', index={self.chunk_index})>"
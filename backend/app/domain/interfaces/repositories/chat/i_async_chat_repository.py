@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional, List, Any, Tuple
+from uuid import UUID
+
+class IAsyncChatRepository:
+    """Interface pour le repository de chat asynchrone"""
+
+    async def create_session(self, user_id: UUID, title: str) -> Any:
+        raise NotImplementedError
+
+    async def get_session_by_id(self, session_id: UUID, user_id: UUID) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def get_sessions_by_user(self, user_id: UUID, active_only: bool = True, limit: int = 20) -> List[Any]:
+        raise NotImplementedError
+
+    async def get_sessions_page(self, user_id: UUID, limit: int, before: Optional[Tuple[datetime, UUID]] = None) -> List[Any]:
+        raise NotImplementedError
+
+    async def create_message(self, session_id: UUID, message_type: str, content: str, **kwargs) -> Any:
+        raise NotImplementedError
+
+    async def get_session_messages(self, session_id: UUID) -> List[Any]:
+        raise NotImplementedError
+
+    async def get_messages_page(self, session_id: UUID, limit: int, before: Optional[Tuple[datetime, UUID]] = None) -> List[Any]:
+        raise NotImplementedError
+
+    async def get_messages_after(self, session_id: UUID, after: Optional[datetime], limit: int) -> List[Any]:
+        raise NotImplementedError
+
+    async def get_oldest_messages_after(self, session_id: UUID, after: Optional[datetime], limit: int) -> List[Any]:
+        raise NotImplementedError
+
+    async def get_session_summary(self, session_id: UUID) -> Tuple[Optional[str], Optional[datetime]]:
+        raise NotImplementedError
+
+    async def update_session_summary(self, session_id: UUID, summary: str, summary_until: datetime) -> None:
+        raise NotImplementedError
+
+    async def delete_session(self, session_id: UUID) -> bool:
+        raise NotImplementedError
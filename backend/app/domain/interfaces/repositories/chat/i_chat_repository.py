@@ -1,4 +1,5 @@
-from typing import Optional, List, Any
+from datetime import datetime
+from typing import Optional, List, Any, Tuple
 from uuid import UUID
 
 class IChatRepository:
@@ -7,10 +8,10 @@ class IChatRepository:
     def create_session(self, user_id: UUID, title: str) -> Any:
         raise NotImplementedError
 
-    def get_session_by_id(self, session_id: UUID) -> Optional[Any]:
+    def get_session_by_id(self, session_id: UUID, user_id: Optional[UUID] = None) -> Optional[Any]:
         raise NotImplementedError
 
-    def get_sessions_by_user(self, user_id: UUID) -> List[Any]:
+    def get_sessions_by_user(self, user_id: UUID, active_only: bool = True, limit: int = 20) -> List[Any]:
         raise NotImplementedError
 
     def add_message(self, session_id: UUID, message_type: str, content: str, **kwargs) -> Any:
@@ -19,5 +20,17 @@ class IChatRepository:
     def get_messages_by_session(self, session_id: UUID) -> List[Any]:
         raise NotImplementedError
 
+    def get_messages_after(self, session_id: UUID, after: Optional[datetime], limit: int) -> List[Any]:
+        raise NotImplementedError
+
+    def get_oldest_messages_after(self, session_id: UUID, after: Optional[datetime], limit: int) -> List[Any]:
+        raise NotImplementedError
+
+    def get_session_summary(self, session_id: UUID) -> Tuple[Optional[str], Optional[datetime]]:
+        raise NotImplementedError
+
+    def update_session_summary(self, session_id: UUID, summary: str, summary_until: datetime) -> None:
+        raise NotImplementedError
+
     def delete_session(self, session_id: UUID) -> bool:
         raise NotImplementedError
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import List, Optional
+from uuid import UUID
+from app.domain.entities.document_chunk import DocumentChunk
+
+class IAsyncDocumentChunkRepository:
+    """Contrat d'accès asynchrone aux chunks de document RAG"""
+
+    async def add_chunk(self, chunk: DocumentChunk) -> None:
+        raise NotImplementedError
+
+    async def get_chunks_by_document_id(self, document_id: UUID) -> List[DocumentChunk]:
+        raise NotImplementedError
+
+    async def get_chunk_by_id(self, chunk_id: UUID) -> Optional[DocumentChunk]:
+        raise NotImplementedError
+
+    async def delete_chunk(self, chunk_id: UUID) -> None:
+        raise NotImplementedError
+
+    async def delete_chunks_by_document_id(self, document_id: UUID) -> None:
+        raise NotImplementedError
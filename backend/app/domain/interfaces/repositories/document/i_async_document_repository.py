@@ -0,0 +1,36 @@
+from typing import List, Optional
+from app.domain.entities.document import Document
+from uuid import UUID
+
+
+class IAsyncDocumentRepository:
+    """ Interface for asynchronous document repository operations. """
+    async def commit(self):
+        raise NotImplementedError
+
+    async def refresh(self, document: Document) -> Document:
+        raise NotImplementedError
+
+    async def flush(self):
+        raise NotImplementedError
+
+    async def add_document(self, document: Document) -> Document:
+        raise NotImplementedError
+
+    async def get_document_by_id(self, document_id: UUID) -> Optional[Document]:
+        raise NotImplementedError
+
+    async def get_document_by_filename(self, filename: str) -> Optional[Document]:
+        raise NotImplementedError
+
+    async def get_all_documents(self, user_id: UUID) -> List[Document]:
+        raise NotImplementedError
+
+    async def update_document(self, document: Document) -> Document:
+        raise NotImplementedError
+
+    async def delete_document(self, document_id: UUID) -> None:
+        raise NotImplementedError
+
+    async def rollback(self):
+        raise NotImplementedError
@@ -0,0 +1,29 @@
+from typing import Optional, Any
+from uuid import UUID
+
+class IAsyncUserRepository:
+    """Interface pour le repository utilisateur asynchrone"""
+
+    async def create_user(self, username: str, email: str, password: str) -> Any:
+        raise NotImplementedError
+
+    async def get_user_by_id(self, user_id: UUID) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def get_user_by_username(self, username: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def get_user_by_email(self, email: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def update_user(self, user_id: UUID, **kwargs) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def deactivate_user(self, user_id: UUID) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def delete_user(self, user_id: UUID) -> bool:
+        raise NotImplementedError
@@ -22,6 +22,9 @@ class IUserRepository:
     def update_user(self, user_id: UUID, **kwargs) -> Optional[Any]:
         raise NotImplementedError
     
+    def deactivate_user(self, user_id: UUID) -> Optional[Any]:
+        raise NotImplementedError
+    
     def delete_user(self, user_id: UUID) -> bool:
         raise NotImplementedError
     
@@ -1,7 +1,7 @@
 from fastapi import UploadFile, File, HTTPException, Form
 from typing import Optional
-from app.domain.interfaces.repositories.document.i_document_repository import IDocumentRepository
-from app.domain.interfaces.repositories.document.i_document_chunk_repository import IDocumentChunkRepository
+from app.domain.interfaces.repositories.document.i_async_document_repository import IAsyncDocumentRepository
+from app.domain.interfaces.repositories.document.i_async_document_chunk_repository import IAsyncDocumentChunkRepository
 from sqlalchemy.orm import Session
 from app.domain.entities.document import Document
 
@@ -9,8 +9,8 @@ class IDocumentService:
     async def process_document(
         self,
         user_id: str,
-        document_repository: IDocumentRepository,
-        document_chunk_repository: IDocumentChunkRepository,
+        document_repository: IAsyncDocumentRepository,
+        document_chunk_repository: IAsyncDocumentChunkRepository,
         title: Optional[str] = Form(None),
         file: UploadFile = File(...),
     ) -> Document:
@@ -1,4 +1,5 @@
 from typing import List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.domain.interfaces.repositories.document.i_document_chunk_repository import IDocumentChunkRepository
 
@@ -18,7 +19,7 @@ class IRagService:
         self, 
         query: str, 
         user_id: str,
-        db: Session,
+        db: AsyncSession,
         top_k: int = 5,
         similarity_threshold: float = 0.65
     ) -> List[Dict[str, Any]]:
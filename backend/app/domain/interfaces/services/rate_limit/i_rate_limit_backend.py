@@ -0,0 +1,9 @@
+class IRateLimitBackend:
+    """Contrat de stockage des seaux à jetons (token buckets) de limitation de débit"""
+
+    async def acquire(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> float:
+        """Consommer `cost` jetons ; 0 si accepté, sinon délai en secondes avant qu'ils soient disponibles"""
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
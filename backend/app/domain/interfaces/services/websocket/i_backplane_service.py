@@ -0,0 +1,16 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+RemoteMessageHandler = Callable[[str, Dict[str, Any], Optional[str]], Awaitable[None]]
+
+
+class IBackplaneService:
+    """Contrat de diffusion des messages de room entre workers/nœuds"""
+
+    async def start(self, handler: RemoteMessageHandler) -> None:
+        raise NotImplementedError
+
+    async def publish(self, room_id: str, message: Dict[str, Any], exclude_user: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
@@ -1,21 +1,33 @@
 """
 Configuration de la base de données PostgreSQL
 """
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.settings import settings
+from app.infrastructure.database_pool import database_pool_metrics, engine_options, pool_status
 
 engine = create_engine(
     settings.DATABASE_URL,
-    poolclass=NullPool,
-    echo=settings.DEBUG,  
-    connect_args={"options": "-c statement_timeout=30000"}  
+    echo=settings.DEBUG,
+    **engine_options("sync")
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    settings.DATABASE_URL_ASYNC,
+    echo=settings.DEBUG,
+    **engine_options("async", asynchronous=True)
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -28,6 +40,44 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Session courte pour une unité de travail hors requête HTTP (WebSocket,
+    tâches de fond) : la connexion n'est tenue que le temps du bloc.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency pour obtenir une session asynchrone (asyncpg)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Équivalent asynchrone de session_scope : les requêtes n'occupent pas la
+    boucle d'événements pendant l'attente de la base.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Occupation et latences d'obtention de connexion des engines sync et async"""
+    return {
+        "mode": settings.DB_POOL_MODE,
+        "sync": {**pool_status(engine.pool), **database_pool_metrics.get_stats("sync")},
+        "async": {**pool_status(async_engine.pool), **database_pool_metrics.get_stats("async")},
+    }
+
+
 def create_tables():
     """Créer toutes les tables (pour les tests)"""
     Base.metadata.create_all(bind=engine)
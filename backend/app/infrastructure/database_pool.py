@@ -0,0 +1,177 @@
+"""
+Pool de connexions PostgreSQL instrumenté
+Architecture Clean - Couche Infrastructure
+"""
+import time
+import uuid
+from collections import deque
+from threading import Lock
+from typing import Any, Dict, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from app.core.settings import settings
+
+POOL_MODES = ("pooled", "pgbouncer", "null")
+
+
+class DatabasePoolMetrics:
+    """
+    Compteurs et latences d'obtention de connexion, par engine
+
+    checkout_ms : temps pour obtenir une connexion du pool (attente d'une
+    connexion libre, plus ouverture si le pool grandit) ; connect_ms : temps
+    d'ouverture d'une connexion neuve (TCP, TLS, authentification).
+    Seules les SAMPLE_SIZE dernières mesures sont gardées pour les percentiles.
+    """
+
+    SAMPLE_SIZE = 1000
+
+    def __init__(self):
+        self._pools: Dict[str, Dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def record_checkout(self, name: str, checkout_ms: float) -> None:
+        """Enregistrer l'obtention d'une connexion"""
+        with self._lock:
+            stats = self._entry(name)
+            stats["checkouts"] += 1
+            stats["checkout"].append(checkout_ms)
+
+    def record_connect(self, name: str, connect_ms: float) -> None:
+        """Enregistrer l'ouverture d'une connexion neuve"""
+        with self._lock:
+            stats = self._entry(name)
+            stats["connects"] += 1
+            stats["connect"].append(connect_ms)
+
+    def record_timeout(self, name: str) -> None:
+        """Compter une attente de connexion ayant dépassé DB_POOL_TIMEOUT_SECONDS"""
+        with self._lock:
+            self._entry(name)["timeouts"] += 1
+
+    def get_stats(self, name: str) -> Dict[str, Any]:
+        """Compteurs et percentiles p50/p95/max d'un engine"""
+        with self._lock:
+            stats = self._entry(name)
+            checkouts, connects, timeouts = stats["checkouts"], stats["connects"], stats["timeouts"]
+            checkout, connect = list(stats["checkout"]), list(stats["connect"])
+
+        return {
+            "checkouts": checkouts,
+            "connects": connects,
+            "timeouts": timeouts,
+            "checkout_ms": self._summarize(checkout),
+            "connect_ms": self._summarize(connect),
+        }
+
+    def reset(self) -> None:
+        """Réinitialiser les compteurs"""
+        with self._lock:
+            self._pools.clear()
+
+    # ==================== Private methods ====================
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        stats = self._pools.get(name)
+        if stats is None:
+            stats = self._pools[name] = {
+                "checkouts": 0,
+                "connects": 0,
+                "timeouts": 0,
+                "checkout": deque(maxlen=self.SAMPLE_SIZE),
+                "connect": deque(maxlen=self.SAMPLE_SIZE),
+            }
+        return stats
+
+    @staticmethod
+    def _summarize(samples) -> Dict[str, Any]:
+        if not samples:
+            return {"p50": None, "p95": None, "max": None}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "p50": round(ordered[last // 2], 3),
+            "p95": round(ordered[int(last * 0.95)], 3),
+            "max": round(ordered[last], 3),
+        }
+
+
+database_pool_metrics = DatabasePoolMetrics()
+
+
+class _InstrumentedPool:
+    """Mesure l'obtention et l'ouverture des connexions d'un pool SQLAlchemy"""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            database_pool_metrics.record_timeout(self.metrics_name)
+            raise
+        finally:
+            database_pool_metrics.record_checkout(self.metrics_name, (time.perf_counter() - start) * 1000)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        connection = super()._create_connection()
+        database_pool_metrics.record_connect(self.metrics_name, (time.perf_counter() - start) * 1000)
+        return connection
+
+
+def engine_options(name: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """
+    Arguments de create_engine / create_async_engine selon DB_POOL_MODE
+
+    - pooled : pool borné (taille, débordement, recyclage, pre-ping) ;
+    - pgbouncer : PgBouncer en mode transaction tient le pool, l'application
+      ouvre une connexion par session vers lui ; ni paramètre de démarrage
+      `options` (refusé par PgBouncer) ni requêtes préparées nommées côté
+      asyncpg. Le statement_timeout se règle alors sur le rôle PostgreSQL ;
+    - null : une connexion neuve par session (comportement historique).
+    """
+    mode = settings.DB_POOL_MODE
+    if mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE invalide: {mode} (attendu: {', '.join(POOL_MODES)})")
+
+    if mode == "pooled":
+        base: Type[Pool] = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    else:
+        base = NullPool
+    options: Dict[str, Any] = {
+        "poolclass": type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"metrics_name": name}),
+    }
+    if mode == "pooled":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    if mode == "pgbouncer":
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        } if asynchronous else {}
+    elif asynchronous:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    else:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Occupation instantanée d'un pool (connexions prêtées, en débordement, au repos)"""
+    if isinstance(pool, QueuePool):
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        }
+    return {"size": 0, "checked_out": None, "checked_in": 0, "overflow": 0}
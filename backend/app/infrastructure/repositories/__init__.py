@@ -1,11 +1,19 @@
 from .user.user_repository import UserRepository
+from .user.async_user_repository import AsyncUserRepository
 from .document.document_repository import DocumentRepository
+from .document.async_document_repository import AsyncDocumentRepository
 from .document.document_chunk_repository import DocumentChunkRepository
+from .document.async_document_chunk_repository import AsyncDocumentChunkRepository
 from .chat.chat_repository import ChatRepository
+from .chat.async_chat_repository import AsyncChatRepository
 
 __all__ = [
     "UserRepository",
+    "AsyncUserRepository",
     "DocumentRepository",
+    "AsyncDocumentRepository",
     "DocumentChunkRepository",
+    "AsyncDocumentChunkRepository",
     "ChatRepository",
-]
\ No newline at end of file
+    "AsyncChatRepository",
+]
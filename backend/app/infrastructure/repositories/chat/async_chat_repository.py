@@ -0,0 +1,181 @@
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.interfaces.repositories.chat.i_async_chat_repository import IAsyncChatRepository
+from app.domain.entities.chat_message import ChatMessage
+from app.domain.entities.chat_session import ChatSession
+from app.infrastructure.repositories.chat.chat_repository import ChatRepository
+from uuid import UUID
+
+class AsyncChatRepository(IAsyncChatRepository):
+    """Repository asynchrone pour la gestion des chats"""
+    
+    METRIC_FIELDS = ChatRepository.METRIC_FIELDS
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_session(self, user_id: UUID, title: str = "Nouvelle conversation") -> ChatSession:
+        """Créer une nouvelle session de chat"""
+        session = ChatSession(
+            user_id=user_id,
+            title=title
+        )
+        
+        self.db.add(session)
+        await self.db.commit()
+        await self.db.refresh(session)
+        return session
+    
+    async def get_session_by_id(self, session_id: UUID, user_id: UUID) -> Optional[ChatSession]:
+        """Récupérer une session par ID et utilisateur (sécurité)"""
+        result = await self.db.execute(
+            select(ChatSession)
+            .where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+            .limit(1)
+        )
+        return result.scalars().first()
+    
+    async def get_sessions_by_user(self, user_id: UUID, active_only: bool = True, limit: int = 20) -> List[ChatSession]:
+        """Récupérer les sessions d'un utilisateur, les plus récemment actives d'abord"""
+        return await self.get_sessions_page(user_id, limit, active_only=active_only)
+    
+    async def get_sessions_page(
+        self,
+        user_id: UUID,
+        limit: int,
+        before: Optional[Tuple[datetime, UUID]] = None,
+        active_only: bool = True
+    ) -> List[ChatSession]:
+        """Page de sessions par (updated_at, id) décroissants, au-delà du curseur `before`
+
+        Parcours de l'index (user_id, updated_at, id) : coût indépendant du
+        nombre total de sessions de l'utilisateur.
+        """
+        query = select(ChatSession).where(ChatSession.user_id == user_id)
+        if active_only:
+            query = query.where(ChatSession.is_active)
+        if before is not None:
+            query = query.where(tuple_(ChatSession.updated_at, ChatSession.id) < tuple_(*before))
+        result = await self.db.execute(
+            query.order_by(ChatSession.updated_at.desc(), ChatSession.id.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def create_message(
+        self,
+        session_id: UUID,
+        message_type: str, 
+        content: str,
+        llm_used: Optional[str] = None,
+        tokens_used: Optional[int] = None,
+        response_time: Optional[int] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        message_id: Optional[UUID] = None
+    ) -> ChatMessage:
+        """Ajouter un message à une session (message_id permet de fixer l'id à l'avance)"""
+        message = ChatMessage(
+            session_id=session_id,
+            message_type=message_type,
+            content=content,
+            llm_used=llm_used,
+            tokens_used=tokens_used,
+            response_time=response_time
+        )
+        if message_id is not None:
+            message.id = message_id
+        if metrics:
+            for field in self.METRIC_FIELDS:
+                setattr(message, field, metrics.get(field))
+        
+        self.db.add(message)
+        await self.db.execute(
+            update(ChatSession).where(ChatSession.id == session_id).values(updated_at=func.now())
+        )
+        await self.db.commit()
+        await self.db.refresh(message)
+        return message
+    
+    async def get_session_messages(self, session_id: UUID) -> List[ChatMessage]:
+        """Récupérer tous les messages d'une session"""
+        result = await self.db.execute(
+            select(ChatMessage)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.asc())
+        )
+        return list(result.scalars().all())
+    
+    async def get_messages_page(
+        self,
+        session_id: UUID,
+        limit: int,
+        before: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[ChatMessage]:
+        """Page de messages par (created_at, id) décroissants, au-delà du curseur `before`
+
+        Parcours de l'index (session_id, created_at, id) : ouvrir une session
+        de 10 000 messages coûte autant qu'une petite.
+        """
+        query = select(ChatMessage).where(ChatMessage.session_id == session_id)
+        if before is not None:
+            query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(*before))
+        result = await self.db.execute(
+            query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def get_messages_after(
+        self,
+        session_id: UUID,
+        after: Optional[datetime],
+        limit: int
+    ) -> List[ChatMessage]:
+        """Récupérer les `limit` derniers messages postérieurs à `after` (ordre chronologique)"""
+        query = select(ChatMessage).where(ChatMessage.session_id == session_id)
+        if after is not None:
+            query = query.where(ChatMessage.created_at > after)
+        result = await self.db.execute(query.order_by(ChatMessage.created_at.desc()).limit(limit))
+        return list(reversed(result.scalars().all()))
+    
+    async def get_oldest_messages_after(
+        self,
+        session_id: UUID,
+        after: Optional[datetime],
+        limit: int
+    ) -> List[ChatMessage]:
+        """Récupérer les `limit` premiers messages postérieurs à `after` (ordre chronologique)"""
+        query = select(ChatMessage).where(ChatMessage.session_id == session_id)
+        if after is not None:
+            query = query.where(ChatMessage.created_at > after)
+        result = await self.db.execute(query.order_by(ChatMessage.created_at.asc()).limit(limit))
+        return list(result.scalars().all())
+    
+    async def get_session_summary(self, session_id: UUID) -> Tuple[Optional[str], Optional[datetime]]:
+        """Récupérer le résumé glissant d'une session et la date du dernier message résumé"""
+        result = await self.db.execute(
+            select(ChatSession.summary, ChatSession.summary_until).where(ChatSession.id == session_id)
+        )
+        row = result.first()
+        if not row:
+            return None, None
+        return row.summary, row.summary_until
+    
+    async def update_session_summary(self, session_id: UUID, summary: str, summary_until: datetime) -> None:
+        """Enregistrer le résumé glissant d'une session"""
+        await self.db.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id)
+            .values(summary=summary, summary_until=summary_until)
+        )
+        await self.db.commit()
+    
+    async def delete_session(self, session_id: UUID) -> bool:
+        """Supprimer une session et tous ses messages"""
+        session = await self.db.get(ChatSession, session_id)
+        if not session:
+            return False
+        
+        await self.db.delete(session)
+        await self.db.commit()
+        return True
@@ -1,4 +1,6 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.domain.interfaces.repositories.chat.i_chat_repository import IChatRepository
 from app.domain.entities.chat_message import ChatMessage
@@ -8,6 +10,15 @@ from uuid import UUID
 class ChatRepository(IChatRepository):
     """Repository pour la gestion des chats"""
     
+    METRIC_FIELDS = (
+        "prompt_eval_count",
+        "eval_count",
+        "prompt_eval_duration",
+        "eval_duration",
+        "load_duration",
+        "time_to_first_token",
+    )
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -23,16 +34,19 @@ class ChatRepository(IChatRepository):
         self.db.refresh(session)
         return session
     
-    def get_sessions_by_user(self, user_id: UUID, active_only: bool = True) -> List[ChatSession]:
-        """Récupérer les sessions d'un utilisateur"""
+    def get_sessions_by_user(self, user_id: UUID, active_only: bool = True, limit: int = 20) -> List[ChatSession]:
+        """Récupérer les sessions d'un utilisateur, les plus récemment actives d'abord"""
         query = self.db.query(ChatSession).filter(ChatSession.user_id == user_id)
         if active_only:
             query = query.filter(ChatSession.is_active)
-        return query.order_by(ChatSession.created_at.desc()).all()
+        return query.order_by(ChatSession.updated_at.desc(), ChatSession.id.desc()).limit(limit).all()
     
-    def get_session_by_id(self, session_id: UUID) -> Optional[ChatSession]:
-        """Récupérer une session par ID"""
-        return self.db.query(ChatSession).filter(ChatSession.id == session_id).first()
+    def get_session_by_id(self, session_id: UUID, user_id: Optional[UUID] = None) -> Optional[ChatSession]:
+        """Récupérer une session par ID, restreinte à son propriétaire si user_id est fourni"""
+        query = self.db.query(ChatSession).filter(ChatSession.id == session_id)
+        if user_id is not None:
+            query = query.filter(ChatSession.user_id == user_id)
+        return query.first()
     
     def add_message(
         self,
@@ -41,9 +55,11 @@ class ChatRepository(IChatRepository):
         content: str,
         llm_used: Optional[str] = None,
         tokens_used: Optional[int] = None,
-        response_time: Optional[int] = None
+        response_time: Optional[int] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        message_id: Optional[UUID] = None
     ) -> ChatMessage:
-        """Ajouter un message à une session"""
+        """Ajouter un message à une session (message_id permet de fixer l'id à l'avance)"""
         message = ChatMessage(
             session_id=session_id,
             message_type=message_type,
@@ -52,8 +68,16 @@ class ChatRepository(IChatRepository):
             tokens_used=tokens_used,
             response_time=response_time
         )
+        if message_id is not None:
+            message.id = message_id
+        if metrics:
+            for field in self.METRIC_FIELDS:
+                setattr(message, field, metrics.get(field))
         
         self.db.add(message)
+        self.db.query(ChatSession)\
+            .filter(ChatSession.id == session_id)\
+            .update({"updated_at": func.now()}, synchronize_session=False)
         self.db.commit()
         self.db.refresh(message)
         return message
@@ -65,6 +89,47 @@ class ChatRepository(IChatRepository):
             .order_by(ChatMessage.created_at.asc())\
             .all()
     
+    def get_messages_after(
+        self,
+        session_id: UUID,
+        after: Optional[datetime],
+        limit: int
+    ) -> List[ChatMessage]:
+        """Récupérer les `limit` derniers messages postérieurs à `after` (ordre chronologique)"""
+        query = self.db.query(ChatMessage).filter(ChatMessage.session_id == session_id)
+        if after is not None:
+            query = query.filter(ChatMessage.created_at > after)
+        messages = query.order_by(ChatMessage.created_at.desc()).limit(limit).all()
+        return list(reversed(messages))
+    
+    def get_oldest_messages_after(
+        self,
+        session_id: UUID,
+        after: Optional[datetime],
+        limit: int
+    ) -> List[ChatMessage]:
+        """Récupérer les `limit` premiers messages postérieurs à `after` (ordre chronologique)"""
+        query = self.db.query(ChatMessage).filter(ChatMessage.session_id == session_id)
+        if after is not None:
+            query = query.filter(ChatMessage.created_at > after)
+        return query.order_by(ChatMessage.created_at.asc()).limit(limit).all()
+    
+    def get_session_summary(self, session_id: UUID) -> Tuple[Optional[str], Optional[datetime]]:
+        """Récupérer le résumé glissant d'une session et la date du dernier message résumé"""
+        row = self.db.query(ChatSession.summary, ChatSession.summary_until)\
+            .filter(ChatSession.id == session_id)\
+            .first()
+        if not row:
+            return None, None
+        return row.summary, row.summary_until
+    
+    def update_session_summary(self, session_id: UUID, summary: str, summary_until: datetime) -> None:
+        """Enregistrer le résumé glissant d'une session"""
+        self.db.query(ChatSession)\
+            .filter(ChatSession.id == session_id)\
+            .update({"summary": summary, "summary_until": summary_until})
+        self.db.commit()
+    
     def update_session_title(self, session_id: UUID, title: str) -> Optional[ChatSession]:
         """Mettre à jour le titre d'une session"""
         session = self.get_session_by_id(session_id)
@@ -76,12 +141,6 @@ class ChatRepository(IChatRepository):
         self.db.refresh(session)
         return session
     
-    def get_session_by_id(self, session_id: UUID, user_id: UUID) -> Optional[ChatSession]:
-        """Récupérer une session par ID et utilisateur (sécurité)"""
-        return self.db.query(ChatSession)\
-            .filter(ChatSession.id == session_id, ChatSession.user_id == user_id)\
-            .first()
-    
     def create_message(
         self,
         session_id: UUID,
@@ -89,7 +148,9 @@ class ChatRepository(IChatRepository):
         content: str,
         llm_used: Optional[str] = None,
         tokens_used: Optional[int] = None,
-        response_time: Optional[int] = None
+        response_time: Optional[int] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        message_id: Optional[UUID] = None
     ) -> ChatMessage:
         """Créer un nouveau message (alias pour add_message)"""
         return self.add_message(
@@ -98,17 +159,11 @@ class ChatRepository(IChatRepository):
             content=content,
             llm_used=llm_used,
             tokens_used=tokens_used,
-            response_time=response_time
+            response_time=response_time,
+            metrics=metrics,
+            message_id=message_id
         )
     
-    def get_sessions_by_user(self, user_id: UUID, limit: int = 20) -> List[ChatSession]:
-        """Récupérer les sessions d'un utilisateur avec limite"""
-        return self.db.query(ChatSession)\
-            .filter(ChatSession.user_id == user_id)\
-            .order_by(ChatSession.updated_at.desc())\
-            .limit(limit)\
-            .all()
-    
     def delete_session(self, session_id: UUID) -> bool:
         """Supprimer une session et tous ses messages"""
         session = self.db.query(ChatSession).filter(ChatSession.id == session_id).first()
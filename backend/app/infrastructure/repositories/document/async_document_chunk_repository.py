@@ -0,0 +1,29 @@
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.entities.document_chunk import DocumentChunk
+from app.domain.interfaces.repositories.document.i_async_document_chunk_repository import IAsyncDocumentChunkRepository
+
+class AsyncDocumentChunkRepository(IAsyncDocumentChunkRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_chunk(self, chunk: DocumentChunk) -> None:
+        """Ajouter un chunk ; il est validé avec le document (commit du document repository)"""
+        self.db.add(chunk)
+
+    async def get_chunks_by_document_id(self, document_id: UUID) -> List[DocumentChunk]:
+        result = await self.db.execute(select(DocumentChunk).where(DocumentChunk.document_id == document_id))
+        return list(result.scalars().all())
+
+    async def get_chunk_by_id(self, chunk_id: UUID) -> Optional[DocumentChunk]:
+        return await self.db.get(DocumentChunk, chunk_id)
+
+    async def delete_chunk(self, chunk_id: UUID) -> None:
+        await self.db.execute(delete(DocumentChunk).where(DocumentChunk.id == chunk_id))
+        await self.db.commit()
+
+    async def delete_chunks_by_document_id(self, document_id: UUID) -> None:
+        await self.db.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document_id))
+        await self.db.commit()
@@ -0,0 +1,49 @@
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.entities.document import Document
+from app.domain.interfaces.repositories.document.i_async_document_repository import IAsyncDocumentRepository
+
+class AsyncDocumentRepository(IAsyncDocumentRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        
+    async def commit(self):
+        await self.db.commit()
+        
+    async def refresh(self, document: Document):
+        await self.db.refresh(document)
+        
+    async def flush(self):
+        await self.db.flush()
+
+    async def add_document(self, document: Document) -> Document:
+        self.db.add(document)
+        await self.db.flush()
+        await self.db.refresh(document)
+        return document
+
+    async def get_document_by_id(self, document_id: UUID) -> Optional[Document]:
+        return await self.db.get(Document, document_id)
+
+    async def get_document_by_filename(self, filename: str) -> Optional[Document]:
+        result = await self.db.execute(select(Document).where(Document.filename == filename).limit(1))
+        return result.scalars().first()
+
+    async def get_all_documents(self, user_id: UUID) -> List[Document]:
+        result = await self.db.execute(select(Document).where(Document.user_id == user_id))
+        return list(result.scalars().all())
+
+    async def update_document(self, document: Document) -> Document:
+        await self.db.merge(document)
+        await self.db.flush()
+        return document
+
+    async def delete_document(self, document_id: UUID) -> None:
+        """Suppression en une requête : la cascade ORM chargerait les chunks paresseusement"""
+        await self.db.execute(delete(Document).where(Document.id == document_id))
+        await self.db.commit()
+            
+    async def rollback(self):
+        await self.db.rollback()
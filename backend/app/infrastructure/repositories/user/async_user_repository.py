@@ -0,0 +1,99 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.domain.entities.user import User
+from app.domain.interfaces.repositories.user.i_async_user_repository import IAsyncUserRepository
+from uuid import UUID
+
+class AsyncUserRepository(IAsyncUserRepository):
+    """Repository asynchrone pour la gestion des utilisateurs"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_user(
+        self, 
+        username: str, 
+        email: str,
+        password: str, 
+    ) -> User:
+        """Créer un nouvel utilisateur"""
+        from app.infrastructure.services.auth.password_hasher_service import password_hasher
+        
+        hashed_password = await password_hasher.hash(password)
+        
+        user = User(
+            username=username,
+            email=email,
+            hashed_password=hashed_password,
+        )
+        
+        self.db.add(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+    
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        """Récupérer un utilisateur par nom d'utilisateur"""
+        result = await self.db.execute(select(User).where(User.username == username).limit(1))
+        return result.scalars().first()
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Récupérer un utilisateur par email"""
+        result = await self.db.execute(select(User).where(User.email == email).limit(1))
+        return result.scalars().first()
+    
+    async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
+        """Récupérer un utilisateur par ID"""
+        return await self.db.get(User, user_id)
+    
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """Authentifier un utilisateur"""
+        from app.infrastructure.services.auth.password_hasher_service import password_hasher
+        
+        user = await self.get_user_by_username(username)
+        if not user:
+            return None
+        if not await password_hasher.verify(password, user.hashed_password):
+            return None
+        return user
+    
+    async def update_user(self, user_id: UUID, **kwargs) -> Optional[User]:
+        """Mettre à jour un utilisateur"""
+        user = await self.get_user_by_id(user_id)
+        if not user:
+            return None
+        
+        for key, value in kwargs.items():
+            if hasattr(user, key):
+                setattr(user, key, value)
+        
+        await self.db.commit()
+        await self.db.refresh(user)
+        self._invalidate_auth_cache(user_id)
+        return user
+    
+    async def deactivate_user(self, user_id: UUID) -> Optional[User]:
+        """Désactiver un utilisateur ; ses tokens ne sont plus acceptés"""
+        return await self.update_user(user_id, is_active=False)
+    
+    async def delete_user(self, user_id: UUID) -> bool:
+        """Supprimer un utilisateur"""
+        user = await self.get_user_by_id(user_id)
+        if not user:
+            return False
+        
+        await self.db.delete(user)
+        await self.db.commit()
+        self._invalidate_auth_cache(user_id)
+        return True
+    
+    # ==================== Private methods ====================
+    
+    @staticmethod
+    def _invalidate_auth_cache(user_id: UUID):
+        """Retirer l'utilisateur du cache d'authentification après modification"""
+        from app.infrastructure.services.auth.auth_cache_service import auth_cache
+        
+        auth_cache.invalidate_user(user_id)
+
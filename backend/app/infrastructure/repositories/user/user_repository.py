@@ -67,8 +67,13 @@ class UserRepository(IUserRepository):
         
         self.db.commit()
         self.db.refresh(user)
+        self._invalidate_auth_cache(user_id)
         return user
     
+    def deactivate_user(self, user_id: UUID) -> Optional[User]:
+        """Désactiver un utilisateur ; ses tokens ne sont plus acceptés"""
+        return self.update_user(user_id, is_active=False)
+    
     def delete_user(self, user_id: UUID) -> bool:
         """Supprimer un utilisateur"""
         user = self.get_user_by_id(user_id)
@@ -77,4 +82,14 @@ class UserRepository(IUserRepository):
         
         self.db.delete(user)
         self.db.commit()
-        return True
\ No newline at end of file
+        self._invalidate_auth_cache(user_id)
+        return True
+    
+    # ==================== Private methods ====================
+    
+    @staticmethod
+    def _invalidate_auth_cache(user_id: UUID):
+        """Retirer l'utilisateur du cache d'authentification après modification"""
+        from app.infrastructure.services.auth.auth_cache_service import auth_cache
+        
+        auth_cache.invalidate_user(user_id)
@@ -0,0 +1,140 @@
+"""
+Cache TTL des utilisateurs authentifiés par token JWT
+Architecture Clean - Couche Infrastructure
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+from app.core.settings import settings
+from app.core.logging import logger
+from app.core.security import verify_token
+from app.infrastructure.database import async_session_scope
+from app.infrastructure.repositories.user.async_user_repository import AsyncUserRepository
+
+
+class AuthenticatedUser:
+    """Instantané de l'utilisateur authentifié, détaché de toute session de base"""
+
+    __slots__ = ("id", "username", "email", "is_active", "created_at", "payload")
+
+    def __init__(self, user: Any, token: str):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_active = user.is_active
+        self.created_at = user.created_at
+        self.payload = token
+
+    def __repr__(self):
+        return f"<AuthenticatedUser(username='{self.username}')>"
+
+
+class AuthCacheService:
+    """
+    Cache borné token vérifié → instantané utilisateur
+
+    Un token présent en cache n'est ni redécodé ni rechargé en base : les
+    requêtes HTTP et les connexions WebSocket d'un même client ne coûtent
+    aucune requête d'authentification une fois le premier appel fait. Une
+    entrée vit AUTH_CACHE_TTL_SECONDS (0 = cache désactivé), jamais au-delà
+    de l'expiration du token ; AUTH_CACHE_MAX_ENTRIES borne le cache (LRU).
+
+    Les repositories utilisateur appellent `invalidate_user` après une mise
+    à jour, une désactivation ou une suppression. L'invalidation est locale
+    au worker : sur les autres, le TTL borne la durée de l'instantané périmé.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def authenticate(self, token: str) -> Optional[AuthenticatedUser]:
+        """Utilisateur actif correspondant au token, depuis le cache ou après vérification et lecture en base"""
+        user = self._get(token)
+        if user is not None:
+            self.hits += 1
+            return user
+        self.misses += 1
+
+        payload = verify_token(token)
+        if payload is None or payload.get("sub") is None:
+            return None
+        async with async_session_scope() as db:
+            record = await AsyncUserRepository(db).get_user_by_username(payload["sub"])
+            if record is None or not record.is_active:
+                return None
+            user = AuthenticatedUser(record, token)
+
+        self._put(token, user, payload.get("exp"))
+        return user
+
+    def invalidate_user(self, user_id: Any):
+        """Oublier tous les tokens en cache d'un utilisateur"""
+        tokens = self._tokens_by_user.pop(str(user_id), set())
+        for token in tokens:
+            self._entries.pop(token, None)
+        if tokens:
+            self.invalidations += len(tokens)
+            logger.info(f"Cache d'authentification invalidé pour l'utilisateur {user_id} ({len(tokens)} token(s))")
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille du cache, hits, misses et taux de hits"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": settings.AUTH_CACHE_MAX_ENTRIES,
+            "ttl_seconds": settings.AUTH_CACHE_TTL_SECONDS,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    # ==================== Private methods ====================
+
+    def _get(self, token: str) -> Optional[AuthenticatedUser]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(token, user)
+            return None
+        self._entries.move_to_end(token)
+        return user
+
+    def _put(self, token: str, user: AuthenticatedUser, exp: Optional[Any]):
+        ttl = settings.AUTH_CACHE_TTL_SECONDS
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        if ttl <= 0 or settings.AUTH_CACHE_MAX_ENTRIES <= 0:
+            return
+
+        self._entries[token] = (user, time.monotonic() + ttl)
+        self._entries.move_to_end(token)
+        self._tokens_by_user.setdefault(str(user.id), set()).add(token)
+        while len(self._entries) > settings.AUTH_CACHE_MAX_ENTRIES:
+            oldest, (oldest_user, _) = next(iter(self._entries.items()))
+            self._remove(oldest, oldest_user)
+            self.evictions += 1
+
+    def _remove(self, token: str, user: AuthenticatedUser):
+        self._entries.pop(token, None)
+        tokens = self._tokens_by_user.get(str(user.id))
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[str(user.id)]
+
+
+auth_cache = AuthCacheService()
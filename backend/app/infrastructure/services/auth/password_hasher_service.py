@@ -0,0 +1,142 @@
+"""
+Hachage et vérification Argon2 hors de la boucle d'événements
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from app.core.settings import settings
+from app.core.logging import logger
+from app.core.security import get_password_hash, verify_password
+
+
+def _hash(password: str) -> str:
+    return get_password_hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+def _warm_up() -> None:
+    """Tâche vide : force l'import du module (et de pwd_context) dans le worker"""
+    return None
+
+
+class PasswordHasherService:
+    """
+    Exécute Argon2 dans un pool de PASSWORD_HASH_WORKERS processus
+
+    Un hachage Argon2 coûte des dizaines de millisecondes de CPU : exécuté
+    dans la boucle, il gèle tous les streams WebSocket du worker. Le pool est
+    borné (au plus PASSWORD_HASH_WORKERS calculs simultanés, les autres
+    attendent leur tour) et démarré en mode spawn pour ne pas dupliquer les
+    connexions et threads du processus parent. PASSWORD_HASH_WORKERS = 0
+    garde le calcul dans la boucle (comportement historique, mesures).
+
+    Les paramètres de coût (ARGON2_*) sont lus par pwd_context dans chaque
+    processus ; les hachages existants restent vérifiables après changement.
+    Un worker mort casse tout le pool : il est alors recréé et le calcul
+    retenté une fois.
+    """
+
+    SAMPLE_SIZE = 1000
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.jobs = 0
+        self.failures = 0
+        self.restarts = 0
+        self._durations: deque = deque(maxlen=self.SAMPLE_SIZE)
+
+    def start(self):
+        """Démarrer et préchauffer le pool (idempotent)"""
+        executor = self._get_executor()
+        if executor is not None:
+            for _ in range(settings.PASSWORD_HASH_WORKERS):
+                executor.submit(_warm_up)
+
+    async def stop(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def hash(self, password: str) -> str:
+        """Hacher un mot de passe"""
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Vérifier un mot de passe"""
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calculs en cours, total, échecs et durée (attente + calcul) en ms"""
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "in_flight": self.in_flight,
+            "jobs": self.jobs,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "duration_ms": self._summarize(self._durations),
+        }
+
+    # ==================== Private methods ====================
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Pool Argon2 démarré ({settings.PASSWORD_HASH_WORKERS} processus)")
+        return self._executor
+
+    def _replace_executor(self, broken: ProcessPoolExecutor):
+        """Écarter un pool cassé ; les appels concurrents qui l'ont vu cassé ne le recréent qu'une fois"""
+        if self._executor is broken:
+            self._executor = None
+            self.restarts += 1
+            logger.warning("Pool Argon2 cassé (worker arrêté), recréation")
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, function: Callable, *args):
+        start = time.perf_counter()
+        self.in_flight += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return function(*args)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+            except BrokenProcessPool:
+                self._replace_executor(executor)
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), function, *args)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.jobs += 1
+            self._durations.append((time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _summarize(samples) -> Dict[str, Any]:
+        if not samples:
+            return {"p50": None, "p95": None, "max": None}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "p50": round(ordered[last // 2], 3),
+            "p95": round(ordered[int(last * 0.95)], 3),
+            "max": round(ordered[last], 3),
+        }
+
+
+password_hasher = PasswordHasherService()
@@ -0,0 +1,226 @@
+"""
+Persistance différée (write-behind) des messages de chat
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import bindparam, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from app.core.settings import settings
+from app.core.logging import logger
+from app.domain.entities.chat_message import ChatMessage
+from app.domain.entities.chat_session import ChatSession
+from app.infrastructure.database import async_session_scope
+from app.infrastructure.repositories.chat.chat_repository import ChatRepository
+
+
+class PendingMessage:
+    """Message accepté mais pas encore écrit en base ; id et created_at sont fixés à la soumission"""
+
+    __slots__ = ("id", "session_id", "created_at", "row", "persisted")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id = row["id"]
+        self.session_id = str(row["session_id"])
+        self.created_at = row["created_at"]
+        self.row = row
+        self.persisted: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class ChatMessageWriterService:
+    """
+    Écrit les messages de chat en arrière-plan par petits lots
+
+    `submit` attribue l'id (UUID) et l'horodatage côté application et rend
+    la main tout de suite : le message peut être diffusé avant d'être en
+    base. Une tâche unique insère les messages en attente dans une seule
+    transaction toutes les CHAT_WRITE_BEHIND_FLUSH_INTERVAL_MS ou dès
+    CHAT_WRITE_BEHIND_BATCH_SIZE messages. Un lot en échec est retenté
+    (CHAT_WRITE_BEHIND_MAX_RETRIES), puis réessayé message par message pour
+    isoler une ligne invalide. Une erreur de données ou de contrainte ne
+    passera pas mieux au prochain essai : le lot est alors isolé tout de
+    suite, sans bloquer la tâche d'écriture pendant les reprises.
+
+    Toute lecture d'historique doit d'abord appeler `flush(session_id)`, ou
+    compléter sa lecture avec `pending(session_id)` sans attendre l'écriture ;
+    `stop` vide la file à l'arrêt de l'application.
+    """
+
+    def __init__(self):
+        self._buffer: List[PendingMessage] = []
+        self._in_flight: Dict[str, Set[PendingMessage]] = {}
+        self._has_pending = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.last_batch_ms: Optional[float] = None
+
+    def start(self):
+        """Démarrer la tâche d'écriture (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Écrire tous les messages en attente puis arrêter la tâche"""
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        self._task = None
+
+    def submit(
+        self,
+        session_id: Any,
+        message_type: str,
+        content: str,
+        llm_used: Optional[str] = None,
+        tokens_used: Optional[int] = None,
+        response_time: Optional[int] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        message_id: Optional[uuid.UUID] = None
+    ) -> PendingMessage:
+        """Accepter un message pour écriture différée"""
+        row = {
+            "id": message_id or uuid.uuid4(),
+            "session_id": session_id if isinstance(session_id, uuid.UUID) else uuid.UUID(str(session_id)),
+            "message_type": message_type,
+            "content": content,
+            "llm_used": llm_used,
+            "tokens_used": tokens_used,
+            "response_time": response_time,
+            "created_at": datetime.utcnow(),  # même convention que now() sur les colonnes TIMESTAMP
+        }
+        for field in ChatRepository.METRIC_FIELDS:
+            row[field] = metrics.get(field) if metrics else None
+
+        message = PendingMessage(row)
+        self._buffer.append(message)
+        self._in_flight.setdefault(message.session_id, set()).add(message)
+        self._has_pending.set()
+        if len(self._buffer) >= settings.CHAT_WRITE_BEHIND_BATCH_SIZE:
+            self._urgent.set()
+        self.start()
+        return message
+
+    async def flush(self, session_id: Optional[Any] = None) -> bool:
+        """Attendre l'écriture des messages déjà soumis (d'une session, ou tous) ; False si certains ont échoué"""
+        if session_id is None:
+            pending = [message for messages in self._in_flight.values() for message in messages]
+        else:
+            pending = list(self._in_flight.get(str(session_id), ()))
+        if not pending:
+            return True
+
+        self.start()
+        self._urgent.set()
+        results = await asyncio.gather(*(asyncio.shield(message.persisted) for message in pending))
+        return all(results)
+
+    def pending(self, session_id: Any) -> List[PendingMessage]:
+        """Messages soumis d'une session pas encore confirmés en base (ordre chronologique)
+
+        À prendre avant de lire la base : un message absent de l'instantané y
+        est déjà écrit ; un message présent peut aussi y être (dédoublonner par id).
+        """
+        return sorted(self._in_flight.get(str(session_id), ()), key=lambda message: message.created_at)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Messages en attente, écrits, en échec et taille des lots"""
+        return {
+            "pending": sum(len(messages) for messages in self._in_flight.values()),
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "avg_batch_size": round(self.written / self.batches, 1) if self.batches else None,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
+    # ==================== Private methods ====================
+
+    async def _run(self):
+        interval = settings.CHAT_WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000
+        batch_size = settings.CHAT_WRITE_BEHIND_BATCH_SIZE
+        while True:
+            await self._has_pending.wait()
+            if not self._urgent.is_set():
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._urgent.clear()
+
+            while self._buffer:
+                batch = self._buffer[:batch_size]
+                del self._buffer[:batch_size]
+                await self._write(batch)
+            self._has_pending.clear()
+
+    async def _write(self, batch: List[PendingMessage]):
+        """Écrire un lot dans une transaction, avec reprises puis isolement des lignes en erreur"""
+        for attempt in range(settings.CHAT_WRITE_BEHIND_MAX_RETRIES + 1):
+            try:
+                start = time.perf_counter()
+                await self._insert(batch)
+                self.last_batch_ms = round((time.perf_counter() - start) * 1000, 2)
+                self.batches += 1
+                self._complete(batch, True)
+                return
+            except (DataError, IntegrityError) as e:
+                logger.warning(f"Écriture différée de {len(batch)} messages rejetée, isolement des lignes: {e}")
+                break
+            except Exception as e:
+                self.retries += 1
+                logger.warning(f"Écriture différée de {len(batch)} messages échouée (tentative {attempt + 1}): {e}")
+                await asyncio.sleep(min(0.1 * 2 ** attempt, 5))
+
+        for message in batch:
+            try:
+                await self._insert([message])
+                self._complete([message], True)
+            except Exception as e:
+                logger.error(f"Message {message.id} de la session {message.session_id} perdu: {e}")
+                self._complete([message], False)
+
+    @staticmethod
+    async def _insert(batch: List[PendingMessage]):
+        """Insérer le lot et avancer updated_at des sessions concernées, dans la même transaction"""
+        touched: Dict[Any, datetime] = {}
+        for message in batch:
+            session_id = message.row["session_id"]
+            touched[session_id] = max(touched.get(session_id, message.created_at), message.created_at)
+
+        sessions = ChatSession.__table__
+        async with async_session_scope() as db:
+            await db.execute(insert(ChatMessage), [message.row for message in batch])
+            await db.execute(
+                sessions.update()
+                .where(sessions.c.id == bindparam("touched_id"))
+                .values(updated_at=bindparam("touched_at")),
+                [{"touched_id": session_id, "touched_at": at} for session_id, at in touched.items()]
+            )
+            await db.commit()
+
+    def _complete(self, batch: List[PendingMessage], success: bool):
+        for message in batch:
+            if success:
+                self.written += 1
+            else:
+                self.failed += 1
+            messages = self._in_flight.get(message.session_id)
+            if messages is not None:
+                messages.discard(message)
+                if not messages:
+                    del self._in_flight[message.session_id]
+            if not message.persisted.done():
+                message.persisted.set_result(success)
+
+
+chat_message_writer = ChatMessageWriterService()
@@ -0,0 +1,183 @@
+"""
+Maintenance des partitions mensuelles de t7_chat_messages : création et archivage
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import gzip
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.settings import settings
+from app.core.logging import logger
+from app.infrastructure.database import async_engine
+
+PARTITION_NAME = re.compile(r"t7_chat_messages_p(\d{4})(\d{2})")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class ChatPartitionService:
+    """
+    Crée à l'avance les partitions mensuelles des messages et archive les anciennes
+
+    Une passe (`run_maintenance`) :
+    - crée les partitions du mois courant et des CHAT_PARTITION_MONTHS_AHEAD
+      suivants, pour que les insertions ne tombent jamais dans DEFAULT ;
+    - archive les partitions entièrement antérieures à
+      CHAT_ARCHIVE_RETENTION_MONTHS (0 = pas d'archivage) selon
+      CHAT_ARCHIVE_MODE : export en CSV gzip dans CHAT_ARCHIVE_DIR puis
+      détachement et suppression (export), ou détachement vers le schéma
+      t7_archive (detach). Le détachement est dans la même transaction que
+      la suppression ou le déplacement, après l'export : un échec laisse la
+      partition attachée, reprise à la passe suivante.
+
+    Un verrou consultatif garantit une seule passe à la fois entre workers.
+    """
+
+    ARCHIVE_SCHEMA = "t7_archive"
+    LOCK_KEY = 0x7C4A7
+    ARCHIVE_MODES = ("export", "detach")
+    ARCHIVE_COMPRESS_LEVEL = 3  # CSV très redondant : un niveau bas compresse presque autant pour bien moins de CPU
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[datetime] = None
+        self.partitions_created = 0
+        self.archived: List[str] = []
+
+    def start(self):
+        """Lancer la maintenance périodique (CHAT_PARTITION_MAINTENANCE_INTERVAL_HOURS, 0 = désactivée)"""
+        if self._task is None and settings.CHAT_PARTITION_MAINTENANCE_INTERVAL_HOURS > 0:
+            self._task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run_maintenance(self) -> Dict[str, Any]:
+        """Créer les partitions à venir puis archiver les partitions expirées"""
+        async with async_engine.connect() as conn:
+            locked = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.LOCK_KEY})).scalar()
+            if not locked:
+                logger.info("Maintenance des partitions déjà en cours sur un autre worker")
+                return {"skipped": True}
+            try:
+                created = await self.ensure_future_partitions(conn)
+                archived = await self.archive_expired_partitions(conn)
+            finally:
+                await conn.rollback()
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.LOCK_KEY})
+                await conn.commit()
+
+        self.last_run = datetime.utcnow()
+        return {"created": created, "archived": archived}
+
+    async def ensure_future_partitions(self, conn: AsyncConnection, months_ahead: Optional[int] = None) -> int:
+        """Créer les partitions manquantes du mois courant aux mois à venir"""
+        months_ahead = settings.CHAT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        created = (await conn.execute(
+            text("SELECT t7_create_chat_message_partitions(date_trunc('month', now())::date, :months)"),
+            {"months": months_ahead + 1}
+        )).scalar() or 0
+        await conn.commit()
+        if created:
+            self.partitions_created += created
+            logger.info(f"{created} partition(s) de t7_chat_messages créée(s)")
+        return created
+
+    async def archive_expired_partitions(self, conn: AsyncConnection, retention_months: Optional[int] = None) -> List[str]:
+        """Exporter puis supprimer, ou ranger, les partitions antérieures à la rétention"""
+        retention_months = settings.CHAT_ARCHIVE_RETENTION_MONTHS if retention_months is None else retention_months
+        if retention_months <= 0:
+            return []
+        mode = settings.CHAT_ARCHIVE_MODE
+        if mode not in self.ARCHIVE_MODES:
+            raise ValueError(f"CHAT_ARCHIVE_MODE invalide: {mode} (attendu: {', '.join(self.ARCHIVE_MODES)})")
+
+        today = datetime.utcnow().date()
+        cutoff = _add_months(date(today.year, today.month, 1), -retention_months)
+        archived = []
+        for name, month_start in await self.list_partitions(conn):
+            if _add_months(month_start, 1) > cutoff:
+                continue
+            if mode == "export":
+                path = await self._export(conn, name)
+                await conn.execute(text(f"ALTER TABLE t7_chat_messages DETACH PARTITION {name}"))
+                await conn.execute(text(f"DROP TABLE {name}"))
+                logger.info(f"Partition {name} exportée vers {path} puis supprimée")
+            else:
+                await conn.execute(text(f"ALTER TABLE t7_chat_messages DETACH PARTITION {name}"))
+                await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {self.ARCHIVE_SCHEMA}"))
+                await conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {self.ARCHIVE_SCHEMA}"))
+                logger.info(f"Partition {name} détachée vers le schéma {self.ARCHIVE_SCHEMA}")
+            await conn.commit()
+            archived.append(name)
+
+        self.archived.extend(archived)
+        return archived
+
+    async def list_partitions(self, conn: AsyncConnection) -> List[tuple]:
+        """Partitions mensuelles attachées : (nom, premier jour du mois), par ordre chronologique"""
+        rows = (await conn.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 't7_chat_messages'::regclass
+        """))).scalars().all()
+        partitions = []
+        for name in rows:
+            match = PARTITION_NAME.fullmatch(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "partitions_created": self.partitions_created,
+            "archived": list(self.archived),
+        }
+
+    # ==================== Private methods ====================
+
+    async def _maintenance_loop(self):
+        interval = settings.CHAT_PARTITION_MAINTENANCE_INTERVAL_HOURS * 3600
+        while True:
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.error(f"Erreur maintenance des partitions de messages: {e}")
+            await asyncio.sleep(interval)
+
+    async def _export(self, conn: AsyncConnection, name: str) -> Path:
+        """COPY de la partition (encore attachée) vers CHAT_ARCHIVE_DIR/<nom>.csv.gz
+
+        Compression et écritures se font dans un thread, bloc par bloc, pour
+        ne pas prendre la boucle d'événements aux streams en cours.
+        """
+        archive_dir = Path(settings.CHAT_ARCHIVE_DIR)
+        await asyncio.to_thread(archive_dir.mkdir, parents=True, exist_ok=True)
+        path = archive_dir / f"{name}.csv.gz"
+        partial = path.with_suffix(".gz.partial")
+
+        raw = await conn.get_raw_connection()
+        archive = await asyncio.to_thread(gzip.open, partial, "wb", self.ARCHIVE_COMPRESS_LEVEL)
+        try:
+            async def sink(chunk: bytes):
+                await asyncio.to_thread(archive.write, chunk)
+            await raw.driver_connection.copy_from_table(name, output=sink, format="csv", header=True)
+        finally:
+            await asyncio.to_thread(archive.close)
+        await asyncio.to_thread(os.replace, partial, path)
+        return path
+
+
+chat_partition_service = ChatPartitionService()
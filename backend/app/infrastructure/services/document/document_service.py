@@ -4,11 +4,11 @@ from typing import List, Optional
 from requests import Session
 from app.application.commands.document.document_upload_command.document_upload_validator import DocumentUploadValidator
 from app.application.dto.document.document_upload_dto import DocumentUploadDto
-from app.domain.interfaces.repositories.document.i_document_repository import (
-    IDocumentRepository,
+from app.domain.interfaces.repositories.document.i_async_document_repository import (
+    IAsyncDocumentRepository,
 )
-from app.domain.interfaces.repositories.document.i_document_chunk_repository import (
-    IDocumentChunkRepository,
+from app.domain.interfaces.repositories.document.i_async_document_chunk_repository import (
+    IAsyncDocumentChunkRepository,
 )
 from app.domain.interfaces.services.document.i_document_service import IDocumentService
 from app.domain.interfaces.services.rag.i_rag_service import IRagService
@@ -21,8 +21,8 @@ from app.infrastructure.services.rag.rag_service import RagService
 class DocumentService(IDocumentService):
     def __init__(
         self,
-        document_repository: IDocumentRepository,
-        document_chunk_repository: IDocumentChunkRepository,
+        document_repository: IAsyncDocumentRepository,
+        document_chunk_repository: IAsyncDocumentChunkRepository,
     ):
         self.document_repository = document_repository
         self.document_chunk_repository = document_chunk_repository
@@ -36,7 +36,7 @@ class DocumentService(IDocumentService):
         """Processus complet de gestion d'un document uploadé."""
         logger.info(f"Traitement document: {file.filename} pour utilisateur {user_id}")
 
-        existing_document = self.document_repository.get_document_by_filename(
+        existing_document = await self.document_repository.get_document_by_filename(
             file.filename
         )
         if existing_document:
@@ -0,0 +1,197 @@
+"""
+Mémoire conversationnelle sous budget de tokens avec résumés glissants
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.settings import settings
+from app.core.logging import logger
+from app.infrastructure.database import async_session_scope
+from app.infrastructure.repositories.chat.async_chat_repository import AsyncChatRepository
+from app.infrastructure.services.chat.chat_message_writer_service import chat_message_writer
+from app.infrastructure.services.ollama.ollama_service import OllamaService
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+SUMMARY_SYSTEM_MESSAGE = """Tu résumes des conversations entre un utilisateur et un assistant.
+Conserve les faits, décisions, préférences et questions en suspens. Réponds uniquement par le résumé, en français."""
+
+
+class SessionMemory:
+    """Résumé glissant d'une session et borne des messages déjà résumés"""
+
+    def __init__(self, summary: Optional[str] = None, summary_until: Optional[datetime] = None):
+        self.summary = summary
+        self.summary_until = summary_until
+
+
+class ConversationMemoryService:
+    """
+    Assemble l'historique d'une session sous un budget strict de tokens
+
+    L'historique envoyé au modèle est : résumé des anciens tours, puis les
+    messages postérieurs au résumé, mot pour mot. Quand ces derniers dépassent
+    CHAT_MEMORY_SUMMARY_TRIGGER_TOKENS, les plus anciens sont intégrés au
+    résumé en tâche de fond après la réponse. Entre deux résumés, l'historique
+    ne fait que s'allonger : le préfixe reste stable pour le cache Ollama.
+    """
+
+    def __init__(self, ollama_service: OllamaService):
+        self.ollama_service = ollama_service
+        self.tokenizer = tiktoken.get_encoding("cl100k_base") if TIKTOKEN_AVAILABLE else None
+        self._memories: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+
+    def count_tokens(self, text: str) -> int:
+        """Estimer le nombre de tokens d'un texte"""
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text))
+        return len(text) // 4 + 1
+
+    async def get_session_memory(self, chat_repo: AsyncChatRepository, session_id: str) -> SessionMemory:
+        """Résumé de la session, depuis le cache mémoire ou la base"""
+        memory = self._memories.get(session_id)
+        if memory is not None:
+            self._memories.move_to_end(session_id)
+            return memory
+
+        summary, summary_until = await chat_repo.get_session_summary(session_id)
+        memory = SessionMemory(summary, summary_until)
+        self._remember(session_id, memory)
+        return memory
+
+    async def build_history(
+        self,
+        chat_repo: AsyncChatRepository,
+        session_id: str,
+        exclude_message_id: Optional[Any] = None
+    ) -> List[Dict[str, str]]:
+        """Historique au format /api/chat, tenant dans CHAT_MEMORY_TOKEN_BUDGET
+
+        N'attend pas l'écriture différée : les messages encore en attente dans
+        le writer sont fusionnés avec ceux lus en base.
+        """
+        pending = chat_message_writer.pending(session_id)
+        memory = await self.get_session_memory(chat_repo, session_id)
+        stored = await chat_repo.get_messages_after(
+            session_id, memory.summary_until, settings.CHAT_MEMORY_MAX_MESSAGES
+        )
+        messages = [(m.id, m.message_type, m.content, m.created_at) for m in stored]
+        stored_ids = {message_id for message_id, _, _, _ in messages}
+        messages.extend(
+            (p.id, p.row["message_type"], p.row["content"], p.created_at)
+            for p in pending
+            if p.id not in stored_ids and (memory.summary_until is None or p.created_at > memory.summary_until)
+        )
+        messages.sort(key=lambda message: message[3])
+        messages = messages[-settings.CHAT_MEMORY_MAX_MESSAGES:]
+
+        budget = settings.CHAT_MEMORY_TOKEN_BUDGET
+        history: List[Dict[str, str]] = []
+        if memory.summary:
+            summary_message = {
+                "role": "system",
+                "content": f"Résumé de la conversation précédente: {memory.summary}"
+            }
+            budget -= self.count_tokens(summary_message["content"])
+            history.append(summary_message)
+
+        recent: List[Dict[str, str]] = []
+        for message_id, message_type, content, _ in reversed(messages):
+            if message_id == exclude_message_id or message_type not in ("user", "assistant"):
+                continue
+            tokens = self.count_tokens(content)
+            if tokens > budget:
+                break
+            budget -= tokens
+            recent.append({"role": message_type, "content": content})
+        recent.reverse()
+
+        history.extend(recent)
+        logger.debug(
+            f"Mémoire session {session_id}: {len(recent)} messages récents, "
+            f"{settings.CHAT_MEMORY_TOKEN_BUDGET - budget} tokens"
+        )
+        return history
+
+    def schedule_summary(self, session_id: str, model: Optional[str] = None):
+        """Lancer la mise à jour du résumé en arrière-plan (une seule à la fois par session)"""
+        task = self._summary_tasks.get(session_id)
+        if task is not None and not task.done():
+            return
+        self._summary_tasks[session_id] = asyncio.create_task(
+            self._update_summary(session_id, model)
+        )
+
+    async def _update_summary(self, session_id: str, model: Optional[str]):
+        """Intégrer les anciens messages au résumé si le volume dépasse le seuil
+
+        Les messages non résumés sont lus du plus ancien au plus récent, pour
+        n'en sauter aucun : au plus CHAT_MEMORY_MAX_MESSAGES sont intégrés par
+        passe, jamais les CHAT_MEMORY_RECENT_MESSAGES derniers de la session.
+        Aucune connexion n'est tenue pendant la génération du résumé : lecture
+        et écriture se font dans deux sessions courtes.
+        """
+        limit = settings.CHAT_MEMORY_MAX_MESSAGES + settings.CHAT_MEMORY_RECENT_MESSAGES
+        try:
+            await chat_message_writer.flush(session_id)
+            async with async_session_scope() as db:
+                chat_repo = AsyncChatRepository(db)
+                memory = await self.get_session_memory(chat_repo, session_id)
+                messages = [
+                    (m.message_type, m.content, m.created_at)
+                    for m in await chat_repo.get_oldest_messages_after(session_id, memory.summary_until, limit)
+                ]
+
+            verbatim_tokens = sum(self.count_tokens(content) for _, content, _ in messages)
+            if verbatim_tokens <= settings.CHAT_MEMORY_SUMMARY_TRIGGER_TOKENS and len(messages) < limit:
+                return
+
+            to_fold = messages[:max(0, len(messages) - settings.CHAT_MEMORY_RECENT_MESSAGES)]
+            to_fold = to_fold[:settings.CHAT_MEMORY_MAX_MESSAGES]
+            if not to_fold:
+                return
+
+            transcript = "\n".join(
+                f"{'Utilisateur' if message_type == 'user' else 'Assistant'}: {content}"
+                for message_type, content, _ in to_fold
+            )
+            prompt = (
+                f"Résumé actuel:\n{memory.summary or '(aucun)'}\n\n"
+                f"Nouveaux échanges:\n{transcript}\n\n"
+                "Rédige le résumé mis à jour de toute la conversation."
+            )
+            result = await self.ollama_service.generate_response(
+                prompt=prompt,
+                model=model,
+                system_message=SUMMARY_SYSTEM_MESSAGE,
+                max_tokens=settings.CHAT_MEMORY_SUMMARY_MAX_TOKENS,
+                temperature=0.2
+            )
+            if not result["success"]:
+                logger.warning(f"Résumé de la session {session_id} non mis à jour: {result['error']}")
+                return
+
+            updated = SessionMemory(result["response"], to_fold[-1][2])
+            async with async_session_scope() as db:
+                await AsyncChatRepository(db).update_session_summary(session_id, updated.summary, updated.summary_until)
+            self._remember(session_id, updated)
+            logger.info(f"Résumé de la session {session_id} mis à jour ({len(to_fold)} messages intégrés)")
+        except Exception as e:
+            logger.error(f"Erreur mise à jour du résumé de la session {session_id}: {e}")
+        finally:
+            self._summary_tasks.pop(session_id, None)
+
+    def _remember(self, session_id: str, memory: SessionMemory):
+        """Mettre en cache le résumé d'une session (LRU borné)"""
+        self._memories[session_id] = memory
+        self._memories.move_to_end(session_id)
+        while len(self._memories) > settings.CHAT_MEMORY_CACHE_SIZE:
+            self._memories.popitem(last=False)
@@ -0,0 +1,124 @@
+"""
+Métriques de génération Ollama (tokens, durées, débit) par modèle
+Architecture Clean - Couche Infrastructure
+"""
+from threading import Lock
+from typing import Any, Dict, Optional
+
+
+OLLAMA_TIMING_FIELDS = (
+    "prompt_eval_count",
+    "eval_count",
+    "prompt_eval_duration",
+    "eval_duration",
+    "load_duration",
+    "total_duration",
+)
+
+
+def extract_generation_metrics(
+    chunk: Dict[str, Any],
+    time_to_first_token: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Extraire les compteurs Ollama du chunk final (done=True)
+
+    Les durées Ollama sont exprimées en nanosecondes.
+    time_to_first_token est mesuré côté backend, en millisecondes.
+    """
+    metrics: Dict[str, Any] = {
+        field: chunk.get(field) for field in OLLAMA_TIMING_FIELDS
+    }
+    metrics["time_to_first_token"] = time_to_first_token
+
+    eval_count = metrics["eval_count"]
+    eval_duration = metrics["eval_duration"]
+    metrics["tokens_per_second"] = (
+        round(eval_count / (eval_duration / 1e9), 2)
+        if eval_count and eval_duration else None
+    )
+
+    prompt_eval_count = metrics["prompt_eval_count"]
+    prompt_eval_duration = metrics["prompt_eval_duration"]
+    metrics["prompt_tokens_per_second"] = (
+        round(prompt_eval_count / (prompt_eval_duration / 1e9), 2)
+        if prompt_eval_count and prompt_eval_duration else None
+    )
+    return metrics
+
+
+class OllamaMetrics:
+    """Agrégation des métriques de génération par modèle"""
+
+    def __init__(self):
+        self._models: Dict[str, Dict[str, float]] = {}
+        self._lock = Lock()
+
+    def record(self, model: str, metrics: Dict[str, Any]) -> None:
+        """Enregistrer les métriques d'une génération terminée"""
+        with self._lock:
+            stats = self._models.setdefault(model, {
+                "generations": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "prompt_eval_ns": 0,
+                "eval_ns": 0,
+                "load_ns": 0,
+                "ttft_samples": 0,
+                "ttft_total_ms": 0,
+                "ttft_max_ms": 0,
+            })
+            stats["generations"] += 1
+            stats["prompt_tokens"] += metrics.get("prompt_eval_count") or 0
+            stats["completion_tokens"] += metrics.get("eval_count") or 0
+            stats["prompt_eval_ns"] += metrics.get("prompt_eval_duration") or 0
+            stats["eval_ns"] += metrics.get("eval_duration") or 0
+            stats["load_ns"] += metrics.get("load_duration") or 0
+
+            ttft = metrics.get("time_to_first_token")
+            if ttft is not None:
+                stats["ttft_samples"] += 1
+                stats["ttft_total_ms"] += ttft
+                stats["ttft_max_ms"] = max(stats["ttft_max_ms"], ttft)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques agrégées : TTFT, tokens/s, taille moyenne de prefill"""
+        with self._lock:
+            snapshot = {model: dict(stats) for model, stats in self._models.items()}
+
+        report = {}
+        for model, stats in snapshot.items():
+            generations = stats["generations"]
+            report[model] = {
+                "generations": generations,
+                "prompt_tokens": int(stats["prompt_tokens"]),
+                "completion_tokens": int(stats["completion_tokens"]),
+                "avg_prompt_tokens": round(stats["prompt_tokens"] / generations, 1),
+                "avg_completion_tokens": round(stats["completion_tokens"] / generations, 1),
+                "avg_prefill_ms": round(stats["prompt_eval_ns"] / generations / 1e6, 1),
+                "avg_load_ms": round(stats["load_ns"] / generations / 1e6, 1),
+                "tokens_per_second": (
+                    round(stats["completion_tokens"] / (stats["eval_ns"] / 1e9), 2)
+                    if stats["eval_ns"] else None
+                ),
+                "prompt_tokens_per_second": (
+                    round(stats["prompt_tokens"] / (stats["prompt_eval_ns"] / 1e9), 2)
+                    if stats["prompt_eval_ns"] else None
+                ),
+                "avg_time_to_first_token_ms": (
+                    round(stats["ttft_total_ms"] / stats["ttft_samples"], 1)
+                    if stats["ttft_samples"] else None
+                ),
+                "max_time_to_first_token_ms": (
+                    int(stats["ttft_max_ms"]) if stats["ttft_samples"] else None
+                ),
+            }
+        return report
+
+    def reset(self) -> None:
+        """Réinitialiser les compteurs"""
+        with self._lock:
+            self._models.clear()
+
+
+ollama_metrics = OllamaMetrics()
@@ -8,15 +8,23 @@ import httpx
 import ollama
 from app.core.settings import settings
 from app.core.logging import logger
+from app.infrastructure.services.ollama.ollama_metrics import (
+    extract_generation_metrics,
+    ollama_metrics,
+)
 
 
 class OllamaService:
     """Service pour communiquer avec Ollama"""
     
+    DEFAULT_SYSTEM_MESSAGE = """Tu es un assistant IA serviable, précis et professionnel. 
+Réponds de manière claire et concise en français."""
+    
     def __init__(self):
         self.base_url = settings.OLLAMA_BASE_URL
         self.default_model = settings.OLLAMA_MODEL
         self.client = ollama.Client(host=self.base_url)
+        self.async_client = ollama.AsyncClient(host=self.base_url)
     
     async def is_ollama_available(self) -> bool:
         """Vérifier si Ollama est disponible"""
@@ -48,6 +56,10 @@ class OllamaService:
             logger.error(f"Erreur lors du téléchargement du modèle {model_name}: {e}")
             return False
     
+    def get_generation_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques de génération par modèle (TTFT, tokens/s, prefill)"""
+        return ollama_metrics.get_stats()
+    
     async def generate_response(
         self, 
         prompt: str, 
@@ -81,7 +93,7 @@ class OllamaService:
             import time
             start_time = time.time()
             
-            response = self.client.generate(
+            response = await self.async_client.generate(
                 model=model,
                 prompt=final_prompt,
                 options={
@@ -95,13 +107,19 @@ class OllamaService:
             end_time = time.time()
             response_time = int((end_time - start_time) * 1000)  
             
-            logger.info(f"Réponse générée en {response_time}ms")
+            metrics = extract_generation_metrics(response)
+            ollama_metrics.record(model, metrics)
+            logger.info(
+                f"Réponse générée en {response_time}ms "
+                f"({metrics['prompt_eval_count']} tokens prompt, {metrics['eval_count']} tokens générés)"
+            )
             
             return {
                 'response': response['response'].strip(),
                 'model': model,
                 'response_time': response_time,
-                'tokens_used': len(response['response'].split()),  
+                'tokens_used': metrics['eval_count'],
+                'metrics': metrics,
                 'success': True,
                 'error': None
             }
@@ -113,6 +131,7 @@ class OllamaService:
                 'model': model,
                 'response_time': 0,
                 'tokens_used': 0,
+                'metrics': None,
                 'success': False,
                 'error': str(e)
             }
@@ -127,10 +146,7 @@ class OllamaService:
         
         parts = []
         
-        default_system = """Tu es un assistant IA serviable, précis et professionnel. 
-Réponds de manière claire et concise en français."""
-        
-        system = system_message or default_system
+        system = system_message or self.DEFAULT_SYSTEM_MESSAGE
         parts.append(f"System: {system}")
         
         if context:
@@ -148,13 +164,19 @@ Réponds de manière claire et concise en français."""
         system_message: Optional[str] = None,
         context: Optional[str] = None,
         max_tokens: int = 1000,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        metrics: Optional[Dict[str, Any]] = None
     ):
         """
         Générer une réponse en streaming avec Ollama
+        
+        Si `metrics` est fourni, il est rempli à la fin du stream avec les
+        compteurs Ollama du dernier chunk (prompt_eval_count, eval_count,
+        durées) ainsi que le time-to-first-token et le débit en tokens/s.
         """
 
         start_time = time.time()
+        first_token_time = None
         try:
             model = model or self.default_model
             logger.info(f"Streaming avec {model}: {prompt[:50]}...")
@@ -171,9 +193,104 @@ Réponds de manière claire et concise en français."""
                 },
                 stream=True
             ):
+                if first_token_time is None and chunk.get('response'):
+                    first_token_time = time.time()
+                if chunk.get('done'):
+                    ttft = (
+                        int((first_token_time - start_time) * 1000)
+                        if first_token_time is not None else None
+                    )
+                    final_metrics = extract_generation_metrics(chunk, ttft)
+                    ollama_metrics.record(model, final_metrics)
+                    if metrics is not None:
+                        metrics.update(final_metrics)
                 yield chunk['response']
             end_time = time.time()
             logger.info(f"Streaming terminé en {int((end_time - start_time) * 1000)}ms")
         except Exception as e:
             logger.error(f"Erreur streaming Ollama: {e}")
             yield f"[ERREUR] {str(e)}"
+    
+    def build_chat_messages(
+        self,
+        user_prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Construire les messages /api/chat avec un préfixe stable
+        
+        Le message système puis l'historique restent identiques d'un tour à
+        l'autre : Ollama réutilise le KV-cache déjà calculé pour ce préfixe et
+        ne refait le prefill que du dernier message. Le contexte RAG, propre
+        au tour courant, est donc placé dans le dernier message utilisateur.
+        """
+        messages = [{"role": "system", "content": system_message or self.DEFAULT_SYSTEM_MESSAGE}]
+        messages.extend(history or [])
+        
+        if context:
+            user_prompt = f"Contexte: {context}\n\nQuestion: {user_prompt}"
+        messages.append({"role": "user", "content": user_prompt})
+        return messages
+    
+    async def generate_chat_stream(
+        self,
+        prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        model: Optional[str] = None,
+        system_message: Optional[str] = None,
+        context: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        metrics: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Générer une réponse en streaming via /api/chat pour une session
+        
+        Args:
+            prompt: Le message utilisateur du tour courant
+            history: Tours précédents [{"role": "user"|"assistant", "content": ...}]
+            metrics: Rempli en fin de stream (voir generate_stream_response)
+        """
+        start_time = time.time()
+        first_token_time = None
+        try:
+            model = model or self.default_model
+            messages = self.build_chat_messages(prompt, history, system_message, context)
+            logger.info(f"Chat streaming avec {model}: {len(messages) - 1} messages, {prompt[:50]}...")
+            
+            stream = await self.async_client.chat(
+                model=model,
+                messages=messages,
+                options={
+                    'num_predict': max_tokens,
+                    'num_ctx': settings.OLLAMA_NUM_CTX,
+                    'temperature': temperature,
+                    'top_p': 0.9,
+                    'stop': ['</s>', '<|end|>']
+                },
+                keep_alive=settings.OLLAMA_KEEP_ALIVE,
+                stream=True
+            )
+            async for chunk in stream:
+                content = chunk.get('message', {}).get('content', '')
+                if first_token_time is None and content:
+                    first_token_time = time.time()
+                if chunk.get('done'):
+                    ttft = (
+                        int((first_token_time - start_time) * 1000)
+                        if first_token_time is not None else None
+                    )
+                    final_metrics = extract_generation_metrics(chunk, ttft)
+                    ollama_metrics.record(model, final_metrics)
+                    if metrics is not None:
+                        metrics.update(final_metrics)
+                    logger.info(
+                        f"Chat streaming terminé en {int((time.time() - start_time) * 1000)}ms "
+                        f"(prefill: {final_metrics['prompt_eval_count']} tokens)"
+                    )
+                yield content
+        except Exception as e:
+            logger.error(f"Erreur chat streaming Ollama: {e}")
+            yield f"[ERREUR] {str(e)}"
@@ -3,6 +3,7 @@ Service RAG pour l'enrichissement contextuel des réponses IA
 Architecture Clean - Couche Infrastructure
 """
 from typing import List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import numpy as np
@@ -11,10 +12,10 @@ from app.application.dto.document.document_upload_dto import DocumentUploadDto
 from app.domain.entities.document import Document
 from app.domain.entities.document_chunk import DocumentChunk
 from app.domain.interfaces.services.rag.i_rag_service import IRagService
-from app.domain.interfaces.repositories.document.i_document_repository import IDocumentRepository
-from app.domain.interfaces.repositories.document.i_document_chunk_repository import IDocumentChunkRepository
+from app.domain.interfaces.repositories.document.i_async_document_repository import IAsyncDocumentRepository
+from app.domain.interfaces.repositories.document.i_async_document_chunk_repository import IAsyncDocumentChunkRepository
 
-from app.core.logging import logger
+from app.core.logging import hot_logger, logger
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -36,6 +37,8 @@ except ImportError:
     PANDAS_AVAILABLE = False
     pd = None
 
+similarity_log = hot_logger("rag.similarity", __name__)
+
 
 class RagService(IRagService):
     def __init__(
@@ -65,8 +68,8 @@ class RagService(IRagService):
         user_id: str,
         file_encode: str, 
         filename: str, 
-        document_repository: IDocumentRepository,
-        document_chunk_repository: IDocumentChunkRepository,
+        document_repository: IAsyncDocumentRepository,
+        document_chunk_repository: IAsyncDocumentChunkRepository,
         file_content: bytes = None,
         content_type: str = None,
     ) -> DocumentUploadDto:
@@ -105,29 +108,32 @@ class RagService(IRagService):
                 chunk_count=len(chunks),
                 status="processing"
             )
-            document_repository.add_document(document)
-            document_repository.flush()
-            document_repository.refresh(document)
+            await document_repository.add_document(document)
             logger.info(f"Document créé en base avec ID: {document.id}")
         
+            document_chunks = []
             for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
                 chunk = DocumentChunk(
                     document_id=document.id,
+                    user_id=user_id,
                     chunk_index=i,
                     content=chunk_text,
                     embedding=embedding.tolist(),  
                     token_count=len(self.tokenizer.encode(chunk_text))
                 )
-                document_chunk_repository.add_chunk(chunk)
+                await document_chunk_repository.add_chunk(chunk)
+                document_chunks.append(chunk)
             
             document.status = "processed"
-            document_repository.commit()
+            for chunk in document_chunks:
+                chunk.is_processed = True
+            await document_repository.commit()
             
             logger.info(f"Document {filename} traité avec succès: {len(chunks)} chunks")
             return document
             
         except Exception as e:
-            document_repository.rollback()
+            await document_repository.rollback()
             logger.error(f"Erreur traitement document {filename}: {e}")
             if 'document' in locals():
                 document.status = "error"
@@ -137,7 +143,7 @@ class RagService(IRagService):
         self, 
         query: str, 
         user_id: str,
-        db: Session,
+        db: AsyncSession,
         top_k: int = 5,
         similarity_threshold: float = 0.75
     ) -> List[Dict[str, Any]]:
@@ -157,19 +163,20 @@ class RagService(IRagService):
             
             query_embedding = self.embedding_model.encode([query])[0]
             
-            chunks_query = db.execute(text("""
+            # user_id et is_processed sont dénormalisés sur les chunks : pas de jointure,
+            # seule la partition de l'utilisateur est lue (migration 006)
+            chunks_query = (await db.execute(text("""
                 SELECT 
                     dc.id,
+                    dc.document_id,
                     dc.content,
                     dc.chunk_index,
-                    d.filename,
                     dc.embedding
                 FROM t7_document_chunks dc
-                JOIN t7_documents d ON dc.document_id = d.id
-                WHERE d.user_id = :user_id
-                    AND d.status = 'processed'
+                WHERE dc.user_id = :user_id
+                    AND dc.is_processed
                     AND dc.embedding IS NOT NULL
-            """), {"user_id": user_id}).fetchall()
+            """), {"user_id": user_id})).fetchall()
             
             logger.info(f"Récupérés {len(chunks_query)} chunks pour l'utilisateur {user_id}")
             
@@ -201,11 +208,14 @@ class RagService(IRagService):
                         np.linalg.norm(query_embedding) * np.linalg.norm(chunk_embedding)
                     )
                     
-                    logger.info(f"Chunk {chunk.id} ({chunk.filename}): similarité={similarity:.4f} pour la requête '{query[:50]}...'")
+                    similarity_log.debug(
+                        "Chunk {} (document {}): similarité={:.4f} pour la requête '{}...'",
+                        chunk.id, chunk.document_id, similarity, query[:50]
+                    )
                     
                     all_results.append({
                         "content": chunk.content,
-                        "filename": chunk.filename,
+                        "document_id": chunk.document_id,
                         "chunk_index": chunk.chunk_index,
                         "similarity": float(similarity)
                     })
@@ -240,9 +250,10 @@ class RagService(IRagService):
             
             results.sort(key=lambda x: x["similarity"], reverse=True)
             results = results[:top_k]
+            await self._attach_filenames(db, results)
             
             for i, result in enumerate(results, 1):
-                logger.info(f"  #{i} - {result['filename']}: similarité={result['similarity']:.4f}")
+                logger.debug(f"  #{i} - {result['filename']}: similarité={result['similarity']:.4f}")
             
             logger.info(f"✅ Trouvé {len(results)}")         
             return results
@@ -438,4 +449,17 @@ class RagService(IRagService):
             logger.error(f"Erreur génération embeddings: {e}")
             raise
     
-   
\ No newline at end of file
+   
+    @staticmethod
+    async def _attach_filenames(db: AsyncSession, results: List[Dict[str, Any]]):
+        """Remplacer document_id par le nom de fichier, en une lecture par clé primaire des seuls documents retenus"""
+        document_ids = list({result["document_id"] for result in results})
+        if not document_ids:
+            return
+        rows = (await db.execute(
+            text("SELECT id, filename FROM t7_documents WHERE id = ANY(:ids)"),
+            {"ids": document_ids}
+        )).fetchall()
+        filenames = {row.id: row.filename for row in rows}
+        for result in results:
+            result["filename"] = filenames.get(result.pop("document_id"))
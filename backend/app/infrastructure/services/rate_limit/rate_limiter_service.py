@@ -0,0 +1,175 @@
+"""
+Contrôle d'admission par utilisateur : seaux à jetons par classe de route
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from app.core.settings import settings
+from app.core.logging import logger
+from app.infrastructure.database import async_engine
+from app.domain.interfaces.services.rate_limit.i_rate_limit_backend import IRateLimitBackend
+
+
+class MemoryRateLimitBackend(IRateLimitBackend):
+    """Seaux tenus dans le worker ; au-delà de RATE_LIMIT_MAX_BUCKETS, les moins récents sont oubliés (donc pleins)"""
+
+    def __init__(self, max_buckets: Optional[int] = None):
+        self.max_buckets = max_buckets or settings.RATE_LIMIT_MAX_BUCKETS
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def acquire(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / refill_per_second
+
+    async def stop(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class PostgresRateLimitBackend(IRateLimitBackend):
+    """
+    Seaux partagés entre workers dans t7_rate_limit_buckets (migration 007)
+
+    Chaque décision est un appel à t7_rate_limit_acquire sur le pool async.
+    Les seaux inactifs depuis PRUNE_AFTER_SECONDS (forcément pleins) sont
+    supprimés au plus une fois par PRUNE_INTERVAL_SECONDS.
+    """
+
+    PRUNE_INTERVAL_SECONDS = 600
+    PRUNE_AFTER_SECONDS = 3600
+
+    def __init__(self):
+        self._last_prune = time.monotonic()
+        self._prune_task: Optional[asyncio.Task] = None
+
+    async def acquire(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> float:
+        async with async_engine.begin() as conn:
+            retry_after = (await conn.execute(
+                text("SELECT t7_rate_limit_acquire(:key, :capacity, :refill, :cost)"),
+                {"key": key, "capacity": capacity, "refill": refill_per_second, "cost": cost}
+            )).scalar()
+
+        if time.monotonic() - self._last_prune > self.PRUNE_INTERVAL_SECONDS and self._prune_task is None:
+            self._last_prune = time.monotonic()
+            self._prune_task = asyncio.create_task(self._prune())
+        return float(retry_after or 0)
+
+    async def stop(self) -> None:
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            self._prune_task = None
+
+    # ==================== Private methods ====================
+
+    async def _prune(self):
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(
+                    text("DELETE FROM t7_rate_limit_buckets WHERE updated_at < clock_timestamp() - make_interval(secs => :age)"),
+                    {"age": self.PRUNE_AFTER_SECONDS}
+                )
+        except Exception as e:
+            logger.warning(f"Purge des seaux de limitation échouée: {e}")
+        finally:
+            self._prune_task = None
+
+
+class RateLimiterService:
+    """
+    Seaux à jetons par utilisateur et par classe de route (chat, search, upload)
+
+    Chaque classe a une rafale (RATE_LIMIT_<CLASSE>_BURST) et un débit de
+    recharge (RATE_LIMIT_<CLASSE>_PER_MINUTE). `acquire` rend 0 si la requête
+    est admise, sinon le délai (secondes) à renvoyer en Retry-After. Le
+    backend est la mémoire du worker ou, pour plusieurs workers, Postgres
+    (RATE_LIMIT_BACKEND) ; si Postgres est injoignable, la décision retombe
+    sur les seaux locaux plutôt que de bloquer ou de tout refuser.
+    """
+
+    ROUTE_CLASSES = ("chat", "search", "upload")
+
+    def __init__(self, backend: Optional[IRateLimitBackend] = None):
+        self.backend = backend or create_rate_limit_backend()
+        self._fallback = MemoryRateLimitBackend()
+        self._lock = Lock()
+        self._counters: Dict[str, Dict[str, int]] = {
+            route_class: {"allowed": 0, "throttled": 0} for route_class in self.ROUTE_CLASSES
+        }
+        self.backend_errors = 0
+
+    def get_limits(self, route_class: str) -> tuple:
+        """(capacité, jetons rechargés par seconde) d'une classe de route"""
+        prefix = f"RATE_LIMIT_{route_class.upper()}"
+        return getattr(settings, f"{prefix}_BURST"), getattr(settings, f"{prefix}_PER_MINUTE") / 60
+
+    async def acquire(self, user_id: Any, route_class: str, cost: float = 1) -> float:
+        """Admettre une requête de l'utilisateur ; 0 si admise, sinon délai Retry-After en secondes"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0.0
+
+        capacity, refill_per_second = self.get_limits(route_class)
+        key = f"{route_class}:{user_id}"
+        try:
+            retry_after = await self.backend.acquire(key, capacity, refill_per_second, cost)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Backend de limitation indisponible, seaux locaux utilisés: {e}")
+            retry_after = await self._fallback.acquire(key, capacity, refill_per_second, cost)
+
+        with self._lock:
+            self._counters[route_class]["throttled" if retry_after > 0 else "allowed"] += 1
+        if retry_after > 0:
+            logger.debug(f"Requête {route_class} limitée pour l'utilisateur {user_id} (retry after {retry_after:.1f}s)")
+        return retry_after
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requêtes admises et limitées par classe de route"""
+        with self._lock:
+            classes = {}
+            for route_class, counters in self._counters.items():
+                capacity, refill_per_second = self.get_limits(route_class)
+                total = counters["allowed"] + counters["throttled"]
+                classes[route_class] = {
+                    **counters,
+                    "throttle_rate": round(counters["throttled"] / total, 4) if total else None,
+                    "burst": capacity,
+                    "per_minute": round(refill_per_second * 60, 2),
+                }
+        return {
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "backend": settings.RATE_LIMIT_BACKEND,
+            "backend_errors": self.backend_errors,
+            "classes": classes,
+        }
+
+
+def create_rate_limit_backend() -> IRateLimitBackend:
+    """Instancier le backend configuré (RATE_LIMIT_BACKEND)"""
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+rate_limiter = RateLimiterService()
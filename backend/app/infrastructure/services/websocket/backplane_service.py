@@ -0,0 +1,226 @@
+"""
+Backplane de diffusion des rooms WebSocket entre workers
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.settings import settings
+from app.core.logging import logger
+from app.domain.interfaces.services.websocket.i_backplane_service import (
+    IBackplaneService,
+    RemoteMessageHandler,
+)
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+    asyncpg = None
+
+
+class LocalBackplaneService(IBackplaneService):
+    """Backplane mono-worker : aucune diffusion externe"""
+
+    async def start(self, handler: RemoteMessageHandler) -> None:
+        return None
+
+    async def publish(self, room_id: str, message: Dict[str, Any], exclude_user: Optional[str] = None) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+
+class PostgresBackplaneService(IBackplaneService):
+    """
+    Diffusion inter-workers via Postgres LISTEN/NOTIFY
+
+    Chaque worker possède un node_id : la diffusion locale est faite
+    directement par le ConnectionManager, et les notifications émises par le
+    worker lui-même sont ignorées à la réception. Les messages publiés dans
+    une fenêtre de WS_BACKPLANE_BATCH_MS sont regroupés dans un même NOTIFY ;
+    ceux qui dépassent la limite de payload Postgres (8000 octets) sont
+    fragmentés puis réassemblés par les autres workers.
+    """
+
+    MAX_PAYLOAD_BYTES = 7900
+    FRAGMENT_TTL_SECONDS = 30
+    RECONNECT_DELAY_SECONDS = 2
+
+    def __init__(self, dsn: Optional[str] = None, channel: Optional[str] = None):
+        self.dsn = dsn or settings.DATABASE_URL
+        self.channel = channel or settings.WS_BACKPLANE_CHANNEL
+        self.batch_delay = settings.WS_BACKPLANE_BATCH_MS / 1000
+        self.node_id = uuid.uuid4().hex[:12]
+
+        self._handler: Optional[RemoteMessageHandler] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._fragments: Dict[str, Tuple[float, List[Optional[str]]]] = {}
+        self._stopping = False
+
+        self.published = 0
+        self.notifications_sent = 0
+        self.received = 0
+
+    async def start(self, handler: RemoteMessageHandler) -> None:
+        if not ASYNCPG_AVAILABLE:
+            raise ImportError("asyncpg non disponible pour le backplane Postgres")
+        self._handler = handler
+        self._stopping = False
+        await self._connect()
+        self._tasks = [
+            asyncio.create_task(self._sender_loop()),
+            asyncio.create_task(self._supervisor_loop()),
+        ]
+        logger.info(f"Backplane Postgres démarré (canal {self.channel}, node {self.node_id})")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = self._publish_conn = None
+
+    async def publish(self, room_id: str, message: Dict[str, Any], exclude_user: Optional[str] = None) -> None:
+        """Mettre un message en file pour diffusion aux autres workers"""
+        self.published += 1
+        self._outbox.put_nowait(json.dumps({"r": room_id, "m": message, "x": exclude_user}))
+
+    # ==================== Private methods ====================
+
+    async def _connect(self):
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._publish_conn = await asyncpg.connect(self.dsn)
+        await self._listen_conn.add_listener(self.channel, self._on_notification)
+
+    async def _supervisor_loop(self):
+        """Reconnecter le listener si la connexion Postgres est perdue"""
+        while not self._stopping:
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+            self._expire_fragments()
+            if all(conn is not None and not conn.is_closed() for conn in (self._listen_conn, self._publish_conn)):
+                continue
+            try:
+                logger.warning("Backplane Postgres: connexion perdue, reconnexion...")
+                await self._connect()
+            except Exception as e:
+                logger.error(f"Backplane Postgres: échec de reconnexion: {e}")
+
+    async def _sender_loop(self):
+        """Regrouper les messages en attente et émettre les NOTIFY"""
+        while True:
+            envelopes = [await self._outbox.get()]
+            if self.batch_delay > 0:
+                await asyncio.sleep(self.batch_delay)
+            while not self._outbox.empty():
+                envelopes.append(self._outbox.get_nowait())
+
+            try:
+                for payload in self._pack(envelopes):
+                    await self._publish_conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                    self.notifications_sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane Postgres: échec d'envoi de {len(envelopes)} messages: {e}")
+
+    def _pack(self, envelopes: List[str]) -> List[str]:
+        """Grouper les enveloppes (JSON ASCII) en payloads sous la limite Postgres"""
+        payloads: List[str] = []
+        batch: List[str] = []
+        batch_size = 0
+        overhead = len(self.node_id) + 16
+
+        for envelope in envelopes:
+            if len(envelope) + overhead > self.MAX_PAYLOAD_BYTES:
+                if batch:
+                    payloads.append(self._batch_payload(batch))
+                    batch, batch_size = [], 0
+                payloads.extend(self._fragment(envelope))
+                continue
+            if batch and batch_size + len(envelope) + 1 + overhead > self.MAX_PAYLOAD_BYTES:
+                payloads.append(self._batch_payload(batch))
+                batch, batch_size = [], 0
+            batch.append(envelope)
+            batch_size += len(envelope) + 1
+
+        if batch:
+            payloads.append(self._batch_payload(batch))
+        return payloads
+
+    def _batch_payload(self, batch: List[str]) -> str:
+        return f'B{self.node_id}:[{",".join(batch)}]'
+
+    def _fragment(self, envelope: str) -> List[str]:
+        fragment_id = uuid.uuid4().hex[:12]
+        size = self.MAX_PAYLOAD_BYTES - 64
+        parts = [envelope[i:i + size] for i in range(0, len(envelope), size)]
+        return [
+            f"F{self.node_id}:{fragment_id}:{index}:{len(parts)}:{part}"
+            for index, part in enumerate(parts)
+        ]
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        """Callback asyncpg (synchrone) : décoder puis délivrer en tâche"""
+        try:
+            kind, body = payload[0], payload[1:]
+            origin, _, body = body.partition(":")
+            if origin == self.node_id:
+                return
+
+            if kind == "B":
+                envelopes = json.loads(body)
+            elif kind == "F":
+                envelope = self._reassemble(body)
+                if envelope is None:
+                    return
+                envelopes = [json.loads(envelope)]
+            else:
+                return
+
+            for envelope in envelopes:
+                self.received += 1
+                asyncio.create_task(self._deliver(envelope))
+        except Exception as e:
+            logger.error(f"Backplane Postgres: notification invalide: {e}")
+
+    def _reassemble(self, body: str) -> Optional[str]:
+        fragment_id, index, total, part = body.split(":", 3)
+        index, total = int(index), int(total)
+        _, parts = self._fragments.setdefault(fragment_id, (time.monotonic(), [None] * total))
+        parts[index] = part
+        if any(p is None for p in parts):
+            return None
+        del self._fragments[fragment_id]
+        return "".join(parts)
+
+    def _expire_fragments(self):
+        limit = time.monotonic() - self.FRAGMENT_TTL_SECONDS
+        for fragment_id in [f for f, (created, _) in self._fragments.items() if created < limit]:
+            del self._fragments[fragment_id]
+
+    async def _deliver(self, envelope: Dict[str, Any]):
+        try:
+            await self._handler(envelope["r"], envelope["m"], envelope.get("x"))
+        except Exception as e:
+            logger.error(f"Backplane Postgres: erreur de diffusion locale: {e}")
+
+
+def create_backplane() -> IBackplaneService:
+    """Instancier le backplane configuré (WS_BACKPLANE)"""
+    if settings.WS_BACKPLANE == "postgres":
+        return PostgresBackplaneService()
+    return LocalBackplaneService()
@@ -0,0 +1,120 @@
+"""
+Registre des connexions WebSocket indexé par room, utilisateur et connexion
+Architecture Clean - Couche Infrastructure
+"""
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+from starlette.websockets import WebSocket
+from app.infrastructure.services.websocket.wire_protocol import JSON_PROTOCOL, WireProtocol
+
+
+class ConnectionRecord:
+    """Connexion WebSocket (une room, un utilisateur) ; __slots__ pour limiter la mémoire"""
+
+    __slots__ = (
+        "connection_id", "websocket", "room_id", "user_id", "connected_at", "last_seen", "outbound", "protocol"
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        room_id: str,
+        user_id: str,
+        outbound=None,
+        protocol: Optional[WireProtocol] = None
+    ):
+        self.connection_id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.connected_at = time.time()
+        self.last_seen = time.monotonic()
+        self.outbound = outbound
+        self.protocol = protocol or JSON_PROTOCOL
+
+
+class ConnectionRegistryService:
+    """
+    Index des connexions : par id, par socket, par room et par utilisateur
+
+    Toutes les recherches sont en O(1) ; un utilisateur peut avoir plusieurs
+    sockets (onglets), y compris dans la même room.
+    """
+
+    def __init__(self):
+        self.connections: Dict[str, ConnectionRecord] = {}
+        self._by_websocket: Dict[WebSocket, ConnectionRecord] = {}
+        self._by_room: Dict[str, Dict[str, ConnectionRecord]] = {}
+        self._by_user: Dict[str, Dict[str, ConnectionRecord]] = {}
+        self._room_user_counts: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def connection_count(self) -> int:
+        return len(self.connections)
+
+    @property
+    def room_count(self) -> int:
+        return len(self._by_room)
+
+    def add(self, record: ConnectionRecord) -> bool:
+        """Enregistrer une connexion ; True si c'est la première de l'utilisateur dans la room"""
+        self.connections[record.connection_id] = record
+        self._by_websocket[record.websocket] = record
+        self._by_room.setdefault(record.room_id, {})[record.connection_id] = record
+        self._by_user.setdefault(record.user_id, {})[record.connection_id] = record
+
+        user_counts = self._room_user_counts.setdefault(record.room_id, {})
+        user_counts[record.user_id] = user_counts.get(record.user_id, 0) + 1
+        return user_counts[record.user_id] == 1
+
+    def remove(self, websocket: WebSocket) -> Optional[ConnectionRecord]:
+        """Retirer une connexion ; None si elle n'était pas enregistrée"""
+        record = self._by_websocket.pop(websocket, None)
+        if record is None:
+            return None
+
+        del self.connections[record.connection_id]
+        self._discard(self._by_room, record.room_id, record.connection_id)
+        self._discard(self._by_user, record.user_id, record.connection_id)
+
+        user_counts = self._room_user_counts[record.room_id]
+        user_counts[record.user_id] -= 1
+        if not user_counts[record.user_id]:
+            del user_counts[record.user_id]
+        if not user_counts:
+            del self._room_user_counts[record.room_id]
+        return record
+
+    def get(self, websocket: WebSocket) -> Optional[ConnectionRecord]:
+        return self._by_websocket.get(websocket)
+
+    def get_by_id(self, connection_id: str) -> Optional[ConnectionRecord]:
+        return self.connections.get(connection_id)
+
+    def room_connections(self, room_id: str) -> Iterable[ConnectionRecord]:
+        return list(self._by_room.get(room_id, {}).values())
+
+    def user_connections(self, user_id: str) -> Iterable[ConnectionRecord]:
+        return list(self._by_user.get(user_id, {}).values())
+
+    def user_connection_count(self, user_id: str) -> int:
+        return len(self._by_user.get(user_id, ()))
+
+    def user_in_room(self, room_id: str, user_id: str) -> bool:
+        return user_id in self._room_user_counts.get(room_id, {})
+
+    def room_users(self, room_id: str) -> List[str]:
+        return list(self._room_user_counts.get(room_id, {}).keys())
+
+    def rooms(self) -> Dict[str, List[str]]:
+        return {room_id: list(users.keys()) for room_id, users in self._room_user_counts.items()}
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[str, ConnectionRecord]], key: str, connection_id: str):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(connection_id, None)
+        if not bucket:
+            del index[key]
@@ -1,114 +1,289 @@
-from typing import Dict, List, Optional, Set
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+from fastapi import status
 from starlette.websockets import WebSocket
+from app.core.settings import settings
 from app.core.logging import logger
+from app.domain.interfaces.services.websocket.i_backplane_service import IBackplaneService
+from app.infrastructure.services.websocket.backplane_service import LocalBackplaneService, create_backplane
+from app.infrastructure.services.websocket.connection_registry_service import (
+    ConnectionRecord,
+    ConnectionRegistryService,
+)
+from app.infrastructure.services.websocket.outbound_queue_service import OutboundQueueService
+from app.infrastructure.services.websocket.wire_protocol import JSON_PROTOCOL, Payload, WireProtocol
 from datetime import datetime
-import json
 
 
 class ConnectionManagerService:
     """Gestionnaire des connexions WebSocket"""
     
-    def __init__(self):
-        self.rooms: Dict[str, Dict[str, WebSocket]] = {}
-        self.user_rooms: Dict[str, Set[str]] = {}
-        self.websocket_users: Dict[WebSocket, str] = {}
+    def __init__(self, backplane: Optional[IBackplaneService] = None):
+        self.registry = ConnectionRegistryService()
+        self.backplane = backplane or create_backplane()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        
+        self.rejected = 0
+        self.reaped = 0
+        # Compteurs des files d'envoi des connexions déjà fermées
+        self._closed_queue_totals = {"sent": 0, "dropped": 0, "coalesced": 0}
+        self.slow_disconnects = 0
+    
+    async def start(self):
+        """Démarrer le backplane inter-workers (repli en local si indisponible) et le heartbeat"""
+        try:
+            await self.backplane.start(self.deliver_to_room)
+        except Exception as e:
+            logger.error(f"Backplane indisponible, diffusion limitée à ce worker: {e}")
+            self.backplane = LocalBackplaneService()
+        if self._heartbeat_task is None and settings.WS_HEARTBEAT_INTERVAL_SECONDS > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+    
+    async def stop(self):
+        """Arrêter le heartbeat et le backplane"""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        await self.backplane.stop()
+    
+    def check_admission(self, user_id: str) -> Optional[str]:
+        """Motif de refus d'une nouvelle connexion (limites globale et par utilisateur), None si admise"""
+        if self.registry.connection_count >= settings.WS_MAX_CONNECTIONS:
+            self.rejected += 1
+            return "Trop de connexions sur le serveur"
+        if self.registry.user_connection_count(user_id) >= settings.WS_MAX_CONNECTIONS_PER_USER:
+            self.rejected += 1
+            return "Trop de connexions ouvertes pour cet utilisateur"
+        return None
+    
+    def touch(self, websocket: WebSocket):
+        """Noter une activité du client (toute frame reçue compte comme heartbeat)"""
+        record = self.registry.get(websocket)
+        if record is not None:
+            record.last_seen = time.monotonic()
     
     async def connect(self, websocket: WebSocket, room_id: str, user_id: str):
         """Connecter un utilisateur à une room (avec acceptation WebSocket)"""
         await websocket.accept()
         await self.add_to_room(websocket, room_id, user_id)
     
-    async def add_to_room(self, websocket: WebSocket, room_id: str, user_id: str):
-        """Ajouter un utilisateur à une room (connexion déjà acceptée)"""
-        if room_id not in self.rooms:
-            self.rooms[room_id] = {}
-        
-        self.rooms[room_id][user_id] = websocket
+    async def add_to_room(
+        self,
+        websocket: WebSocket,
+        room_id: str,
+        user_id: str,
+        protocol: Optional[WireProtocol] = None
+    ) -> ConnectionRecord:
+        """Ajouter une connexion (déjà acceptée) à une room ; un utilisateur peut en avoir plusieurs"""
+        existing = self.registry.get(websocket)
+        if existing is not None:
+            await self.disconnect(websocket)
         
-        if user_id not in self.user_rooms:
-            self.user_rooms[user_id] = set()
-        self.user_rooms[user_id].add(room_id)
-        self.websocket_users[websocket] = user_id
+        protocol = protocol or JSON_PROTOCOL
+        queue = OutboundQueueService(websocket, on_failure=self.disconnect, protocol=protocol)
+        queue.start()
+        record = ConnectionRecord(websocket, room_id, user_id, outbound=queue, protocol=protocol)
+        first_in_room = self.registry.add(record)
         
-        logger.info(f"Utilisateur {user_id} ajouté à la room {room_id}")
+        logger.info(f"Utilisateur {user_id} ajouté à la room {room_id} (connexion {record.connection_id})")
         
-        await self.broadcast_to_room(room_id, {
-            "type": "user_joined",
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "room_id": room_id
-        }, exclude_user=user_id)
+        if first_in_room:
+            await self.broadcast_to_room(room_id, {
+                "type": "user_joined",
+                "user_id": user_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "room_id": room_id
+            }, exclude_user=user_id)
+        return record
     
     async def disconnect(self, websocket: WebSocket):
-        """Déconnecter un utilisateur"""
-        if websocket not in self.websocket_users:
+        """Déconnecter une connexion ; user_left n'est diffusé qu'au départ du dernier onglet"""
+        record = self.registry.remove(websocket)
+        if record is None:
             return
         
-        user_id = self.websocket_users[websocket]
-        rooms_to_clean = []
-        
-        for room_id in self.user_rooms.get(user_id, []):
-            if room_id in self.rooms and user_id in self.rooms[room_id]:
-                del self.rooms[room_id][user_id]
-                
-                await self.broadcast_to_room(room_id, {
-                    "type": "user_left",
-                    "user_id": user_id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "room_id": room_id
-                }, exclude_user=user_id)
-                
-                if not self.rooms[room_id]:
-                    rooms_to_clean.append(room_id)
-        
-        for room_id in rooms_to_clean:
-            del self.rooms[room_id]
+        if record.outbound is not None:
+            await record.outbound.stop()
+            for counter in self._closed_queue_totals:
+                self._closed_queue_totals[counter] += getattr(record.outbound, counter)
+            if record.outbound.evicted:
+                self.slow_disconnects += 1
         
-        if user_id in self.user_rooms:
-            del self.user_rooms[user_id]
-        if websocket in self.websocket_users:
-            del self.websocket_users[websocket]
+        if not self.registry.user_in_room(record.room_id, record.user_id):
+            await self.broadcast_to_room(record.room_id, {
+                "type": "user_left",
+                "user_id": record.user_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "room_id": record.room_id
+            }, exclude_user=record.user_id)
         
-        logger.info(f"Utilisateur {user_id} déconnecté")
+        logger.info(f"Utilisateur {record.user_id} déconnecté (connexion {record.connection_id})")
     
     async def send_personal_message(self, message: Dict, user_id: str):
-        """Envoyer un message à un utilisateur spécifique"""
-        for room_id, users in self.rooms.items():
-            if user_id in users:
-                try:
-                    await users[user_id].send_text(json.dumps(message))
-                except Exception as e:
-                    logger.error(f"Erreur envoi message à {user_id}: {e}")
+        """Envoyer un message à toutes les connexions d'un utilisateur"""
+        encoded: Dict[str, Payload] = {}
+        for record in self.registry.user_connections(user_id):
+            self._enqueue(record, message, encoded)
     
-    async def broadcast_to_room(self, room_id: str, message: Dict, exclude_user: Optional[str] = None):
-        """Diffuser un message à tous les utilisateurs d'une room"""
-        if room_id not in self.rooms:
+    async def send_to_websocket(self, websocket: WebSocket, message: Dict):
+        """Envoyer un message à une connexion via sa file d'envoi"""
+        record = self.registry.get(websocket)
+        if record is not None:
+            self._enqueue(record, message, {})
             return
         
-        message_str = json.dumps(message)
-        disconnected_users = []
+        try:
+            await websocket.send_text(JSON_PROTOCOL.encode(message))
+        except Exception as e:
+            logger.error(f"Erreur envoi message WebSocket: {e}")
+    
+    async def broadcast_to_room(
+        self,
+        room_id: str,
+        message: Dict,
+        exclude_user: Optional[str] = None,
+        exclude_websockets: Optional[Set[WebSocket]] = None
+    ):
+        """Diffuser un message à tous les utilisateurs d'une room, sur tous les workers"""
+        await self.deliver_to_room(room_id, message, exclude_user, exclude_websockets)
+        await self.backplane.publish(room_id, message, exclude_user)
+    
+    async def deliver_to_room(
+        self,
+        room_id: str,
+        message: Dict,
+        exclude_user: Optional[str] = None,
+        exclude_websockets: Optional[Set[WebSocket]] = None
+    ):
+        """Diffuser un message aux connexions locales de la room (encodé une fois par protocole)"""
+        connections = self.registry.room_connections(room_id)
+        if not connections:
+            return
         
-        for user_id, websocket in self.rooms[room_id].items():
-            if exclude_user and user_id == exclude_user:
+        encoded: Dict[str, Payload] = {}
+        for record in connections:
+            if exclude_user and record.user_id == exclude_user:
                 continue
-            
-            try:
-                await websocket.send_text(message_str)
-            except Exception as e:
-                logger.error(f"Erreur diffusion à {user_id} dans room {room_id}: {e}")
-                disconnected_users.append((websocket, user_id))
-        
-        for websocket, user_id in disconnected_users:
-            await self.disconnect(websocket)
+            if exclude_websockets and record.websocket in exclude_websockets:
+                continue
+            self._enqueue(record, message, encoded)
+    
+    def get_connection(self, websocket: WebSocket) -> Optional[ConnectionRecord]:
+        """Récupérer l'enregistrement d'une connexion"""
+        return self.registry.get(websocket)
+    
+    def get_protocol(self, websocket: WebSocket) -> WireProtocol:
+        """Protocole négocié par une connexion"""
+        record = self.registry.get(websocket)
+        return record.protocol if record is not None else JSON_PROTOCOL
     
     def get_room_users(self, room_id: str) -> List[str]:
         """Récupérer la liste des utilisateurs d'une room"""
-        if room_id not in self.rooms:
-            return []
-        return list(self.rooms[room_id].keys())
+        return self.registry.room_users(room_id)
     
     def get_user_count(self, room_id: str) -> int:
         """Compter les utilisateurs dans une room"""
         return len(self.get_room_users(room_id))
-
-
+    
+    def get_rooms(self) -> Dict[str, List[str]]:
+        """Utilisateurs connectés par room"""
+        return self.registry.rooms()
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Jauge mémoire : RSS du process rapporté au nombre de connexions, octets en file d'envoi"""
+        connections = self.registry.connection_count
+        rss = self._process_rss_bytes()
+        queued = sum(
+            record.outbound.queued_bytes
+            for record in list(self.registry.connections.values()) if record.outbound is not None
+        )
+        return {
+            "connections": connections,
+            "rejected": self.rejected,
+            "reaped": self.reaped,
+            "process_rss_bytes": rss,
+            "rss_bytes_per_connection": rss // connections if rss and connections else None,
+            "outbound_queued_bytes": queued,
+        }
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Files d'envoi agrégées : profondeur courante (max, p95) et totaux depuis le démarrage"""
+        queues = [
+            record.outbound for record in list(self.registry.connections.values()) if record.outbound is not None
+        ]
+        totals = dict(self._closed_queue_totals)
+        for queue in queues:
+            for counter in totals:
+                totals[counter] += getattr(queue, counter)
+        depths = sorted(queue.depth for queue in queues)
+        last = len(depths) - 1
+        return {
+            "connections": len(queues),
+            "depth_max": depths[last] if depths else None,
+            "depth_p95": depths[int(last * 0.95)] if depths else None,
+            "max_depth_seen": max((queue.max_depth for queue in queues), default=None),
+            **totals,
+            "slow_disconnects": self.slow_disconnects,
+        }
+    
+    def get_connection_stats(self) -> List[Dict[str, Any]]:
+        """Profondeur et compteurs de la file d'envoi de chaque connexion (détail, coûteux à 10k connexions)"""
+        return [
+            {
+                "connection_id": record.connection_id,
+                "user_id": record.user_id,
+                "room_id": record.room_id,
+                "protocol": record.protocol.name,
+                "idle_seconds": round(time.monotonic() - record.last_seen, 1),
+                **(record.outbound.get_stats() if record.outbound is not None else {})
+            }
+            for record in list(self.registry.connections.values())
+        ]
+    
+    # ==================== Private methods ====================
+    
+    async def _heartbeat_loop(self):
+        """Envoyer un ping aux connexions silencieuses et fermer celles inactives depuis WS_IDLE_TIMEOUT_SECONDS"""
+        interval = settings.WS_HEARTBEAT_INTERVAL_SECONDS
+        idle_timeout = settings.WS_IDLE_TIMEOUT_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for record in list(self.registry.connections.values()):
+                idle = now - record.last_seen
+                try:
+                    if idle_timeout and idle >= idle_timeout:
+                        await self._reap(record)
+                    elif idle >= interval:
+                        self._enqueue(record, {"type": "ping", "timestamp": datetime.utcnow().isoformat()}, {})
+                except Exception as e:
+                    logger.error(f"Erreur heartbeat pour la connexion {record.connection_id}: {e}")
+    
+    async def _reap(self, record: ConnectionRecord):
+        self.reaped += 1
+        logger.info(f"Connexion {record.connection_id} inactive ({record.user_id}), fermeture")
+        try:
+            await record.websocket.close(code=status.WS_1001_GOING_AWAY, reason="Connexion inactive")
+        except Exception:
+            pass
+        await self.disconnect(record.websocket)
+    
+    @staticmethod
+    def _process_rss_bytes() -> Optional[int]:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    
+    @staticmethod
+    def _enqueue(record: ConnectionRecord, message: Dict, encoded: Dict[str, Payload]):
+        """Mettre en file un message ; `encoded` met en cache l'encodage par protocole"""
+        if record.outbound is None:
+            return
+        payload = encoded.get(record.protocol.name)
+        if payload is None:
+            payload = encoded[record.protocol.name] = record.protocol.encode(message)
+        record.outbound.enqueue(message, payload)
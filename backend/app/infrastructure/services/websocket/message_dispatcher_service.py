@@ -0,0 +1,91 @@
+"""
+Répartition des messages entrants d'une connexion WebSocket
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.settings import settings
+from app.core.logging import logger
+from app.infrastructure.services.websocket.websocket_metrics import websocket_metrics
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class MessageDispatcherService:
+    """
+    Dispatcher par connexion : la boucle de réception ne fait que router
+
+    Les messages de QUEUED_TYPES (chat) passent par une file de travail bornée,
+    traitée dans l'ordre par une tâche dédiée à la session : RAG et
+    persistance ne bloquent plus la lecture des frames suivantes. Les autres
+    messages (frappe, etc.) sont traités immédiatement. Si la file est pleine,
+    on_rejected est appelé au lieu de mettre le message en attente.
+    """
+
+    QUEUED_TYPES = {"chat_message"}
+
+    def __init__(
+        self,
+        handler: MessageHandler,
+        on_rejected: Optional[MessageHandler] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.handler = handler
+        self.on_rejected = on_rejected
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.WS_CHAT_QUEUE_SIZE)
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        """Démarrer la tâche de traitement de la file"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._work_loop())
+
+    async def stop(self):
+        """Arrêter la tâche de traitement ; les messages en attente sont abandonnés"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def dispatch(self, message_data: Dict[str, Any]):
+        """Router un message : file de travail ou traitement immédiat"""
+        message_type = str(message_data.get("type"))
+
+        if message_type not in self.QUEUED_TYPES:
+            await self._handle(message_type, message_data, time.perf_counter())
+            return
+
+        try:
+            self._queue.put_nowait((time.perf_counter(), message_type, message_data))
+        except asyncio.QueueFull:
+            websocket_metrics.record_rejected(message_type)
+            logger.warning(f"File de travail pleine ({self._queue.maxsize}), message {message_type} refusé")
+            if self.on_rejected is not None:
+                await self.on_rejected(message_data)
+
+    # ==================== Private methods ====================
+
+    async def _work_loop(self):
+        while True:
+            received_at, message_type, message_data = await self._queue.get()
+            try:
+                await self._handle(message_type, message_data, received_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erreur traitement message {message_type}: {e}")
+
+    async def _handle(self, message_type: str, message_data: Dict[str, Any], received_at: float):
+        started_at = time.perf_counter()
+        try:
+            await self.handler(message_data)
+        finally:
+            websocket_metrics.record(
+                message_type,
+                wait_ms=(started_at - received_at) * 1000,
+                handle_ms=(time.perf_counter() - started_at) * 1000
+            )
@@ -0,0 +1,159 @@
+"""
+File d'envoi bornée par connexion WebSocket
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from fastapi import status
+from starlette.websockets import WebSocket
+from app.core.settings import settings
+from app.core.logging import logger
+from app.infrastructure.services.websocket.wire_protocol import JSON_PROTOCOL, Payload, WireProtocol
+
+
+class OutboundQueueService:
+    """
+    File d'envoi d'une connexion, vidée par sa propre tâche d'écriture
+
+    Les diffusions ne font qu'ajouter à la file : un client lent ne bloque
+    plus les autres membres de la room. Quand la file est pleine :
+    - les événements de frappe sont abandonnés ;
+    - un fragment de stream IA est fusionné avec le fragment en fin de file ;
+    - sinon WS_OUTBOUND_OVERFLOW_POLICY s'applique : "disconnect" ferme la
+      connexion (1013), "drop" abandonne le message.
+    """
+
+    TYPING_EVENTS = {"user_typing", "user_stopped_typing"}
+    STREAM_EVENT = "ai_message_stream"
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_failure: Optional[Callable[[WebSocket], Awaitable[None]]] = None,
+        max_size: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        protocol: Optional[WireProtocol] = None
+    ):
+        self.websocket = websocket
+        self.protocol = protocol or JSON_PROTOCOL
+        self.on_failure = on_failure
+        self.max_size = max_size or settings.WS_OUTBOUND_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.WS_OUTBOUND_OVERFLOW_POLICY
+
+        # Entrées: [type, payload encodé, message (conservé pour la fusion des streams)]
+        self._queue: Deque[List[Any]] = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.evicted = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def queued_bytes(self) -> int:
+        return sum(len(entry[1]) for entry in self._queue)
+
+    def start(self):
+        """Démarrer la tâche d'écriture"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._writer_loop())
+
+    async def stop(self):
+        """Arrêter la tâche d'écriture et vider la file"""
+        self.closed = True
+        self._queue.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    def enqueue(self, message: Dict[str, Any], payload: Optional[Payload] = None) -> bool:
+        """Ajouter un message sans attendre l'envoi ; False si le message est abandonné
+
+        `payload` est le message déjà encodé avec le protocole de la connexion.
+        """
+        if self.closed:
+            return False
+
+        message_type = message.get("type")
+        if len(self._queue) >= self.max_size:
+            return self._handle_overflow(message_type, message)
+
+        self._queue.append([message_type, payload or self.protocol.encode(message), message])
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.max_size,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    # ==================== Private methods ====================
+
+    def _handle_overflow(self, message_type: Optional[str], message: Dict[str, Any]) -> bool:
+        if message_type in self.TYPING_EVENTS:
+            self.dropped += 1
+            return False
+
+        if (
+            message_type == self.STREAM_EVENT and self._queue and self._queue[-1][0] == self.STREAM_EVENT
+            and self._queue[-1][2].get("message_id") == message.get("message_id")
+        ):
+            tail = self._queue[-1]
+            merged = dict(tail[2])
+            merged["content"] = merged.get("content", "") + message.get("content", "")
+            tail[1], tail[2] = self.protocol.encode(merged), merged
+            self.coalesced += 1
+            return True
+
+        self.dropped += 1
+        if self.overflow_policy == "disconnect":
+            logger.warning(f"File d'envoi saturée ({self.max_size}), déconnexion du client lent")
+            self.closed = True
+            self.evicted = True
+            self._queue.clear()
+            asyncio.create_task(self._evict())
+        return False
+
+    async def _evict(self):
+        try:
+            await self.websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Client trop lent")
+        except Exception:
+            pass
+        if self.on_failure is not None:
+            await self.on_failure(self.websocket)
+
+    async def _writer_loop(self):
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _, payload, _ = self._queue.popleft()
+                if isinstance(payload, bytes):
+                    await self.websocket.send_bytes(payload)
+                else:
+                    await self.websocket.send_text(payload)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Erreur d'envoi WebSocket, connexion fermée: {e}")
+            self.closed = True
+            self._queue.clear()
+            if self.on_failure is not None:
+                await self.on_failure(self.websocket)
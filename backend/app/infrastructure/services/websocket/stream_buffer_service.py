@@ -0,0 +1,127 @@
+"""
+Buffers des générations IA en cours, pour la reprise des streams
+Architecture Clean - Couche Infrastructure
+"""
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from starlette.websockets import WebSocket
+from app.core.settings import settings
+from app.infrastructure.services.websocket.stream_coalescer_service import StreamCoalescerService
+
+
+class StreamBuffer:
+    """
+    Tokens d'une réponse IA, indexés par offset (en caractères)
+
+    Le buffer est borné à `max_chars` : les tokens les plus anciens sont
+    évincés et `base_offset` avance. Chaque connexion abonnée reçoit les
+    nouveaux tokens via son propre StreamCoalescerService.
+    """
+
+    def __init__(self, message_id: str, session_id: str, max_chars: Optional[int] = None):
+        self.message_id = message_id
+        self.session_id = session_id
+        self.max_chars = max_chars or settings.WS_STREAM_BUFFER_MAX_CHARS
+
+        self._tokens: Deque[Tuple[int, str]] = deque()
+        self.base_offset = 0
+        self.length = 0
+        self.done = False
+        self.final_message: Optional[Dict[str, Any]] = None
+        self.finished_at: Optional[float] = None
+        self.subscribers: Dict[WebSocket, StreamCoalescerService] = {}
+
+    async def append(self, token: str):
+        """Ajouter un token et le transmettre aux connexions abonnées"""
+        if not token:
+            return
+        self._tokens.append((self.length, token))
+        self.length += len(token)
+        while self._tokens and self.length - self._tokens[0][0] > self.max_chars:
+            self._tokens.popleft()
+            self.base_offset = self._tokens[0][0] if self._tokens else self.length
+
+        for coalescer in list(self.subscribers.values()):
+            await coalescer.push(token)
+
+    def read_from(self, offset: int) -> Optional[str]:
+        """Texte disponible à partir de `offset` ; None s'il a été évincé"""
+        if offset < self.base_offset or offset > self.length:
+            return None
+        parts = []
+        for start, token in self._tokens:
+            end = start + len(token)
+            if end <= offset:
+                continue
+            parts.append(token[max(0, offset - start):])
+        return "".join(parts)
+
+    async def finish(self, final_message: Optional[Dict[str, Any]] = None) -> List[WebSocket]:
+        """Marquer la génération comme terminée et vider les coalesceurs
+
+        Retourne les connexions qui ont reçu le stream jusqu'au bout.
+        """
+        self.done = True
+        self.final_message = final_message
+        self.finished_at = time.monotonic()
+        streamed_to = list(self.subscribers.keys())
+        for coalescer in list(self.subscribers.values()):
+            await coalescer.close()
+        self.subscribers.clear()
+        return streamed_to
+
+    def unsubscribe(self, websocket: WebSocket):
+        coalescer = self.subscribers.pop(websocket, None)
+        if coalescer is not None:
+            coalescer.cancel()
+
+
+class StreamBufferService:
+    """
+    Registre des buffers de stream par message_id
+
+    Les buffers des générations terminées sont conservés
+    WS_STREAM_RESUME_TTL_SECONDS, et au plus WS_STREAM_RESUME_MAX_BUFFERS
+    buffers sont gardés (les plus anciens sont évincés).
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_buffers: Optional[int] = None):
+        self.ttl = settings.WS_STREAM_RESUME_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_buffers = max_buffers or settings.WS_STREAM_RESUME_MAX_BUFFERS
+        self._buffers: "OrderedDict[str, StreamBuffer]" = OrderedDict()
+
+    def create(self, message_id: str, session_id: str) -> StreamBuffer:
+        self._expire()
+        buffer = StreamBuffer(message_id, session_id)
+        self._buffers[message_id] = buffer
+        while len(self._buffers) > self.max_buffers:
+            self._buffers.popitem(last=False)
+        return buffer
+
+    def get(self, message_id: str) -> Optional[StreamBuffer]:
+        self._expire()
+        return self._buffers.get(message_id)
+
+    def unsubscribe(self, websocket: WebSocket):
+        """Détacher une connexion fermée de tous les streams"""
+        for buffer in list(self._buffers.values()):
+            buffer.unsubscribe(websocket)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "buffers": len(self._buffers),
+            "in_progress": sum(1 for buffer in self._buffers.values() if not buffer.done),
+            "subscribers": sum(len(buffer.subscribers) for buffer in self._buffers.values()),
+        }
+
+    # ==================== Private methods ====================
+
+    def _expire(self):
+        limit = time.monotonic() - self.ttl
+        expired = [
+            message_id for message_id, buffer in self._buffers.items()
+            if buffer.done and buffer.finished_at < limit
+        ]
+        for message_id in expired:
+            del self._buffers[message_id]
@@ -0,0 +1,105 @@
+"""
+Regroupement des tokens streamés en frames WebSocket
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+from app.core.settings import settings
+from app.core.logging import logger
+
+
+class StreamCoalescerService:
+    """
+    Bufferise les tokens d'un stream IA et les envoie par paquets
+
+    Une frame est émise toutes les `flush_interval_ms` millisecondes ou dès que
+    `flush_max_chars` caractères sont en attente, au premier des deux seuils.
+    Le premier token est toujours envoyé immédiatement pour ne pas dégrader le
+    time-to-first-token. Un intervalle et une taille à 0 reviennent à envoyer
+    une frame par token.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        flush_interval_ms: Optional[int] = None,
+        flush_max_chars: Optional[int] = None
+    ):
+        self.send = send
+        self.flush_interval = (
+            settings.WS_STREAM_FLUSH_INTERVAL_MS if flush_interval_ms is None else flush_interval_ms
+        ) / 1000
+        self.flush_max_chars = (
+            settings.WS_STREAM_FLUSH_MAX_CHARS if flush_max_chars is None else flush_max_chars
+        )
+
+        self._buffer: List[str] = []
+        self._buffered_chars = 0
+        self._last_flush = 0.0
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.tokens_received = 0
+        self.frames_sent = 0
+
+    async def push(self, token: str):
+        """Ajouter un token au buffer et envoyer si un seuil est atteint"""
+        if not token:
+            return
+
+        self._buffer.append(token)
+        self._buffered_chars += len(token)
+        self.tokens_received += 1
+
+        if self.frames_sent == 0 or self.flush_interval <= 0:
+            await self.flush()
+        elif self.flush_max_chars and self._buffered_chars >= self.flush_max_chars:
+            await self.flush()
+        elif time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self):
+        """Envoyer le contenu bufferisé en une seule frame"""
+        async with self._lock:
+            if not self._buffer:
+                return
+            content = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffered_chars = 0
+            self._last_flush = time.monotonic()
+            self.frames_sent += 1
+            await self.send(content)
+
+    async def close(self):
+        """Vider le buffer et arrêter le timer en fin de stream"""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        await self.flush()
+        logger.debug(
+            f"Stream terminé: {self.tokens_received} tokens envoyés en {self.frames_sent} frames"
+        )
+
+    def cancel(self):
+        """Abandonner le buffer (stream annulé ou socket fermée)"""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        self._buffer.clear()
+        self._buffered_chars = 0
+
+    async def _flush_later(self):
+        """Forcer l'envoi si aucun token n'arrive avant la fin de l'intervalle"""
+        try:
+            delay = self.flush_interval - (time.monotonic() - self._last_flush)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._timer = None
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Erreur envoi différé du stream: {e}")
@@ -0,0 +1,104 @@
+"""
+Limitation et regroupement des événements de frappe par utilisateur et room
+Architecture Clean - Couche Infrastructure
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.settings import settings
+from app.core.logging import logger
+
+BroadcastHandler = Callable[[str, Dict[str, Any], Optional[str]], Awaitable[None]]
+
+
+class _TypingState:
+    __slots__ = ("username", "last_broadcast", "stop_timer")
+
+    def __init__(self, username: str):
+        self.username = username
+        self.last_broadcast = 0.0
+        self.stop_timer: Optional[asyncio.Task] = None
+
+
+class TypingPresenceService:
+    """
+    Diffuse les événements de frappe d'un utilisateur au plus une fois par
+    `throttle_ms`, et émet automatiquement `user_stopped_typing` après
+    `timeout_ms` sans nouvel événement `typing`.
+
+    Un `stop_typing` n'est diffusé que si un `user_typing` l'a été : les
+    doublons envoyés par les clients ne génèrent plus de trafic.
+    """
+
+    def __init__(
+        self,
+        broadcast: BroadcastHandler,
+        throttle_ms: Optional[int] = None,
+        timeout_ms: Optional[int] = None
+    ):
+        self.broadcast = broadcast
+        self.throttle = (settings.WS_TYPING_THROTTLE_MS if throttle_ms is None else throttle_ms) / 1000
+        self.timeout = (settings.WS_TYPING_TIMEOUT_MS if timeout_ms is None else timeout_ms) / 1000
+        self._states: Dict[Tuple[str, str], _TypingState] = {}
+
+        self.received = 0
+        self.broadcasted = 0
+
+    async def typing(self, room_id: str, user_id: str, username: str):
+        """Un client signale que l'utilisateur tape"""
+        self.received += 1
+        key = (room_id, user_id)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _TypingState(username)
+
+        now = time.monotonic()
+        if now - state.last_broadcast >= self.throttle:
+            state.last_broadcast = now
+            await self._send(room_id, user_id, username, "user_typing")
+
+        if state.stop_timer is not None:
+            state.stop_timer.cancel()
+        state.stop_timer = asyncio.create_task(self._expire(room_id, user_id))
+
+    async def stop_typing(self, room_id: str, user_id: str):
+        """Un client signale que l'utilisateur a cessé de taper"""
+        self.received += 1
+        await self.clear(room_id, user_id)
+
+    async def clear(self, room_id: str, user_id: str):
+        """Terminer l'état de frappe (message envoyé, déconnexion...)"""
+        state = self._states.pop((room_id, user_id), None)
+        if state is None:
+            return
+        if state.stop_timer is not None and state.stop_timer is not asyncio.current_task():
+            state.stop_timer.cancel()
+        await self._send(room_id, user_id, state.username, "user_stopped_typing")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "typing_users": len(self._states),
+            "received": self.received,
+            "broadcasted": self.broadcasted,
+        }
+
+    # ==================== Private methods ====================
+
+    async def _expire(self, room_id: str, user_id: str):
+        try:
+            await asyncio.sleep(self.timeout)
+            await self.clear(room_id, user_id)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Erreur arrêt automatique de frappe pour {user_id}: {e}")
+
+    async def _send(self, room_id: str, user_id: str, username: str, event_type: str):
+        self.broadcasted += 1
+        await self.broadcast(room_id, {
+            "type": event_type,
+            "user_id": user_id,
+            "username": username,
+            "timestamp": datetime.utcnow().isoformat()
+        }, user_id)
@@ -1,18 +1,30 @@
 
 
 import asyncio
+import math
 from datetime import datetime
-import json
+import uuid
 from typing import Any, Dict, Optional
-from app.core.logging import logger
-from app.core.security import verify_token
+from app.core.logging import hot_logger, logger
+from app.core.settings import settings
 from starlette.websockets import WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
 from fastapi import status
-from app.infrastructure.repositories.chat.chat_repository import ChatRepository
+from app.infrastructure.database import async_session_scope
+from app.infrastructure.repositories.chat.async_chat_repository import AsyncChatRepository
+from app.infrastructure.services.auth.auth_cache_service import auth_cache
+from app.infrastructure.services.chat.chat_message_writer_service import PendingMessage, chat_message_writer
+from app.infrastructure.services.memory.conversation_memory_service import ConversationMemoryService
 from app.infrastructure.services.ollama.ollama_service import OllamaService
 from app.infrastructure.services.rag.rag_service import RagService
+from app.infrastructure.services.rate_limit.rate_limiter_service import rate_limiter
 from app.infrastructure.services.websocket.connexion_manager_service import ConnectionManagerService
+from app.infrastructure.services.websocket.message_dispatcher_service import MessageDispatcherService
+from app.infrastructure.services.websocket.stream_buffer_service import StreamBuffer, StreamBufferService
+from app.infrastructure.services.websocket.stream_coalescer_service import StreamCoalescerService
+from app.infrastructure.services.websocket.typing_presence_service import TypingPresenceService
+from app.infrastructure.services.websocket.wire_protocol import negotiate_protocol
+
+frame_log = hot_logger("websocket.frames", __name__)
 
 
 class WebSocketChatService:
@@ -21,29 +33,23 @@ class WebSocketChatService:
     def __init__(self):
         self.connection_manager = ConnectionManagerService()
         self.ollama_service = OllamaService()
+        self.conversation_memory = ConversationMemoryService(self.ollama_service)
         self.active_ai_tasks: Dict[str, asyncio.Task] = {}
+        self.typing_presence = TypingPresenceService(self.connection_manager.broadcast_to_room)
+        self.stream_buffers = StreamBufferService()
     
     async def authenticate_websocket(self, token: str) -> Optional[Dict[str, Any]]:
-        """Authentifier une connexion WebSocket via JWT"""
+        """Authentifier une connexion WebSocket via JWT (cache d'authentification partagé avec HTTP)"""
         try:
-            logger.info(f"Tentative d'authentification WebSocket avec token: {token[:20]}...")
-            payload = verify_token(token)
-            if payload is None:
-                logger.error("Échec de vérification du token JWT - payload None")
-                return None
-            
-            logger.info(f"Payload JWT décodé: {payload}")
-            user_id = payload.get("user_id")
-            username = payload.get("sub")
-            
-            if not user_id or not username:
-                logger.error(f"Payload JWT incomplet - user_id: {user_id}, username: {username}")
+            user = await auth_cache.authenticate(token)
+            if user is None:
+                logger.error("Échec d'authentification WebSocket - token invalide ou utilisateur inactif")
                 return None
             
-            logger.info(f"Authentification WebSocket réussie pour user_id: {user_id}, username: {username}")
+            logger.debug(f"Authentification WebSocket réussie pour user_id: {user.id}, username: {user.username}")
             return {
-                "user_id": user_id,
-                "username": username
+                "user_id": str(user.id),
+                "username": user.username
             }
         except Exception as e:
             logger.error(f"Erreur authentification WebSocket: {e}")
@@ -53,92 +59,123 @@ class WebSocketChatService:
         self, 
         websocket: WebSocket, 
         session_id: str,
-        token: str,
-        db: Session
+        token: str
     ):
-        """Gérer une connexion WebSocket complète"""
+        """
+        Gérer une connexion WebSocket complète
+
+        Aucune session de base n'est tenue pendant la connexion : chaque unité
+        de travail (autorisation, persistance, RAG) ouvre une session courte.
+        """
 
-        logger.info(f"WebSocket: Connexion reçue - session_id={session_id}, token={token[:50]}...")
-        
         user_info = await self.authenticate_websocket(token)
-        logger.info(f"WebSocket: Résultat authentification - user_info={user_info}")
         if not user_info:
-            logger.error(f"WebSocket refuse: Invalid token {token[:50]}...")
+            logger.warning(f"WebSocket refusé: token invalide - session_id={session_id}")
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
             return
 
         user_id = user_info["user_id"]
         username = user_info["username"]
 
-        chat_repo = ChatRepository(db)
-        session = chat_repo.get_session_by_id(session_id, user_id)
-        logger.info(f"WebSocket: Résultat récupération session - session trouvée: {session is not None}")
-        if not session:
+        async with async_session_scope() as db:
+            session_found = await AsyncChatRepository(db).get_session_by_id(session_id, user_id) is not None
+        if not session_found:
             logger.error(f"WebSocket refuse: Session not found - session_id={session_id}, user_id={user_id}")
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Session not found or not owned by user")
             return
         
+        async def process(message_data: Dict[str, Any]):
+            await self.handle_message(message_data, session_id, user_id, username, websocket)
+        
+        async def reject(message_data: Dict[str, Any]):
+            await self.connection_manager.send_to_websocket(websocket, {
+                "type": "error",
+                "message": "Trop de messages en attente, réessayez plus tard",
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        
+        dispatcher = MessageDispatcherService(process, on_rejected=reject)
+        protocol = negotiate_protocol(websocket)
+        
         try:
-            await websocket.accept()
-            logger.info(f"✅ Connexion WebSocket acceptée pour {username}")
+            await websocket.accept(subprotocol=protocol.subprotocol)
+            logger.info(f"✅ Connexion WebSocket acceptée pour {username} (protocole {protocol.name})")
+            
+            rejection = self.connection_manager.check_admission(user_id)
+            if rejection:
+                logger.warning(f"WebSocket refusé pour {username}: {rejection}")
+                payload = protocol.encode({
+                    "type": "error",
+                    "code": "connection_limit",
+                    "message": rejection,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+                if isinstance(payload, bytes):
+                    await websocket.send_bytes(payload)
+                else:
+                    await websocket.send_text(payload)
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=rejection)
+                return
             
-            await self.connection_manager.add_to_room(websocket, session_id, user_id)
+            await self.connection_manager.add_to_room(websocket, session_id, user_id, protocol)
+            dispatcher.start()
             
-            await websocket.send_text(json.dumps({
+            await self.connection_manager.send_to_websocket(websocket, {
                 "type": "connection_established",
                 "session_id": session_id,
                 "user_id": user_id,
                 "username": username,
                 "timestamp": datetime.utcnow().isoformat()
-            }))
+            })
             
             while True:
-                logger.info(f"[{username}] En attente de message WebSocket...")
-                data = await websocket.receive_text()
+                data = await self._receive_frame(websocket)
+                self.connection_manager.touch(websocket)
                 
                 if not data.strip():
-                    logger.warning(f"[{username}] Message vide reçu, ignoré")
+                    frame_log.warning("[{}] Message vide reçu, ignoré", username)
                     continue
-                logger.info(f"[{username}] Message reçu: {data[:100]}...")
+                frame_log.debug("[{}] Message reçu: {!r}...", username, data[:100])
                 
                 try:
-                    message_data = json.loads(data)
-                except json.JSONDecodeError as e :
-                    logger.error(f"[{username}] Erreur décodage JSON: {e}")
-                    await websocket.send_text(json.dumps({
+                    message_data = protocol.decode(data)
+                    if not isinstance(message_data, dict):
+                        raise ValueError("message non objet")
+                except ValueError as e:
+                    logger.error(f"[{username}] Erreur décodage message: {e}")
+                    await self.connection_manager.send_to_websocket(websocket, {
                         "type": "error",
-                        "message": "Invalid JSON format",
+                        "message": "Invalid message format",
                         "timestamp": datetime.utcnow().isoformat()
-                    }))
+                    })
                     continue
                 
+                if message_data.get("type") == "chat_message":
+                    retry_after = await rate_limiter.acquire(user_id, "chat")
+                    if retry_after > 0:
+                        await self.connection_manager.send_to_websocket(websocket, {
+                            "type": "error",
+                            "code": "rate_limited",
+                            "message": "Trop de messages, réessayez plus tard",
+                            "retry_after": math.ceil(retry_after),
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+                        continue
                 
-                await self.handle_message(
-                    message_data, 
-                    session_id, 
-                    user_id, 
-                    username,
-                    websocket,
-                    db
-                )
+                await dispatcher.dispatch(message_data)
         
         except WebSocketDisconnect:
             logger.info(f"WebSocket déconnecté pour {username}")
-            if session_id in self.active_ai_tasks:
-                task = self.active_ai_tasks[session_id]
-                if not task.done():
-                    logger.info(f"Annulation de la tâche IA en cours pour session {session_id}")
-                    task.cancel()
-                del self.active_ai_tasks[session_id]
+            self.stream_buffers.unsubscribe(websocket)
             await self.connection_manager.disconnect(websocket)
+            await self._clear_typing(session_id, user_id)
         except Exception as e:
             logger.error(f"Erreur WebSocket pour {username}: {e}")
-            if session_id in self.active_ai_tasks:
-                task = self.active_ai_tasks[session_id]
-                if not task.done():
-                    task.cancel()
-                del self.active_ai_tasks[session_id]
+            self.stream_buffers.unsubscribe(websocket)
             await self.connection_manager.disconnect(websocket)
+            await self._clear_typing(session_id, user_id)
+        finally:
+            await dispatcher.stop()
     
     async def handle_message(
         self,
@@ -146,42 +183,44 @@ class WebSocketChatService:
         session_id: str,
         user_id: str,
         username: str,
-        websocket: WebSocket,
-        db: Session
+        websocket: WebSocket
     ):
         """Traiter un message reçu via WebSocket"""
         try:
             message_type = message_data.get("type")
             
             if message_type == "chat_message":
-                await self.handle_chat_message(message_data, session_id, user_id, username, websocket, db)
+                await self.typing_presence.clear(session_id, user_id)
+                await self.handle_chat_message(message_data, session_id, user_id, username, websocket)
             
             elif message_type == "typing":
-                await self.connection_manager.broadcast_to_room(session_id, {
-                    "type": "user_typing",
-                    "user_id": user_id,
-                    "username": username,
-                    "timestamp": datetime.utcnow().isoformat()
-                }, exclude_user=user_id)
+                await self.typing_presence.typing(session_id, user_id, username)
             
             elif message_type == "stop_typing":
-                await self.connection_manager.broadcast_to_room(session_id, {
-                    "type": "user_stopped_typing",
-                    "user_id": user_id,
-                    "username": username,
+                await self.typing_presence.stop_typing(session_id, user_id)
+            
+            elif message_type == "resume":
+                await self.handle_resume(message_data, session_id, websocket)
+            
+            elif message_type == "ping":
+                await self.connection_manager.send_to_websocket(websocket, {
+                    "type": "pong",
                     "timestamp": datetime.utcnow().isoformat()
-                }, exclude_user=user_id)
+                })
+            
+            elif message_type == "pong":
+                pass
             
             else:
                 logger.warning(f"Type de message non supporté: {message_type}")
         
         except Exception as e:
             logger.error(f"Erreur traitement message WebSocket: {e}")
-            await websocket.send_text(json.dumps({
+            await self.connection_manager.send_to_websocket(websocket, {
                 "type": "error",
                 "message": "Erreur lors du traitement du message",
                 "timestamp": datetime.utcnow().isoformat()
-            }))
+            })
     
     async def handle_chat_message(
         self,
@@ -189,103 +228,154 @@ class WebSocketChatService:
         session_id: str,
         user_id: str,
         username: str,
-        websocket: WebSocket,
-        db: Session
+        websocket: WebSocket
     ):
         """Traiter un message de chat avec IA"""
         try:
-            content = message_data.get("content", "").strip()
+            content = message_data.get("content", "")
+            content = content.strip() if isinstance(content, str) else ""
             if not content:
                 return
             
             use_rag = message_data.get("use_rag", True)
-            model = message_data.get("model", "mistral:7b")
+            model = message_data.get("model") or settings.OLLAMA_MODEL
+            
+            rejection = self._validate_chat_message(content, model)
+            if rejection:
+                await self.connection_manager.send_to_websocket(websocket, {
+                    "type": "error",
+                    "code": "invalid_message",
+                    "message": rejection,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+                return
             
-            chat_repo = ChatRepository(db)
             rag_service = RagService()
             
-            user_message = chat_repo.create_message(
+            user_message = chat_message_writer.submit(
                 session_id=session_id,
                 message_type="user",
                 content=content
             )
+            user_message_id, user_message_at = user_message.id, user_message.created_at
+            self._notify_if_lost(user_message, session_id)
             
             await self.connection_manager.broadcast_to_room(session_id, {
                 "type": "user_message",
-                "message_id": str(user_message.id),
+                "message_id": str(user_message_id),
                 "user_id": user_id,
                 "username": username,
                 "content": content,
-                "timestamp": user_message.created_at.isoformat()
+                "timestamp": user_message_at.isoformat()
             })
             
+            ai_message_id = uuid.uuid4()
+            stream_buffer = self.stream_buffers.create(str(ai_message_id), session_id)
+            if self.connection_manager.get_connection(websocket) is not None:
+                self._subscribe(stream_buffer, websocket, offset=0)
+            
             await self.connection_manager.broadcast_to_room(session_id, {
                 "type": "ai_thinking",
+                "message_id": str(ai_message_id),
                 "timestamp": datetime.utcnow().isoformat()
             })
             
             rag_context = ""
             if use_rag:
-                relevant_chunks = await rag_service.retrieve_relevant_chunks(
-                    content, user_id, db
-                )
+                async with async_session_scope() as db:
+                    relevant_chunks = await rag_service.retrieve_relevant_chunks(
+                        content, user_id, db
+                    )
                 if relevant_chunks:
                     rag_context = rag_service.build_rag_context(relevant_chunks)
                     
                 if rag_context is None:
                     rag_context = ""
             
+            history = []
+            if settings.OLLAMA_USE_CHAT_API:
+                async with async_session_scope() as db:
+                    history = await self.conversation_memory.build_history(
+                        AsyncChatRepository(db), session_id, exclude_message_id=user_message_id
+                    )
+            
             async def generate_ai_response():
+                final_message: Optional[Dict[str, Any]] = None
                 try:
                     response_chunks = []
+                    generation_metrics: Dict[str, Any] = {}
                     start_time = datetime.now()
-                    async for chunk in self.ollama_service.generate_stream_response(
-                        prompt=content,
-                        model=model,
-                        context=rag_context,
-                        max_tokens=1000,
-                        temperature=0.7
-                    ):
+                    
+                    if settings.OLLAMA_USE_CHAT_API:
+                        stream = self.ollama_service.generate_chat_stream(
+                            prompt=content,
+                            history=history,
+                            model=model,
+                            context=rag_context,
+                            max_tokens=1000,
+                            temperature=0.7,
+                            metrics=generation_metrics
+                        )
+                    else:
+                        stream = self.ollama_service.generate_stream_response(
+                            prompt=content,
+                            model=model,
+                            context=rag_context,
+                            max_tokens=1000,
+                            temperature=0.7,
+                            metrics=generation_metrics
+                        )
+                    async for chunk in stream:
                         response_chunks.append(chunk)
-                        await websocket.send_text(json.dumps({
-                            "type": "ai_message_stream",
-                            "content": chunk,
-                            "timestamp": datetime.now().isoformat()
-                        }))
+                        await stream_buffer.append(chunk)
                     full_response = "".join(response_chunks)
                     response_time = int((datetime.now() - start_time).total_seconds() * 1000)
-                    ai_message = chat_repo.create_message(
+                    ai_message = chat_message_writer.submit(
                         session_id=session_id,
                         message_type="assistant",
                         content=full_response,
                         llm_used=model,
-                        tokens_used=len(full_response.split()),
-                        response_time=response_time
+                        tokens_used=generation_metrics.get("eval_count"),
+                        response_time=response_time,
+                        metrics=generation_metrics,
+                        message_id=ai_message_id
                     )
+                    ai_message_at = ai_message.created_at
+                    self._notify_if_lost(ai_message, session_id)
                     
-                    await self.connection_manager.broadcast_to_room(session_id, {
+                    final_message = {
                         "type": "ai_message",
-                        "message_id": str(ai_message.id),
+                        "message_id": str(ai_message_id),
                         "content": full_response,
                         "llm_used": model,
                         "response_time": response_time,
-                        "tokens_used": len(full_response.split()),
-                        "timestamp": ai_message.created_at.isoformat()
-                    })
+                        "tokens_used": generation_metrics.get("eval_count"),
+                        "prompt_tokens": generation_metrics.get("prompt_eval_count"),
+                        "time_to_first_token": generation_metrics.get("time_to_first_token"),
+                        "tokens_per_second": generation_metrics.get("tokens_per_second"),
+                        "timestamp": ai_message_at.isoformat()
+                    }
+                    streamed_to = await stream_buffer.finish(final_message)
+                    await self._broadcast_final_message(session_id, final_message, streamed_to)
+                    
+                    if settings.OLLAMA_USE_CHAT_API:
+                        self.conversation_memory.schedule_summary(session_id, model)
                 except asyncio.CancelledError:
                     logger.info(f"Génération IA annulée pour session {session_id}")
                     
                 except Exception as e:
                     logger.error(f"Erreur génération IA pour session {session_id}: {e}")
                     try:
-                        await websocket.send_text(json.dumps({
+                        await self.connection_manager.send_to_websocket(websocket, {
                             "type": "ai_error",
                             "error": str(e),
                             "timestamp": datetime.utcnow().isoformat()
-                        }))
+                        })
                     except Exception:
                         pass  
                 finally:
+                    if not stream_buffer.done:
+                        await stream_buffer.finish(final_message)
                     if session_id in self.active_ai_tasks:
                         del self.active_ai_tasks[session_id]
             
@@ -294,11 +384,123 @@ class WebSocketChatService:
         
         except Exception as e:
             logger.error(f"Erreur traitement message chat: {e}")
-            await websocket.send_text(json.dumps({
+            await self.connection_manager.send_to_websocket(websocket, {
                 "type": "error",
                 "message": "Erreur lors du traitement du message",
                 "timestamp": datetime.utcnow().isoformat()
-            }))
+            })
+    
+    async def handle_resume(self, message_data: Dict[str, Any], session_id: str, websocket: WebSocket):
+        """Reprendre un stream IA à partir d'un offset (reconnexion en cours de réponse)"""
+        message_id = str(message_data.get("message_id", ""))
+        try:
+            offset = int(message_data.get("offset", 0))
+        except (TypeError, ValueError):
+            offset = -1
+        
+        stream_buffer = self.stream_buffers.get(message_id)
+        if stream_buffer is not None and stream_buffer.session_id != session_id:
+            stream_buffer = None
+        
+        backlog = stream_buffer.read_from(offset) if stream_buffer is not None else None
+        if backlog is None:
+            await self.connection_manager.send_to_websocket(websocket, {
+                "type": "resume_unavailable",
+                "message_id": message_id,
+                "available_from": stream_buffer.base_offset if stream_buffer is not None else None,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+            return
+        
+        logger.info(f"Reprise du stream {message_id} à l'offset {offset} ({len(backlog)} caractères en attente)")
+        coalescer = self._subscribe(stream_buffer, websocket, offset)
+        await coalescer.push(backlog)
+        
+        if stream_buffer.done:
+            stream_buffer.unsubscribe(websocket)
+            await coalescer.close()
+            if stream_buffer.final_message is not None:
+                await self.connection_manager.send_to_websocket(websocket, stream_buffer.final_message)
+    
+    # ==================== Private methods ====================
+    
+    @staticmethod
+    async def _receive_frame(websocket: WebSocket):
+        """Lire une frame texte ou binaire (MessagePack)"""
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+        if message.get("bytes") is not None:
+            return message["bytes"]
+        return message.get("text") or ""
+    
+    async def _broadcast_final_message(self, session_id: str, final_message: Dict[str, Any], streamed_to):
+        """
+        Diffuser la réponse finale ; les connexions stream_ref qui ont reçu tout
+        le stream n'ont que la référence au contenu (content_ref), pas le texte.
+        """
+        by_reference = {
+            websocket for websocket in streamed_to
+            if self.connection_manager.get_protocol(websocket).stream_ref
+        }
+        if by_reference:
+            reference = {key: value for key, value in final_message.items() if key != "content"}
+            reference["content_ref"] = final_message["message_id"]
+            reference["content_length"] = len(final_message["content"])
+            for websocket in by_reference:
+                await self.connection_manager.send_to_websocket(websocket, reference)
+        await self.connection_manager.broadcast_to_room(session_id, final_message, exclude_websockets=by_reference)
+    
+    def _subscribe(self, stream_buffer: StreamBuffer, websocket: WebSocket, offset: int) -> StreamCoalescerService:
+        """Abonner une connexion au stream ; chaque frame porte son offset pour une reprise ultérieure"""
+        position = {"offset": offset}
+        
+        async def send_stream_frame(stream_content: str):
+            frame_offset = position["offset"]
+            position["offset"] += len(stream_content)
+            await self.connection_manager.send_to_websocket(websocket, {
+                "type": "ai_message_stream",
+                "message_id": stream_buffer.message_id,
+                "offset": frame_offset,
+                "content": stream_content,
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        coalescer = StreamCoalescerService(send_stream_frame)
+        stream_buffer.subscribers[websocket] = coalescer
+        return coalescer
+    
+    @staticmethod
+    def _validate_chat_message(content: str, model: Any) -> Optional[str]:
+        """Refuser avant soumission ce que la base rejetterait (NUL dans un TEXT, modèle inconnu)"""
+        if "\x00" in content:
+            return "Le message contient un caractère nul"
+        allowed_models = set(settings.OLLAMA_ALLOWED_MODELS) | {settings.OLLAMA_MODEL}
+        if not isinstance(model, str) or model not in allowed_models:
+            return f"Modèle non autorisé: {str(model)[:50]}"
+        return None
+    
+    def _notify_if_lost(self, message: PendingMessage, session_id: str):
+        """Prévenir la room si l'écriture différée du message échoue définitivement"""
+        async def notify():
+            await self.connection_manager.broadcast_to_room(session_id, {
+                "type": "error",
+                "code": "message_not_saved",
+                "message_id": str(message.id),
+                "message": "Le message n'a pas pu être enregistré",
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        
+        def on_persisted(persisted: asyncio.Future):
+            if not persisted.cancelled() and persisted.result() is False:
+                asyncio.create_task(notify())
+        
+        message.persisted.add_done_callback(on_persisted)
+    
+    async def _clear_typing(self, session_id: str, user_id: str):
+        """Arrêter l'indicateur de frappe quand le dernier onglet de l'utilisateur quitte la room"""
+        if user_id not in self.connection_manager.get_room_users(session_id):
+            await self.typing_presence.clear(session_id, user_id)
 
 
 websocket_chat_service = WebSocketChatService()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Métriques de traitement des messages WebSocket par type
+Architecture Clean - Couche Infrastructure
+"""
+from collections import deque
+from threading import Lock
+from typing import Any, Dict
+
+
+class WebSocketMetrics:
+    """
+    Latences de traitement par type de message entrant
+
+    wait_ms : temps passé dans la file de travail avant traitement (0 pour
+    les messages traités immédiatement) ; handle_ms : durée du handler.
+    Seules les SAMPLE_SIZE dernières mesures sont gardées pour les percentiles.
+    Le type vient du client : hors KNOWN_TYPES (types traités par
+    handle_message), tout est compté dans le seul type "unknown".
+    """
+
+    SAMPLE_SIZE = 1000
+    KNOWN_TYPES = frozenset({"chat_message", "typing", "stop_typing", "resume", "ping", "pong"})
+    UNKNOWN_TYPE = "unknown"
+
+    def __init__(self):
+        self._types: Dict[str, Dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def record(self, message_type: str, wait_ms: float, handle_ms: float) -> None:
+        """Enregistrer le traitement d'un message"""
+        with self._lock:
+            stats = self._entry(message_type)
+            stats["count"] += 1
+            stats["wait"].append(wait_ms)
+            stats["handle"].append(handle_ms)
+
+    def record_rejected(self, message_type: str) -> None:
+        """Compter un message refusé (file de travail pleine)"""
+        with self._lock:
+            self._entry(message_type)["rejected"] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Compteurs et percentiles p50/p95/max par type de message"""
+        with self._lock:
+            snapshot = {
+                message_type: (stats["count"], stats["rejected"], list(stats["wait"]), list(stats["handle"]))
+                for message_type, stats in self._types.items()
+            }
+
+        return {
+            message_type: {
+                "count": count,
+                "rejected": rejected,
+                "wait_ms": self._summarize(wait),
+                "handle_ms": self._summarize(handle),
+            }
+            for message_type, (count, rejected, wait, handle) in snapshot.items()
+        }
+
+    def reset(self) -> None:
+        """Réinitialiser les compteurs"""
+        with self._lock:
+            self._types.clear()
+
+    # ==================== Private methods ====================
+
+    def _entry(self, message_type: str) -> Dict[str, Any]:
+        if message_type not in self.KNOWN_TYPES:
+            message_type = self.UNKNOWN_TYPE
+        stats = self._types.get(message_type)
+        if stats is None:
+            stats = self._types[message_type] = {
+                "count": 0,
+                "rejected": 0,
+                "wait": deque(maxlen=self.SAMPLE_SIZE),
+                "handle": deque(maxlen=self.SAMPLE_SIZE),
+            }
+        return stats
+
+    @staticmethod
+    def _summarize(samples) -> Dict[str, Any]:
+        if not samples:
+            return {"p50": None, "p95": None, "max": None}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "p50": round(ordered[last // 2], 2),
+            "p95": round(ordered[int(last * 0.95)], 2),
+            "max": round(ordered[last], 2),
+        }
+
+
+websocket_metrics = WebSocketMetrics()
@@ -0,0 +1,87 @@
+"""
+Protocoles de sérialisation des frames WebSocket (JSON texte, MessagePack binaire)
+Architecture Clean - Couche Infrastructure
+"""
+import json
+from typing import Any, Dict, Optional, Tuple, Union
+from starlette.websockets import WebSocket
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+Payload = Union[str, bytes]
+
+SUBPROTOCOL_PREFIX = "t7."
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+class WireProtocol:
+    """
+    Encodage négocié pour une connexion
+
+    - name : "json" (frames texte) ou "msgpack" (frames binaires) ;
+    - stream_ref : le message `ai_message` final ne renvoie pas le texte déjà
+      streamé à cette connexion, il le référence par `content_ref` (message_id).
+    Les frames texte JSON sont toujours acceptées en entrée.
+    """
+
+    __slots__ = ("name", "stream_ref", "subprotocol")
+
+    def __init__(self, name: str = "json", stream_ref: bool = False, subprotocol: Optional[str] = None):
+        self.name = name
+        self.stream_ref = stream_ref
+        self.subprotocol = subprotocol
+
+    @property
+    def binary(self) -> bool:
+        return self.name == "msgpack"
+
+    def encode(self, message: Dict[str, Any]) -> Payload:
+        if self.binary:
+            return msgpack.packb(message, use_bin_type=True, default=str)
+        return json.dumps(message)
+
+    def decode(self, data: Payload) -> Dict[str, Any]:
+        if isinstance(data, bytes):
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Frames binaires non supportées (msgpack non disponible)")
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+
+JSON_PROTOCOL = WireProtocol()
+
+
+def negotiate_protocol(websocket: WebSocket) -> WireProtocol:
+    """
+    Choisir le protocole d'une connexion
+
+    Sous-protocole WebSocket (`t7.msgpack`, `t7.json`, suffixe `+ref` pour
+    stream_ref), sinon query params `protocol=msgpack` et `stream_ref=true`.
+    MessagePack n'est retenu que si la dépendance est installée.
+    """
+    offered = getattr(websocket, "scope", {}).get("subprotocols") or []
+    for subprotocol in offered:
+        name, stream_ref = _parse_subprotocol(subprotocol)
+        if name == "json" or (name == "msgpack" and MSGPACK_AVAILABLE):
+            return WireProtocol(name, stream_ref, subprotocol=subprotocol)
+
+    params = websocket.query_params
+    name = params.get("protocol", "json")
+    if name != "msgpack" or not MSGPACK_AVAILABLE:
+        name = "json"
+    stream_ref = params.get("stream_ref", "").lower() in TRUE_VALUES
+    if name == "json" and not stream_ref:
+        return JSON_PROTOCOL
+    return WireProtocol(name, stream_ref)
+
+
+def _parse_subprotocol(subprotocol: str) -> Tuple[Optional[str], bool]:
+    if not subprotocol.startswith(SUBPROTOCOL_PREFIX):
+        return None, False
+    name, _, option = subprotocol[len(SUBPROTOCOL_PREFIX):].partition("+")
+    return name, option == "ref"
@@ -8,6 +8,12 @@ from fastapi.exceptions import RequestValidationError
 from app.core.settings import settings
 from app.core.logging import setup_logging
 from app.api.v1.router import api_router
+from app.api.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.infrastructure.services.auth.password_hasher_service import password_hasher
+from app.infrastructure.services.chat.chat_message_writer_service import chat_message_writer
+from app.infrastructure.services.chat.chat_partition_service import chat_partition_service
+from app.infrastructure.services.rate_limit.rate_limiter_service import rate_limiter
+from app.infrastructure.services.websocket.websocket_chat_service import websocket_chat_service
 from app.core.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -34,6 +40,8 @@ def create_application() -> FastAPI:
         websockets_ping_timeout=20   
     )
     
+    # Ajouté avant CORS pour que les réponses 429 portent les en-têtes CORS
+    app.add_middleware(RateLimitMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.BACKEND_CORS_ORIGINS,
@@ -61,12 +69,22 @@ async def startup_event():
     logger.info(f"📚 Documentation disponible sur: http://{settings.HOST}:{settings.PORT}/api/docs")
     logger.info(f"📖 ReDoc disponible sur: http://{settings.HOST}:{settings.PORT}/api/redoc")
     logger.info(f"🌐 API accessible sur: http://{settings.HOST}:{settings.PORT}/api/v1")
+    await websocket_chat_service.connection_manager.start()
+    chat_message_writer.start()
+    chat_partition_service.start()
+    password_hasher.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Événements à l'arrêt de l'application"""
     logger.info("🛑 Arrêt de l'application")
+    await websocket_chat_service.connection_manager.stop()
+    await chat_message_writer.stop()
+    await chat_partition_service.stop()
+    await password_hasher.stop()
+    await rate_limiter.stop()
+    await logger.complete()
 
 
 @app.get("/")
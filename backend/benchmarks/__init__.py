@@ -0,0 +1,4 @@
+"""
+Benchmarks et outils de mesure de performance du backend
+Usage: python -m benchmarks.<module> depuis le dossier backend
+"""
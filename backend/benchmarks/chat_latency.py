@@ -0,0 +1,226 @@
+"""
+Benchmark de latence du chat de bout en bout (WebSocketChatService)
+
+Pilote WebSocketChatService en process avec des sockets simulées :
+authentification JWT, vérification de la session, persistance des messages
+et streaming depuis Ollama (réel ou benchmarks.fake_ollama). Mesure le
+time-to-first-token, le débit en tokens/s et la latence complète à des
+niveaux de concurrence croissants. Nécessite la base PostgreSQL configurée.
+
+Usage:
+    python -m benchmarks.chat_latency --spawn-fake --concurrency 1,8,32,64 --messages 5
+    python -m benchmarks.chat_latency --spawn-fake --concurrency 1 --record session.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from benchmarks.stats import summarize
+
+
+class BenchWebSocket:
+    """WebSocket en mémoire : les frames envoyées sont horodatées à la réception"""
+
+    def __init__(self, recording: Optional[List[str]] = None):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.frames: asyncio.Queue = asyncio.Queue()
+        self.query_params: Dict[str, str] = {}
+        self.headers: Dict[str, str] = {}
+        self.scope: Dict = {"subprotocols": []}
+        self.recording = recording
+        self.closed = False
+
+    async def accept(self, subprotocol: Optional[str] = None, headers=None):
+        pass
+
+    async def receive_text(self) -> str:
+        from starlette.websockets import WebSocketDisconnect
+
+        data = await self.incoming.get()
+        if data is None:
+            raise WebSocketDisconnect(code=1000)
+        return data
+
+    async def receive(self) -> Dict:
+        data = await self.incoming.get()
+        if data is None:
+            return {"type": "websocket.disconnect", "code": 1000}
+        return {"type": "websocket.receive", "text": data}
+
+    async def send_text(self, data: str):
+        if self.recording is not None:
+            self.recording.append(data)
+        self.frames.put_nowait((time.perf_counter(), data))
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        self.closed = True
+        self.frames.put_nowait((time.perf_counter(), json.dumps({"type": "closed", "code": code, "reason": reason})))
+
+    async def next_frame(self, timeout: float):
+        at, data = await asyncio.wait_for(self.frames.get(), timeout)
+        return at, json.loads(data)
+
+
+async def run_client(
+    service,
+    session_id: str,
+    token: str,
+    messages: int,
+    timeout: float,
+    results: Dict[str, List[float]],
+    recording: Optional[List[str]] = None
+):
+    """Un client : connexion, puis `messages` tours de chat séquentiels"""
+    websocket = BenchWebSocket(recording)
+    connection = asyncio.create_task(service.handle_websocket_connection(websocket, session_id, token))
+    try:
+        _, frame = await websocket.next_frame(timeout)
+        if frame.get("type") != "connection_established":
+            results["errors"].append(1)
+            return
+
+        for i in range(messages):
+            sent_at = time.perf_counter()
+            websocket.incoming.put_nowait(json.dumps({
+                "type": "chat_message",
+                "content": f"Question de benchmark numéro {i}",
+                "use_rag": False,
+            }))
+            first_token_at = None
+            while True:
+                at, frame = await websocket.next_frame(timeout)
+                kind = frame.get("type")
+                if kind == "ai_message_stream" and first_token_at is None:
+                    first_token_at = at
+                elif kind == "ai_message":
+                    total = at - sent_at
+                    results["latency_ms"].append(total * 1000)
+                    if first_token_at is not None:
+                        results["ttft_ms"].append((first_token_at - sent_at) * 1000)
+                        stream_time = at - first_token_at
+                        tokens = frame.get("tokens_used") or 0
+                        if tokens and stream_time > 0:
+                            results["tokens_per_s"].append(tokens / stream_time)
+                    break
+                elif kind in ("ai_error", "error", "closed"):
+                    results["errors"].append(1)
+                    break
+    except asyncio.TimeoutError:
+        results["errors"].append(1)
+    finally:
+        websocket.incoming.put_nowait(None)
+        try:
+            await asyncio.wait_for(connection, timeout)
+        except Exception:
+            connection.cancel()
+
+
+def prepare_sessions(count: int) -> List[tuple]:
+    """Un utilisateur de benchmark et une session par client : (token, session_id)
+
+    Des utilisateurs distincts évitent que WS_MAX_CONNECTIONS_PER_USER ne
+    refuse les clients au-delà de la limite par utilisateur.
+    """
+    from app.core.security import create_access_token
+    from app.infrastructure.database import SessionLocal
+    from app.infrastructure.repositories import ChatRepository, UserRepository
+
+    db = SessionLocal()
+    try:
+        users = UserRepository(db)
+        chats = ChatRepository(db)
+        clients = []
+        for i in range(count):
+            username = f"bench_user_{i}"
+            user = users.get_user_by_username(username) or users.create_user(
+                username=username, email=f"{username}@local.dev", password=uuid.uuid4().hex
+            )
+            token = create_access_token({"sub": user.username, "user_id": str(user.id)})
+            clients.append((token, str(chats.create_session(user_id=user.id, title="Benchmark").id)))
+        return clients
+    finally:
+        db.close()
+
+
+async def run_level(concurrency: int, messages: int, timeout: float, recording: Optional[List[str]] = None) -> Dict:
+    from app.infrastructure.services.websocket.websocket_chat_service import WebSocketChatService
+
+    service = WebSocketChatService()
+    clients = prepare_sessions(concurrency)
+    results: Dict[str, List[float]] = {"latency_ms": [], "ttft_ms": [], "tokens_per_s": [], "errors": []}
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_client(service, session_id, token, messages, timeout, results, recording) for token, session_id in clients
+    ])
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "completed": len(results["latency_ms"]),
+        "errors": len(results["errors"]),
+        "answers_per_s": round(len(results["latency_ms"]) / wall, 2),
+        "ttft_ms": summarize(results["ttft_ms"]),
+        "latency_ms": summarize(results["latency_ms"]),
+        "tokens_per_s": summarize(results["tokens_per_s"]),
+    }
+
+
+async def run_levels(levels: List[int], messages: int, timeout: float, recording: Optional[List[str]] = None):
+    """Tous les niveaux dans une seule boucle : le writer et le pool asyncpg y sont liés"""
+    from app.infrastructure.database import async_engine
+    from app.infrastructure.services.chat.chat_message_writer_service import chat_message_writer
+
+    try:
+        for level in levels:
+            print(json.dumps(await run_level(level, messages, timeout, recording), ensure_ascii=False))
+    finally:
+        await chat_message_writer.stop()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16,64", help="niveaux de concurrence séparés par des virgules")
+    parser.add_argument("--messages", type=int, default=3, help="tours de chat par client")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--ollama-url", default=None, help="URL Ollama (défaut: settings.OLLAMA_BASE_URL)")
+    parser.add_argument("--spawn-fake", action="store_true", help="démarrer benchmarks.fake_ollama sur --fake-port")
+    parser.add_argument("--fake-port", type=int, default=11500)
+    parser.add_argument("--fake-args", default="", help="arguments supplémentaires pour fake_ollama")
+    parser.add_argument("--record", default=None, help="enregistrer les frames reçues (JSONL) pour benchmarks.wire_protocol")
+    args = parser.parse_args()
+
+    fake = None
+    if args.spawn_fake:
+        fake = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_ollama", "--port", str(args.fake_port), *args.fake_args.split()]
+        )
+        args.ollama_url = args.ollama_url or f"http://127.0.0.1:{args.fake_port}"
+        time.sleep(1.5)
+    # Doit précéder l'import des services, qui lisent settings au chargement
+    if args.ollama_url:
+        os.environ["OLLAMA_BASE_URL"] = args.ollama_url
+    # La limitation par utilisateur refuserait des tours (rate_limited) au lieu de mesurer le chat
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    recording: Optional[List[str]] = [] if args.record else None
+    try:
+        levels = [int(c) for c in args.concurrency.split(",")]
+        asyncio.run(run_levels(levels, args.messages, args.timeout, recording))
+        if recording is not None:
+            with open(args.record, "w", encoding="utf-8") as f:
+                f.writelines(frame + "\n" for frame in recording)
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait()
+
+
+if __name__ == "__main__":
+    main()
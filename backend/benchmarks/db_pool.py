@@ -0,0 +1,98 @@
+"""
+Surcoût de connexion par requête : NullPool (avant) vs pool borné (après)
+
+Chaque « requête » ouvre une session, exécute `SELECT 1` et la ferme, comme
+un endpoint avec get_db / get_async_db. En mode null, chaque requête paie
+une connexion neuve (TCP, TLS, authentification) ; en mode pooled, seules
+les premières. Affiche latence par requête, débit, temps d'obtention de
+connexion et nombre de connexions ouvertes, pour l'engine sync (requêtes
+séquentielles) et l'engine async (--concurrency requêtes simultanées).
+
+Usage:
+    python -m benchmarks.db_pool --requests 500 --concurrency 20
+    python -m benchmarks.db_pool --modes null pooled pgbouncer
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.infrastructure.database_pool import database_pool_metrics, engine_options, pool_status
+from benchmarks.stats import summarize
+
+
+def run_sync(mode: str, requests: int) -> Dict:
+    """Requêtes séquentielles sur l'engine sync"""
+    engine = create_engine(settings.DATABASE_URL, **engine_options(f"sync-{mode}"))
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        with Session(engine) as db:
+            db.execute(text("SELECT 1"))
+        latencies.append((time.perf_counter() - request_start) * 1000)
+    elapsed = time.perf_counter() - start
+    status = pool_status(engine.pool)
+    engine.dispose()
+    return {"latencies": latencies, "elapsed": elapsed, "pool": status}
+
+
+async def run_async(mode: str, requests: int, concurrency: int) -> Dict:
+    """`concurrency` clients simultanés sur l'engine async"""
+    engine = create_async_engine(settings.DATABASE_URL_ASYNC, **engine_options(f"async-{mode}", asynchronous=True))
+    latencies: List[float] = []
+    remaining = requests
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            request_start = time.perf_counter()
+            async with AsyncSession(engine) as db:
+                await db.execute(text("SELECT 1"))
+            latencies.append((time.perf_counter() - request_start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    status = pool_status(engine.pool)
+    await engine.dispose()
+    return {"latencies": latencies, "elapsed": elapsed, "pool": status}
+
+
+def print_result(name: str, metrics_name: str, result: Dict):
+    pool_metrics = database_pool_metrics.get_stats(metrics_name)
+    latency = summarize(result["latencies"])
+    print(f"\n{name}")
+    print(f"  requêtes: {latency['count']}  débit: {latency['count'] / result['elapsed']:.0f} req/s")
+    print(f"  latence ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    print(f"  connexions ouvertes: {pool_metrics['connects']}  timeouts: {pool_metrics['timeouts']}")
+    print(f"  obtention ms: {pool_metrics['checkout_ms']}  ouverture ms: {pool_metrics['connect_ms']}")
+    print(f"  pool en fin de run: {result['pool']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", default=["null", "pooled"], choices=["null", "pooled", "pgbouncer"])
+    parser.add_argument("--skip-sync", action="store_true")
+    parser.add_argument("--skip-async", action="store_true")
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        settings.DB_POOL_MODE = mode
+        if not args.skip_sync:
+            print_result(f"sync / {mode}", f"sync-{mode}", run_sync(mode, args.requests))
+        if not args.skip_async:
+            result = await run_async(mode, args.requests, args.concurrency)
+            print_result(f"async x{args.concurrency} / {mode}", f"async-{mode}", result)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,230 @@
+"""
+Serveur Ollama factice pour les tests de charge sans modèle
+
+Implémente /api/generate, /api/chat, /api/tags, /api/ps et /api/version avec
+le même format de réponse (NDJSON en streaming, compteurs et durées en fin de
+stream). Le prefill est simulé proportionnellement aux tokens du prompt non
+couverts par le préfixe déjà vu (cache KV à un slot par modèle), puis les
+tokens sont émis au débit configuré.
+
+Usage:
+    python -m benchmarks.fake_ollama --port 11500 --tokens-per-second 50 \
+        --prefill-ms-per-token 0.5 --jitter 0.2 --failure-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "Voici une réponse simulée par le serveur factice afin de mesurer la latence "
+    "du backend sans dépendre d'un vrai modèle de langage ni d'un GPU disponible"
+).split()
+
+
+class FakeOllamaConfig:
+    """Paramètres de simulation"""
+
+    def __init__(
+        self,
+        load_ms: float = 0.0,
+        prefill_base_ms: float = 20.0,
+        prefill_ms_per_token: float = 0.5,
+        tokens_per_second: float = 50.0,
+        response_tokens: int = 60,
+        jitter: float = 0.1,
+        failure_rate: float = 0.0,
+        stream_abort_rate: float = 0.0,
+        model: str = "mistral:7b",
+    ):
+        self.load_ms = load_ms
+        self.prefill_base_ms = prefill_base_ms
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.stream_abort_rate = stream_abort_rate
+        self.model = model
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _jittered(seconds: float, jitter: float) -> float:
+    if jitter <= 0:
+        return seconds
+    return max(0.0, seconds * random.uniform(1 - jitter, 1 + jitter))
+
+
+def create_app(config: FakeOllamaConfig) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+    prefix_cache: Dict[str, List[str]] = {}
+
+    def prefill_tokens(model: str, prompt_tokens: List[str]) -> int:
+        """Nombre de tokens à évaluer après le préfixe commun avec la requête précédente"""
+        cached = prefix_cache.get(model, [])
+        shared = 0
+        for a, b in zip(cached, prompt_tokens):
+            if a != b:
+                break
+            shared += 1
+        prefix_cache[model] = prompt_tokens
+        return max(1, len(prompt_tokens) - shared)
+
+    async def run_generation(model: str, prompt_tokens: List[str], options: Dict[str, Any], chat: bool, stream: bool):
+        if random.random() < config.failure_rate:
+            return JSONResponse(status_code=500, content={"error": "fake failure injected"})
+
+        num_predict = options.get("num_predict") or config.response_tokens
+        count = min(config.response_tokens, num_predict) if num_predict > 0 else config.response_tokens
+        evaluated = prefill_tokens(model, prompt_tokens)
+        token_interval = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+
+        def chunk(content: str, done: bool) -> Dict[str, Any]:
+            body: Dict[str, Any] = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                body["message"] = {"role": "assistant", "content": content}
+            else:
+                body["response"] = content
+            return body
+
+        async def produce():
+            started = time.perf_counter()
+            load = config.load_ms / 1000
+            prefill = _jittered((config.prefill_base_ms + config.prefill_ms_per_token * evaluated) / 1000, config.jitter)
+            await asyncio.sleep(load + prefill)
+
+            eval_started = time.perf_counter()
+            pieces = []
+            for i in range(count):
+                if i and random.random() < config.stream_abort_rate / count:
+                    raise RuntimeError("fake stream abort injected")
+                piece = (" " if i else "") + WORDS[i % len(WORDS)]
+                pieces.append(piece)
+                yield chunk(piece, False)
+                await asyncio.sleep(_jittered(token_interval, config.jitter))
+            eval_duration = time.perf_counter() - eval_started
+
+            final = chunk("", True)
+            final.update({
+                "done_reason": "stop",
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": evaluated,
+                "prompt_eval_duration": int(prefill * 1e9),
+                "eval_count": count,
+                "eval_duration": int(eval_duration * 1e9),
+            })
+            if not chat:
+                final["context"] = list(range(len(prompt_tokens) + count))
+            yield final
+
+        if not stream:
+            content, final = [], {}
+            async for body in produce():
+                if body["done"]:
+                    final = body
+                else:
+                    content.append(body["message"]["content"] if chat else body["response"])
+            if chat:
+                final["message"] = {"role": "assistant", "content": "".join(content)}
+            else:
+                final["response"] = "".join(content)
+            return JSONResponse(final)
+
+        async def ndjson():
+            async for body in produce():
+                yield json.dumps(body) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        prompt = f"{body.get('system') or ''}\n{body.get('prompt') or ''}"
+        return await run_generation(
+            body.get("model", config.model), prompt.split(), body.get("options") or {},
+            chat=False, stream=body.get("stream", True)
+        )
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        tokens: List[str] = []
+        for message in body.get("messages") or []:
+            tokens.append(f"<{message.get('role')}>")
+            tokens.extend((message.get("content") or "").split())
+        return await run_generation(
+            body.get("model", config.model), tokens, body.get("options") or {},
+            chat=True, stream=body.get("stream", True)
+        )
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{
+            "name": config.model,
+            "model": config.model,
+            "modified_at": _now(),
+            "size": 4_100_000_000,
+            "digest": "fake",
+            "details": {"format": "gguf", "family": "fake", "parameter_size": "7B", "quantization_level": "Q4_0"},
+        }]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {"models": [{
+            "name": config.model,
+            "model": config.model,
+            "size": 4_100_000_000,
+            "digest": "fake",
+            "expires_at": _now(),
+            "size_vram": 4_100_000_000,
+        }]}
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-fake"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--model", default="mistral:7b")
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    parser.add_argument("--prefill-base-ms", type=float, default=20.0)
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument("--jitter", type=float, default=0.1, help="variation relative des délais (0.1 = ±10%%)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probabilité d'une erreur HTTP 500")
+    parser.add_argument("--stream-abort-rate", type=float, default=0.0, help="probabilité d'une coupure en cours de stream")
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        load_ms=args.load_ms,
+        prefill_base_ms=args.prefill_base_ms,
+        prefill_ms_per_token=args.prefill_ms_per_token,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        stream_abort_rate=args.stream_abort_rate,
+        model=args.model,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
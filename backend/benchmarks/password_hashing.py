@@ -0,0 +1,95 @@
+"""
+Débit de connexions et latence des streams : Argon2 dans la boucle (avant) vs pool de processus (après)
+
+Des streams simulés envoient une frame toutes les WS_STREAM_FLUSH_INTERVAL_MS
+pendant que --logins clients enchaînent des vérifications de mot de passe,
+comme /auth/login. Mesure le retard des frames sur leur échéance (le gel
+ressenti par les streams WebSocket), le débit de connexions et leur latence.
+En mode inline, Argon2 s'exécute dans la boucle (PASSWORD_HASH_WORKERS=0) ;
+en mode pool, dans --workers processus.
+
+Usage:
+    python -m benchmarks.password_hashing --streams 200 --logins 8 --duration 10
+    python -m benchmarks.password_hashing --modes pool --workers 4 --time-cost 3
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from app.core.settings import settings
+from benchmarks.stats import summarize
+
+
+async def _stream(interval: float, deadline: float, lags: List[float]):
+    """Un stream : une frame par intervalle, retard de chaque frame sur son échéance"""
+    expected = time.perf_counter() + interval
+    while expected < deadline:
+        await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+        now = time.perf_counter()
+        lags.append((now - expected) * 1000)
+        expected = now + interval
+
+
+async def _login_client(hasher, password: str, hashed: str, deadline: float, latencies: List[float]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        assert await hasher.verify(password, hashed)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0)  # une vraie connexion rend la main (lecture en base, réponse)
+
+
+async def run_mode(mode: str, streams: int, logins: int, duration: float) -> Dict:
+    from app.infrastructure.services.auth.password_hasher_service import PasswordHasherService
+
+    hasher = PasswordHasherService()
+    hasher.start()
+    password = "benchmark-password"
+    hashed = await hasher.hash(password)
+
+    interval = settings.WS_STREAM_FLUSH_INTERVAL_MS / 1000
+    lags: List[float] = []
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(_stream(interval, deadline, lags) for _ in range(streams)),
+        *(_login_client(hasher, password, hashed, deadline, latencies) for _ in range(logins)),
+    )
+    await hasher.stop()
+    return {"mode": mode, "lags": lags, "latencies": latencies, "duration": duration}
+
+
+def print_result(result: Dict):
+    lag = summarize(result["lags"])
+    login = summarize(result["latencies"])
+    print(f"\n{result['mode']}")
+    print(f"  connexions: {login['count']}  débit: {login['count'] / result['duration']:.1f} login/s")
+    print(f"  latence login ms: p50={login.get('p50')} p95={login.get('p95')} max={login.get('max')}")
+    print(f"  retard des frames ms: p50={lag.get('p50')} p95={lag.get('p95')} p99={lag.get('p99')} max={lag.get('max')}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=8, help="clients de connexion simultanés")
+    parser.add_argument("--duration", type=float, default=10, help="secondes par mode")
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"], choices=["inline", "pool"])
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS or 2)
+    parser.add_argument("--time-cost", type=int, default=settings.ARGON2_TIME_COST)
+    parser.add_argument("--memory-cost", type=int, default=settings.ARGON2_MEMORY_COST_KIB, help="KiB")
+    args = parser.parse_args()
+
+    # Avant l'import de pwd_context, dans ce processus comme dans les workers (spawn)
+    settings.ARGON2_TIME_COST = args.time_cost
+    settings.ARGON2_MEMORY_COST_KIB = args.memory_cost
+    os.environ["ARGON2_TIME_COST"] = str(args.time_cost)
+    os.environ["ARGON2_MEMORY_COST_KIB"] = str(args.memory_cost)
+
+    for mode in args.modes:
+        settings.PASSWORD_HASH_WORKERS = 0 if mode == "inline" else args.workers
+        print_result(await run_mode(mode, args.streams, args.logins, args.duration))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Mesure du prefill par tour : /api/generate (prompt reconstruit) vs /api/chat
+
+Rejoue une conversation multi-tours contre Ollama (OLLAMA_BASE_URL) et
+affiche, pour chaque tour, le nombre de tokens réellement évalués en prefill
+(prompt_eval_count) et la durée de prefill. Avec /api/chat et un préfixe
+stable, Ollama ne réévalue que les tokens du nouveau message.
+
+Usage:
+    python -m benchmarks.prefill_reuse --turns 8 --model mistral:7b
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+
+from app.core.settings import settings
+from app.infrastructure.services.ollama.ollama_service import OllamaService
+
+QUESTIONS = [
+    "Présente-toi en deux phrases.",
+    "Quels sont les avantages de PostgreSQL ?",
+    "Et ses inconvénients ?",
+    "Compare avec MySQL en trois points.",
+    "Résume ce que tu as dit jusqu'ici.",
+    "Donne un exemple de requête SQL avec une jointure.",
+    "Comment indexer cette requête ?",
+    "Merci, une dernière recommandation ?",
+]
+
+
+async def run_generate(service: OllamaService, model: str, turns: int, max_tokens: int) -> List[Dict]:
+    """Avant : l'historique est recopié dans un prompt /api/generate à chaque tour"""
+    history: List[Dict[str, str]] = []
+    results = []
+    for question in QUESTIONS[:turns]:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in history)
+        metrics: Dict = {}
+        chunks = [c async for c in service.generate_stream_response(
+            prompt=question, model=model, context=transcript or None,
+            max_tokens=max_tokens, metrics=metrics
+        )]
+        history += [{"role": "user", "content": question}, {"role": "assistant", "content": "".join(chunks)}]
+        results.append(metrics)
+    return results
+
+
+async def run_chat(service: OllamaService, model: str, turns: int, max_tokens: int) -> List[Dict]:
+    """Après : /api/chat avec préfixe stable (système + historique)"""
+    history: List[Dict[str, str]] = []
+    results = []
+    for question in QUESTIONS[:turns]:
+        metrics: Dict = {}
+        chunks = [c async for c in service.generate_chat_stream(
+            prompt=question, history=list(history), model=model,
+            max_tokens=max_tokens, metrics=metrics
+        )]
+        history += [{"role": "user", "content": question}, {"role": "assistant", "content": "".join(chunks)}]
+        results.append(metrics)
+    return results
+
+
+def print_results(name: str, results: List[Dict]):
+    print(f"\n{name}")
+    print(f"{'tour':>4} {'prefill tokens':>15} {'prefill ms':>11} {'ttft ms':>8}")
+    for i, metrics in enumerate(results, 1):
+        prefill_ms = (metrics.get("prompt_eval_duration") or 0) / 1e6
+        print(f"{i:>4} {metrics.get('prompt_eval_count') or 0:>15} {prefill_ms:>11.1f} {metrics.get('time_to_first_token') or 0:>8}")
+    total = sum(m.get("prompt_eval_count") or 0 for m in results)
+    print(f"total prefill tokens: {total}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=settings.OLLAMA_MODEL)
+    parser.add_argument("--turns", type=int, default=len(QUESTIONS))
+    parser.add_argument("--max-tokens", type=int, default=200)
+    args = parser.parse_args()
+
+    service = OllamaService()
+    print_results("/api/generate (prompt reconstruit)", await run_generate(service, args.model, args.turns, args.max_tokens))
+    print_results("/api/chat (préfixe stable)", await run_chat(service, args.model, args.turns, args.max_tokens))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
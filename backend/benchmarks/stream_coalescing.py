@@ -0,0 +1,78 @@
+"""
+Mesure de l'effet du regroupement des tokens sur les frames WebSocket
+
+Simule des streams IA concurrents (débit de tokens fixe) et compare l'envoi
+d'une frame par token avec la politique de flush configurée : frames/s et
+temps CPU par stream.
+
+Usage:
+    python -m benchmarks.stream_coalescing --streams 200 --tokens 100 --rate 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict
+
+from app.core.settings import settings
+from app.infrastructure.services.websocket.stream_coalescer_service import StreamCoalescerService
+
+
+async def _run_stream(tokens: int, rate: float, interval_ms: int, max_chars: int, counters: Dict[str, int]):
+    """Simuler un stream : chaque frame est sérialisée comme en production"""
+
+    async def send(content: str):
+        payload = json.dumps({
+            "type": "ai_message_stream",
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        })
+        counters["frames"] += 1
+        counters["bytes"] += len(payload)
+
+    coalescer = StreamCoalescerService(send, flush_interval_ms=interval_ms, flush_max_chars=max_chars)
+    for i in range(tokens):
+        await coalescer.push(f" tok{i}")
+        await asyncio.sleep(1 / rate)
+    await coalescer.close()
+
+
+async def run_policy(streams: int, tokens: int, rate: float, interval_ms: int, max_chars: int) -> Dict[str, float]:
+    counters = {"frames": 0, "bytes": 0}
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[
+        _run_stream(tokens, rate, interval_ms, max_chars, counters) for _ in range(streams)
+    ])
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        "frames": counters["frames"],
+        "frames_per_second": round(counters["frames"] / wall, 1),
+        "bytes": counters["bytes"],
+        "cpu_ms_per_stream": round(cpu * 1000 / streams, 3),
+        "wall_s": round(wall, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=50.0, help="tokens/s par stream")
+    parser.add_argument("--interval-ms", type=int, default=settings.WS_STREAM_FLUSH_INTERVAL_MS)
+    parser.add_argument("--max-chars", type=int, default=settings.WS_STREAM_FLUSH_MAX_CHARS)
+    args = parser.parse_args()
+
+    policies = {
+        "frame par token": (0, 0),
+        f"flush {args.interval_ms}ms/{args.max_chars}car": (args.interval_ms, args.max_chars),
+    }
+    for name, (interval_ms, max_chars) in policies.items():
+        result = asyncio.run(run_policy(args.streams, args.tokens, args.rate, interval_ms, max_chars))
+        print(f"{name:<28} {json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    main()
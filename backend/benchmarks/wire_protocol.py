@@ -0,0 +1,121 @@
+"""
+Comparaison des tailles de payload WebSocket selon le protocole négocié
+
+Rejoue une session enregistrée (frames JSON, une par ligne, produites par
+`benchmarks.chat_latency --record`) ou, à défaut, une session synthétique,
+et mesure pour chaque protocole : octets bruts, octets après
+permessage-deflate (contexte conservé entre frames, comme les navigateurs
+par défaut) et temps d'encodage. Les variantes "+ref" remplacent le contenu
+du message `ai_message` final par une référence au stream déjà reçu.
+raw_vs_json et deflate_vs_json rapportent chaque variante au JSON complet,
+octets bruts contre octets bruts et compressés contre compressés.
+
+Usage:
+    python -m benchmarks.wire_protocol --recording session.jsonl
+    python -m benchmarks.wire_protocol --turns 20 --answer-chars 1500
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Dict, List
+
+from app.infrastructure.services.websocket.wire_protocol import MSGPACK_AVAILABLE, WireProtocol
+
+
+def synthetic_session(turns: int, answer_chars: int, frame_chars: int) -> List[Dict]:
+    """Session de chat type : message utilisateur, stream de la réponse, message final"""
+    rng = random.Random(0)
+    words = "le la les un une des modèle contexte document réponse question données recherche".split()
+    frames: List[Dict] = []
+    for turn in range(turns):
+        message_id = str(uuid.uuid4())
+        frames.append({
+            "type": "user_message", "message_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()),
+            "username": "bench_user", "content": f"Question numéro {turn} sur le document",
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        frames.append({"type": "ai_thinking", "message_id": message_id, "timestamp": datetime.utcnow().isoformat()})
+        answer = ""
+        while len(answer) < answer_chars:
+            answer += rng.choice(words) + " "
+        for offset in range(0, len(answer), frame_chars):
+            frames.append({
+                "type": "ai_message_stream", "message_id": message_id, "offset": offset,
+                "content": answer[offset:offset + frame_chars], "timestamp": datetime.now().isoformat(),
+            })
+        frames.append({
+            "type": "ai_message", "message_id": message_id, "content": answer, "llm_used": "mistral:7b",
+            "response_time": 2150, "tokens_used": len(answer) // 4, "prompt_tokens": 512,
+            "time_to_first_token": 180, "tokens_per_second": 42.5, "timestamp": datetime.utcnow().isoformat(),
+        })
+    return frames
+
+
+def by_reference(frame: Dict) -> Dict:
+    """Version stream_ref du message final"""
+    if frame.get("type") != "ai_message" or "content" not in frame:
+        return frame
+    reference = {key: value for key, value in frame.items() if key != "content"}
+    reference["content_ref"] = frame["message_id"]
+    reference["content_length"] = len(frame["content"])
+    return reference
+
+
+def measure(frames: List[Dict], protocol: WireProtocol, stream_ref: bool) -> Dict[str, float]:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    raw = deflated = 0
+    encode_ns = 0
+    for frame in frames:
+        if stream_ref:
+            frame = by_reference(frame)
+        started = time.perf_counter_ns()
+        payload = protocol.encode(frame)
+        encode_ns += time.perf_counter_ns() - started
+        data = payload if isinstance(payload, bytes) else payload.encode("utf-8")
+        raw += len(data)
+        # permessage-deflate : flush synchronisé par message, les 4 octets finaux sont retirés
+        deflated += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return {
+        "bytes": raw,
+        "deflate_bytes": deflated,
+        "encode_us_per_frame": round(encode_ns / len(frames) / 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", default=None, help="frames JSON enregistrées, une par ligne")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--answer-chars", type=int, default=1500)
+    parser.add_argument("--frame-chars", type=int, default=40, help="taille moyenne d'une frame de stream")
+    args = parser.parse_args()
+
+    if args.recording:
+        with open(args.recording, encoding="utf-8") as f:
+            frames = [json.loads(line) for line in f if line.strip()]
+    else:
+        frames = synthetic_session(args.turns, args.answer_chars, args.frame_chars)
+
+    variants = [("json", False), ("json", True)]
+    if MSGPACK_AVAILABLE:
+        variants += [("msgpack", False), ("msgpack", True)]
+    else:
+        print("msgpack non installé : seules les variantes JSON sont mesurées")
+
+    baseline = None
+    print(f"{len(frames)} frames")
+    for name, stream_ref in variants:
+        result = measure(frames, WireProtocol(name, stream_ref), stream_ref)
+        baseline = baseline or result
+        result["raw_vs_json"] = round(result["bytes"] / baseline["bytes"], 3)
+        result["deflate_vs_json"] = round(result["deflate_bytes"] / baseline["deflate_bytes"], 3)
+        label = name + ("+ref" if stream_ref else "")
+        print(f"{label:<14} {json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Test de charge WebSocket : milliers de clients simulés sur /api/v1/ws/chat/{session_id}
+
+Crée des utilisateurs synthétiques (inscription + connexion via l'API), une
+session de chat par room, puis ouvre `--clients` connexions WebSocket
+réparties en rooms de `--room-size` onglets du même utilisateur. Dans chaque
+room, un onglet rejoue une conversation scriptée (événements de frappe puis
+message de chat) pendant que les autres écoutent.
+
+Mesures : débit et latence de connexion, latence de diffusion du message
+utilisateur aux onglets de la room, time-to-first-token et latence complète
+de la réponse IA, mémoire résidente du serveur par connexion (via /proc,
+serveur lancé par --spawn-server ou désigné par --server-pid).
+
+Avec --spawn-fake et --spawn-server, tout tourne en local contre
+benchmarks.fake_ollama (PostgreSQL reste nécessaire).
+
+Usage:
+    python -m benchmarks.ws_load --spawn-fake --spawn-server --clients 2000 --room-size 4 --turns 3
+    python -m benchmarks.ws_load --base-url http://127.0.0.1:8000 --server-pid 1234 --clients 500
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+import websockets
+
+from benchmarks.stats import summarize
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def raise_fd_limit():
+    """Relever la limite de descripteurs (une socket par client)"""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def rss_kb(pid: Optional[int]) -> Optional[int]:
+    """Mémoire résidente d'un process en Ko (Linux)"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+async def wait_for_server(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(f"{base_url}/api/v1/health/ping")
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Serveur injoignable: {base_url}")
+
+
+async def prepare_room(client: httpx.AsyncClient, base_url: str, prefix: str, index: int) -> Dict[str, str]:
+    """Inscrire et connecter un utilisateur synthétique, puis créer sa session"""
+    username = f"{prefix}_{index}"
+    password = "load-test-password"
+    await client.post(f"{base_url}/api/v1/auth/register", json={"username": username, "password": password})
+    response = await client.post(f"{base_url}/api/v1/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    token = response.json()["access_token"]
+
+    response = await client.post(
+        f"{base_url}/api/v1/chat/session",
+        json={"title": "Load test"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response.raise_for_status()
+    return {"token": token, "session_id": str(response.json()["session_id"])}
+
+
+class LoadClient:
+    """Une connexion WebSocket simulée"""
+
+    def __init__(self, room: "LoadRoom", speaker: bool):
+        self.room = room
+        self.speaker = speaker
+        self.websocket = None
+        self.frames: asyncio.Queue = asyncio.Queue()
+        self.reader: Optional[asyncio.Task] = None
+
+    async def connect(self, ws_url: str, protocol: str, timeout: float, results: Dict[str, List[float]]):
+        url = f"{ws_url}/api/v1/ws/chat/{self.room.session_id}?token={self.room.token}&protocol={protocol}"
+        started = time.perf_counter()
+        try:
+            self.websocket = await asyncio.wait_for(websockets.connect(url, max_queue=None), timeout)
+            frame = await asyncio.wait_for(self._receive(), timeout)
+            if frame.get("type") != "connection_established":
+                raise RuntimeError(f"frame inattendue: {frame.get('type')}")
+        except Exception:
+            results["connect_errors"].append(1)
+            if self.websocket is not None:
+                await self.websocket.close()
+            self.websocket = None
+            return
+        results["connect_ms"].append((time.perf_counter() - started) * 1000)
+        self.reader = asyncio.create_task(self._read_loop(results))
+
+    async def send(self, message: Dict[str, Any]):
+        await self.websocket.send(json.dumps(message))
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.cancel()
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def _receive(self) -> Dict[str, Any]:
+        data = await self.websocket.recv()
+        if isinstance(data, bytes):
+            import msgpack
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+    async def _read_loop(self, results: Dict[str, List[float]]):
+        try:
+            while True:
+                frame = await self._receive()
+                results["frames"].append(1)
+                if frame.get("type") == "ping":
+                    # Heartbeat serveur : sans réponse, l'onglet inactif est fermé après WS_IDLE_TIMEOUT_SECONDS
+                    await self.send({"type": "pong"})
+                    continue
+                if frame.get("type") == "user_message":
+                    sent_at = self.room.sent_at.get(frame.get("content"))
+                    if sent_at is not None:
+                        results["fanout_ms"].append((time.perf_counter() - sent_at) * 1000)
+                if self.speaker:
+                    self.frames.put_nowait((time.perf_counter(), frame))
+        except (asyncio.CancelledError, websockets.ConnectionClosed):
+            pass
+
+
+class LoadRoom:
+    """Une session de chat et ses onglets"""
+
+    def __init__(self, index: int, token: str, session_id: str, size: int):
+        self.index = index
+        self.token = token
+        self.session_id = session_id
+        self.sent_at: Dict[str, float] = {}
+        self.clients = [LoadClient(self, speaker=(i == 0)) for i in range(size)]
+
+    async def converse(self, turns: int, typing_events: int, think_time: float, timeout: float, results):
+        """Conversation scriptée de l'onglet principal"""
+        speaker = self.clients[0]
+        if speaker.websocket is None:
+            return
+        try:
+            for turn in range(turns):
+                await asyncio.sleep(random.uniform(0, think_time))
+                for _ in range(typing_events):
+                    await speaker.send({"type": "typing"})
+                    await asyncio.sleep(0.1)
+                await speaker.send({"type": "stop_typing"})
+
+                content = f"[room {self.index} tour {turn}] Question de test de charge {uuid.uuid4().hex[:8]}"
+                sent_at = time.perf_counter()
+                self.sent_at[content] = sent_at
+                await speaker.send({"type": "chat_message", "content": content, "use_rag": False})
+                results["messages"].append(1)
+
+                first_token_at = None
+                while True:
+                    at, frame = await asyncio.wait_for(speaker.frames.get(), timeout)
+                    kind = frame.get("type")
+                    if kind == "ai_message_stream" and first_token_at is None:
+                        first_token_at = at
+                        results["ttft_ms"].append((at - sent_at) * 1000)
+                    elif kind == "ai_message":
+                        results["answer_ms"].append((at - sent_at) * 1000)
+                        break
+                    elif kind in ("ai_error", "error"):
+                        results["errors"].append(1)
+                        break
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            results["errors"].append(1)
+
+
+async def run(args, server_pid: Optional[int]) -> Dict[str, Any]:
+    base_url = args.base_url.rstrip("/")
+    ws_url = "ws" + base_url[len("http"):]
+    rooms_count = math.ceil(args.clients / args.room_size)
+    prefix = f"load_{uuid.uuid4().hex[:6]}"
+
+    await wait_for_server(base_url, 30)
+
+    semaphore = asyncio.Semaphore(args.setup_concurrency)
+
+    async def prepare(client: httpx.AsyncClient, index: int):
+        async with semaphore:
+            return await prepare_room(client, base_url, prefix, index)
+
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        prepared = await asyncio.gather(*[prepare(client, i) for i in range(rooms_count)])
+
+    rooms = []
+    remaining = args.clients
+    for index, room in enumerate(prepared):
+        size = min(args.room_size, remaining)
+        remaining -= size
+        rooms.append(LoadRoom(index, room["token"], room["session_id"], size))
+
+    results: Dict[str, List[float]] = {
+        key: [] for key in (
+            "connect_ms", "connect_errors", "fanout_ms", "ttft_ms", "answer_ms", "messages", "errors", "frames"
+        )
+    }
+    clients = [client for room in rooms for client in room.clients]
+
+    rss_before = rss_kb(server_pid)
+    started = time.perf_counter()
+    connects = []
+    for i, client in enumerate(clients):
+        connects.append(asyncio.create_task(client.connect(ws_url, args.protocol, args.timeout, results)))
+        if args.connect_rate:
+            await asyncio.sleep(max(0.0, started + (i + 1) / args.connect_rate - time.perf_counter()))
+    await asyncio.gather(*connects)
+    connect_wall = time.perf_counter() - started
+    connected = len(results["connect_ms"])
+
+    await asyncio.sleep(1)
+    rss_connected = rss_kb(server_pid)
+
+    conversation_started = time.perf_counter()
+    await asyncio.gather(*[
+        room.converse(args.turns, args.typing_events, args.think_time, args.timeout, results) for room in rooms
+    ])
+    conversation_wall = time.perf_counter() - conversation_started
+    rss_after = rss_kb(server_pid)
+
+    await asyncio.gather(*[client.close() for client in clients], return_exceptions=True)
+
+    report: Dict[str, Any] = {
+        "clients": args.clients,
+        "rooms": len(rooms),
+        "connected": connected,
+        "connect_errors": len(results["connect_errors"]),
+        "connects_per_s": round(connected / connect_wall, 1) if connect_wall else None,
+        "connect_ms": summarize(results["connect_ms"]),
+        "messages": len(results["messages"]),
+        "errors": len(results["errors"]),
+        "frames_received": len(results["frames"]),
+        "answers_per_s": round(len(results["answer_ms"]) / conversation_wall, 2) if conversation_wall else None,
+        "fanout_ms": summarize(results["fanout_ms"]),
+        "ttft_ms": summarize(results["ttft_ms"]),
+        "answer_ms": summarize(results["answer_ms"]),
+    }
+    if rss_before is not None and rss_connected is not None:
+        report["server_rss_mb"] = {
+            "before": round(rss_before / 1024, 1),
+            "connected": round(rss_connected / 1024, 1),
+            "after_conversation": round(rss_after / 1024, 1) if rss_after else None,
+        }
+        report["rss_kb_per_connection"] = round((rss_connected - rss_before) / connected, 1) if connected else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="URL du backend (défaut: serveur lancé sur --port)")
+    parser.add_argument("--clients", type=int, default=1000, help="nombre de connexions WebSocket")
+    parser.add_argument("--room-size", type=int, default=4, help="onglets par session de chat")
+    parser.add_argument("--turns", type=int, default=3, help="messages de chat par room")
+    parser.add_argument("--typing-events", type=int, default=5, help="événements typing avant chaque message")
+    parser.add_argument("--think-time", type=float, default=2.0, help="pause aléatoire max entre deux tours (s)")
+    parser.add_argument("--connect-rate", type=float, default=200.0, help="connexions ouvertes par seconde (0 = sans limite)")
+    parser.add_argument("--setup-concurrency", type=int, default=20, help="inscriptions/connexions HTTP simultanées")
+    parser.add_argument("--protocol", default="json", choices=["json", "msgpack"])
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--server-pid", type=int, default=None, help="PID du backend pour mesurer sa mémoire")
+    parser.add_argument("--spawn-server", action="store_true", help="démarrer le backend (uvicorn, backplane local)")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--spawn-fake", action="store_true", help="démarrer benchmarks.fake_ollama sur --fake-port")
+    parser.add_argument("--fake-port", type=int, default=11500)
+    parser.add_argument("--fake-args", default="", help="arguments supplémentaires pour fake_ollama")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    processes: List[subprocess.Popen] = []
+    server_pid = args.server_pid
+    try:
+        env = dict(os.environ)
+        if args.spawn_fake:
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.fake_ollama", "--port", str(args.fake_port), *args.fake_args.split()]
+            ))
+            env["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}"
+        if args.spawn_server:
+            env.setdefault("WS_BACKPLANE", "local")
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                 "--port", str(args.port), "--log-level", "warning"],
+                env=env
+            )
+            processes.append(server)
+            server_pid = server_pid or server.pid
+        args.base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+
+        print(json.dumps(asyncio.run(run(args, server_pid)), ensure_ascii=False))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
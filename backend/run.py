@@ -19,5 +19,6 @@ if __name__ == "__main__":
         port=port,
         reload=settings.RELOAD and not os.getenv("DOCKER_ENV"), 
         log_level="info",
-        access_log=True
+        access_log=True,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE
     )
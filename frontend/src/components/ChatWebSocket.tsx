@@ -181,6 +181,10 @@ const ChatWebSocket: React.FC<ChatWebSocketProps> = ({
             ]);
             break;
 
+          case 'ping':
+            ws.current?.send(JSON.stringify({ type: 'pong' }));
+            break;
+
           case 'error':
             if (onError) {
               onError(data.message);